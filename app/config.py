@@ -17,6 +17,9 @@ ASSETS_DIR.mkdir(exist_ok=True)
 CREDENTIALS_FILE = DATA_DIR / "credentials.json"
 SETTINGS_FILE = DATA_DIR / "settings.json"
 CACHE_FILE = DATA_DIR / "cache.json"
+CACHE_DB_FILE = DATA_DIR / "cache.sqlite3"
+CACHE_TTL_FILE = DATA_DIR / "cache_ttl.json"
+METRICS_FILE = DATA_DIR / "metrics.json"
 
 # Configuration de l'application
 APP_NAME = "Pronote Amélioré"
@@ -38,6 +41,94 @@ CACHE_DURATION_MINUTES = {
     "messages": 5,       # Messages: 5 minutes
 }
 
+# Durées de validité adaptatives: chaque clé part de CACHE_DURATION_MINUTES,
+# s'allonge quand un rafraîchissement ne change rien et raccourcit quand la
+# donnée a changé, dans ces bornes (minutes)
+CACHE_TTL_BOUNDS = {
+    "schedule": (15, 240),
+    "grades": (30, 720),
+    "homework": (10, 120),
+    "messages": (5, 30),
+}
+CACHE_TTL_GROWTH = 1.5                  # Facteur si la donnée n'a pas changé
+CACHE_TTL_SHRINK = 0.5                  # Facteur si la donnée a changé
+CACHE_TTL_PINNED_MINUTES = 30 * 24 * 60 # Période entièrement passée: ne change plus
+CACHE_TTL_STATE_RETENTION_DAYS = 30     # Apprentissage oublié pour les clés inutilisées
+
+# Revalidation en arrière-plan: minutes après expiration pendant lesquelles
+# l'ancienne valeur est affichée immédiatement, le temps de la rafraîchir
+CACHE_STALE_GRACE_MINUTES = {
+    "schedule": 120,
+    "grades": 240,
+    "homework": 30,
+    "messages": 0,
+}
+
+# Stockage du cache: "sqlite" (une écriture par clé) ou "json" (cache.json)
+CACHE_BACKEND = "sqlite"
+# Écriture du cache: "write_behind" (regroupée en arrière-plan) ou "immediate" (tests)
+CACHE_DURABILITY = "write_behind"
+CACHE_FLUSH_DELAY = 2         # Secondes sans modification avant l'écriture
+CACHE_FLUSH_MAX_DELAY = 10    # Délai maximal entre une modification et son écriture
+CACHE_LOCK_TIMEOUT = 5        # Attente maximale du verrou du cache entre processus (secondes)
+
+# Budget du cache (éviction des entrées les moins récemment utilisées)
+CACHE_MAX_ENTRIES = 500
+CACHE_MAX_BYTES = 20 * 1024 * 1024
+CACHE_NAMESPACE_QUOTAS = {    # Entrées maximales par type de donnée
+    "schedule": 200,
+    "grades": 100,
+    "homework": 100,
+    "messages": 50,
+}
+CACHE_STALE_RETENTION_HOURS = 72    # Données expirées gardées pour l'affichage hors ligne
+CACHE_PURGE_INTERVAL = 600          # Purge des entrées trop anciennes (secondes)
+
+# Fenêtre de récupération de l'emploi du temps: "week" (trous seulement) ou "month"
+SCHEDULE_FETCH_WINDOW = "month"
+
+# Configuration de la session Pronote
+SESSION_IDLE_SECONDS = 300  # Pas de revalidation si le dernier appel réussi date de moins de 5 minutes
+SESSION_KEEP_ALIVE = True   # Maintenir la session active en arrière-plan
+SESSION_KEEP_ALIVE_INTERVAL = 110  # Vérifier la session après 110 s sans appel (comme pronotepy)
+
+# Résilience des appels Pronote
+RETRY_ATTEMPTS = 3               # Tentatives pour une erreur passagère (réseau, serveur)
+RETRY_BASE_DELAY = 0.5           # Délai initial (secondes), doublé à chaque essai
+RETRY_MAX_DELAY = 8              # Délai maximal entre deux essais
+CIRCUIT_FAILURE_THRESHOLD = 5    # Échecs consécutifs avant d'ouvrir le disjoncteur
+CIRCUIT_RESET_SECONDS = 60       # Pause avant un appel d'essai
+
+# Mesures des appels Pronote (voir PronoteClient.stats)
+METRICS_MAX_SAMPLES = 500        # Durées gardées par opération pour les percentiles
+METRICS_WRITE_INTERVAL = 0       # Écriture périodique de METRICS_FILE en secondes (0 = désactivée)
+
+# Pool de sessions (plusieurs comptes / enfants / établissements)
+SESSION_POOL_MAX = 6                # Nombre maximal de sessions ouvertes
+SESSION_POOL_MAX_LOGINS = 2         # Connexions simultanées autorisées
+SESSION_POOL_IDLE_SECONDS = 1800    # Fermer les sessions inutilisées depuis 30 minutes
+SESSION_POOL_FAN_OUT = 2            # Requêtes simultanées d'une même requête sur plusieurs sessions
+
+# Préchargement des données après la connexion
+PREFETCH_TIMEOUTS = {    # Délai depuis la connexion au-delà duquel la ressource n'est plus préchargée (secondes)
+    "user_info": 10,
+    "schedule": 30,
+    "homework": 30,
+    "grades": 60,
+}
+PREFETCH_CANCEL_TIMEOUT = 2.0   # Attente maximale de la requête en cours à la fermeture (secondes)
+
+# Préchargement des semaines voisines de l'emploi du temps affiché
+SCHEDULE_PREFETCH_RADIUS = 1    # Semaines de part et d'autre de la semaine affichée (0 = désactivé)
+SCHEDULE_PREFETCH_BUDGET = 6    # Requêtes Pronote spéculatives par minute, tous comptes confondus
+
+# Pages de la fenêtre principale gardées en mémoire entre deux navigations
+UI_PAGE_CACHE_SIZE = 4          # Pages vivantes au maximum (les moins récemment vues sont libérées)
+UI_PAGE_REFRESH_SECONDS = 300   # Recharger une page réaffichée après ce délai
+
+# Listes longues (notes, devoirs): seules les lignes proches de la zone visible sont créées
+UI_LIST_OVERSCAN = 300          # Pixels préparés au-dessus et au-dessous de la zone visible
+
 # Configuration des notifications
 NOTIFICATIONS_ENABLED = True
 CHECK_HOMEWORK_INTERVAL = 3600  # Vérifier les devoirs toutes les heures
@@ -11,9 +11,15 @@ from app.config import (
     APP_NAME,
     CREDENTIALS_FILE,
     SETTINGS_FILE,
-    DATA_DIR
+    DATA_DIR,
+    METRICS_FILE,
+    METRICS_WRITE_INTERVAL,
 )
 from app.pronote_api.client import PronoteClient
+from app.pronote_api.async_client import AsyncPronoteClient
+from app.pronote_api.metrics import MetricsWriter
+from app.pronote_api.prefetch import Prefetcher
+from app.pronote_api.session_pool import SessionPool
 from app.utils.themes import ThemeManager
 from app.ui.login import LoginWindow
 from app.ui.main_window import MainWindow
@@ -36,6 +42,13 @@ class App:
     
     def __init__(self):
         self.pronote_client = PronoteClient()
+        self.async_client = AsyncPronoteClient(self.pronote_client)
+        self.session_pool = SessionPool(cache=self.pronote_client.cache, ttl_policy=self.pronote_client.ttl_policy)
+        self.prefetcher = None
+        self.metrics_writer = None
+        if METRICS_WRITE_INTERVAL > 0:
+            self.metrics_writer = MetricsWriter(self.pronote_client.stats, METRICS_FILE, METRICS_WRITE_INTERVAL)
+            self.metrics_writer.start()
         self.theme_manager = ThemeManager(SETTINGS_FILE)
         self.current_window = None
         
@@ -78,10 +91,14 @@ class App:
                 
                 # Essayer la connexion par token si disponible
                 if "cookies" in credentials or "token" in credentials:
-                    success, message = self.pronote_client.login_with_token(credentials)
+                    client, message = self.session_pool.acquire(
+                        credentials["url"], credentials["username"], credentials=credentials,
+                        client=self.pronote_client, pinned=True,
+                    )
                     
-                    if success:
+                    if client is not None:
                         logger.info("Connexion automatique réussie")
+                        self.start_prefetch()
                         # Sauvegarder les nouveaux credentials
                         self.save_credentials(self.pronote_client.export_credentials())
                         return True
@@ -110,7 +127,8 @@ class App:
             self.current_window.withdraw()
         
         # Créer la fenêtre principale
-        self.current_window = MainWindow(self.pronote_client, self.theme_manager)
+        self.current_window = MainWindow(self.pronote_client, self.async_client, self.theme_manager,
+                                         on_logout=self.logout)
         
         # S'assurer que la fenêtre est visible et au premier plan
         self.current_window.deiconify()
@@ -132,11 +150,13 @@ class App:
         password = credentials["password"]
         remember = credentials.get("remember", False)
         
-        # Tenter la connexion
-        success, message = self.pronote_client.login(url, username, password)
+        # Tenter la connexion (la session principale reste ouverte tant que l'application tourne)
+        client, message = self.session_pool.acquire(url, username, password,
+                                                    client=self.pronote_client, pinned=True)
         
-        if success:
+        if client is not None:
             logger.info("Connexion réussie")
+            self.start_prefetch()
             
             # Sauvegarder les credentials si demandé
             if remember:
@@ -159,6 +179,11 @@ class App:
             # Afficher l'erreur
             messagebox.showerror("Erreur de connexion", message)
     
+    def start_prefetch(self):
+        """Précharger les données en arrière-plan pendant l'affichage de la fenêtre"""
+        self.prefetcher = Prefetcher(self.pronote_client)
+        self.prefetcher.start()
+    
     def save_credentials(self, credentials: dict):
         """Sauvegarder les credentials"""
         if credentials:
@@ -169,9 +194,32 @@ class App:
             except Exception as e:
                 logger.error(f"Erreur sauvegarde credentials: {e}")
     
-    def on_closing(self):
-        """Gérer la fermeture de l'application"""
+    def logout(self):
+        """Déconnexion depuis la fenêtre principale: même arrêt que la fermeture, cache du compte vidé"""
+        logger.info("Déconnexion demandée")
+        self.on_closing(clear_cache=True)
+    
+    def on_closing(self, clear_cache: bool = False):
+        """
+        Gérer la fermeture de l'application
+        
+        Args:
+            clear_cache: Oublier les données du compte dans le cache (déconnexion)
+        """
         logger.info("Fermeture de l'application")
+        # Arrêter d'abord tout ce qui écrit dans le cache...
+        if self.prefetcher:
+            self.prefetcher.cancel()
+        self.async_client.shutdown()
+        self.pronote_client.close()
+        if clear_cache:
+            self.pronote_client.logout(clear_cache=True)
+        self.session_pool.close_all()
+        # ...puis vider les écritures en attente et fermer le cache
+        self.pronote_client.cache.close()
+        self.pronote_client.ttl_policy.save()
+        if self.metrics_writer:
+            self.metrics_writer.stop()
         if self.current_window:
             self.current_window.quit()
             self.current_window.destroy()
@@ -0,0 +1,175 @@
+"""
+Façade asynchrone du client Pronote pour ne pas bloquer l'interface
+"""
+import datetime
+import queue
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, List, Optional, Tuple
+import logging
+
+from app.pronote_api.client import PronoteClient
+from app.pronote_api.prefetch import speculative_budget
+
+logger = logging.getLogger(__name__)
+
+# Intervalle de vérification des résultats depuis la boucle Tk (ms)
+POLL_INTERVAL_MS = 50
+# Intervalle de vérification des ressources rafraîchies en arrière-plan (ms)
+REVALIDATE_POLL_INTERVAL_MS = 250
+
+
+class AsyncPronoteClient:
+    """Exécute les appels PronoteClient sur un thread dédié et renvoie des futures"""
+
+    def __init__(self, client: PronoteClient):
+        self.client = client
+        # Un seul worker: les appels pronotepy ne sont pas thread-safe
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pronote")
+        
+        # Ressources rafraîchies en arrière-plan, transmises à la boucle Tk
+        self._revalidated: "queue.Queue[str]" = queue.Queue()
+        self._subscribers: List[Tuple[str, Any, Callable[[], None]]] = []
+        client.add_revalidate_listener(self._revalidated.put)
+
+    def submit(
+        self,
+        func: Callable[..., Any],
+        *args: Any,
+        owner=None,
+        on_done: Optional[Callable[[Any], None]] = None,
+        on_error: Optional[Callable[[BaseException], None]] = None,
+        **kwargs: Any,
+    ) -> Future:
+        """
+        Exécuter une fonction sur le worker Pronote
+
+        Args:
+            func: Fonction à exécuter
+            owner: Widget Tk sur lequel rapatrier les callbacks (via after())
+            on_done: Callback appelé dans la boucle Tk avec le résultat
+            on_error: Callback appelé dans la boucle Tk avec l'exception
+
+        Returns:
+            Future du résultat
+        """
+        future = self._executor.submit(func, *args, **kwargs)
+        if owner is not None and (on_done or on_error):
+            self._watch(future, owner, on_done, on_error)
+        return future
+
+    def _watch(self, future: Future, owner, on_done, on_error):
+        """Surveiller une future depuis la boucle Tk et appeler les callbacks une fois terminée"""
+
+        def poll():
+            try:
+                if not owner.winfo_exists():
+                    return
+            except Exception:
+                # Widget détruit entre-temps
+                return
+
+            if not future.done():
+                owner.after(POLL_INTERVAL_MS, poll)
+                return
+
+            if future.cancelled():
+                return
+
+            error = future.exception()
+            if error is not None:
+                logger.error(f"Erreur appel Pronote asynchrone: {error}")
+                if on_error:
+                    on_error(error)
+                return
+
+            if on_done:
+                on_done(future.result())
+
+        owner.after(0, poll)
+
+    def on_revalidated(self, resource: str, owner, callback: Callable[[], None]):
+        """
+        Appeler un callback quand une ressource affichée périmée a été rafraîchie
+        
+        Args:
+            resource: Type de ressource ("schedule", "grades"...)
+            owner: Widget Tk concerné (abonnement oublié à sa destruction)
+            callback: Appelé dans la boucle Tk, typiquement pour réafficher
+        """
+        self._subscribers.append((resource, owner, callback))
+    
+    def watch_revalidations(self, root):
+        """Relayer les rafraîchissements en arrière-plan depuis la boucle Tk de `root`"""
+        
+        def poll():
+            try:
+                if not root.winfo_exists():
+                    return
+            except Exception:
+                return
+            
+            resources = set()
+            while True:
+                try:
+                    resources.add(self._revalidated.get_nowait())
+                except queue.Empty:
+                    break
+            
+            if resources:
+                alive = []
+                for resource, owner, callback in self._subscribers:
+                    try:
+                        if not owner.winfo_exists():
+                            continue
+                    except Exception:
+                        continue
+                    alive.append((resource, owner, callback))
+                    if resource in resources:
+                        callback()
+                self._subscribers = alive
+            
+            root.after(REVALIDATE_POLL_INTERVAL_MS, poll)
+        
+        root.after(REVALIDATE_POLL_INTERVAL_MS, poll)
+    
+    def submit_user_info(self, **callbacks: Any) -> Future:
+        """Récupérer les informations utilisateur en arrière-plan"""
+        return self.submit(self.client.get_user_info, **callbacks)
+
+    def submit_schedule(self, date_from: datetime.date, date_to: datetime.date,
+                        force_refresh: bool = False, **callbacks: Any) -> Future:
+        """Récupérer l'emploi du temps en arrière-plan"""
+        return self.submit(self.client.get_schedule, date_from, date_to,
+                           force_refresh=force_refresh, **callbacks)
+
+    def submit_schedule_prefetch(self, date_from: datetime.date, date_to: datetime.date,
+                                 **callbacks: Any) -> Future:
+        """Précharger l'emploi du temps d'une période dans le cache (budget partagé)"""
+        return self.submit(self.client.prefetch_schedule, date_from, date_to,
+                           budget=speculative_budget, **callbacks)
+
+    def submit_homework(self, date_from: datetime.date, force_refresh: bool = False,
+                        **callbacks: Any) -> Future:
+        """Récupérer les devoirs en arrière-plan"""
+        return self.submit(self.client.get_homework, date_from,
+                           force_refresh=force_refresh, **callbacks)
+
+    def submit_grades(self, force_refresh: bool = False, lazy: bool = False,
+                      **callbacks: Any) -> Future:
+        """Récupérer les notes (ou seulement les périodes si lazy) en arrière-plan"""
+        return self.submit(self.client.get_grades, force_refresh=force_refresh, lazy=lazy,
+                           **callbacks)
+
+    def submit_period_grades(self, period_id: str, force_refresh: bool = False,
+                             **callbacks: Any) -> Future:
+        """Récupérer les notes d'une période en arrière-plan"""
+        return self.submit(self.client.get_period_grades, period_id,
+                           force_refresh=force_refresh, **callbacks)
+
+    def submit_messages(self, force_refresh: bool = False, **callbacks: Any) -> Future:
+        """Récupérer les messages en arrière-plan"""
+        return self.submit(self.client.get_messages, force_refresh=force_refresh, **callbacks)
+
+    def shutdown(self):
+        """Arrêter le worker: annuler les requêtes en attente et attendre celle en cours"""
+        self._executor.shutdown(wait=True, cancel_futures=True)
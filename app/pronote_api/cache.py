@@ -1,115 +1,820 @@
 """
 Système de cache pour réduire les appels API
 """
-import json
+import argparse
 import datetime
+import json
+import mmap
+import os
+import sys
+import threading
+import time
+import uuid
 from pathlib import Path
-from typing import Any, Optional
+from typing import Any, Dict, List, Optional, Tuple
 import logging
 
+from app.config import (
+    CACHE_BACKEND,
+    CACHE_DB_FILE,
+    CACHE_FILE,
+    CACHE_DURABILITY,
+    CACHE_FLUSH_DELAY,
+    CACHE_FLUSH_MAX_DELAY,
+    CACHE_PURGE_INTERVAL,
+    CACHE_STALE_RETENTION_HOURS,
+    METRICS_FILE,
+)
+from app.pronote_api import codec
+from app.pronote_api.cache_keys import is_past_range
+from app.pronote_api.cache_stats import summarize, format_report
+from app.pronote_api.eviction import CacheBudget, namespace_of
+from app.pronote_api.file_lock import FileLock
+from app.pronote_api.sqlite_cache import SQLiteCache
+from app.pronote_api.write_behind import WriteBehind
+
 logger = logging.getLogger(__name__)
 
+# En-tête du fichier: "PCACHE1 <taille de l'index> <jeton>\n", l'index JSON
+# {clé: [position, taille, horodatage]} puis les valeurs encodées à la suite.
+# Le jeton change à chaque écriture: il révèle qu'un autre processus a écrit.
+FILE_MAGIC = b"PCACHE1"
+
+# Sous Windows un fichier ouvert ne peut pas être remplacé par un autre
+# processus: les valeurs y sont relues à la demande sans garder de mmap
+KEEP_FILE_MAPPED = os.name != "nt"
+
+
+class CorruptCacheError(ValueError):
+    """Fichier de cache illisible"""
+
+
+class FileReplacedError(Exception):
+    """Le fichier du cache a été réécrit par un autre processus"""
+
 
 class Cache:
-    """Gestion du cache local des données Pronote"""
-    
-    def __init__(self, cache_file: Path):
+    """
+    Gestion du cache local des données Pronote
+
+    Au démarrage seul l'index des clés est lu; la valeur d'une entrée n'est
+    lue (via mmap) et décodée qu'à son premier get.
+
+    Plusieurs processus peuvent partager le fichier: chaque écriture prend un
+    verrou, fusionne les entrées écrites entre-temps par les autres puis
+    remplace le fichier d'un bloc.
+    """
+
+    def __init__(self, cache_file: Path, durability: str = CACHE_DURABILITY):
+        """
+        Args:
+            cache_file: Fichier du cache
+            durability: "immediate" (écriture à chaque modification) ou
+                "write_behind" (écritures regroupées en arrière-plan)
+        """
         self.cache_file = cache_file
-        self.cache_data = self._load_cache()
-    
+        self.lock_file = cache_file.with_name(cache_file.name + ".lock")
+        # Le cache est partagé entre le worker Pronote et le préchargement
+        self._lock = threading.RLock()
+        # Une seule écriture du fichier à la fois
+        self._save_lock = threading.Lock()
+        self._dirty = False
+        self._writer: Optional[WriteBehind] = None
+        if durability == "write_behind":
+            self._writer = WriteBehind(self.flush, CACHE_FLUSH_DELAY, CACHE_FLUSH_MAX_DELAY)
+
+        # Valeurs encodées pas encore écrites, et position des autres dans le fichier
+        self._raw: Dict[str, bytes] = {}
+        self._offsets: Dict[str, Tuple[int, int]] = {}
+        self._file = None
+        self._payload: Optional[mmap.mmap] = None
+        self._payload_start = 0
+        # Jeton du fichier tel que lu ou écrit par ce processus
+        self._token: Optional[str] = None
+        # Suppressions depuis la dernière écriture, à ne pas annuler en fusionnant
+        self._deleted: Dict[str, str] = {}
+        self._cleared_at: Optional[str] = None
+
+        # Budget: [espace de noms, taille, dernier accès] par clé
+        self.budget = CacheBudget()
+        self.evictions = {"lru": 0, "quota": 0, "expired": 0}
+        self._meta: Dict[str, List[Any]] = {}
+        self._last_purge = time.monotonic()
+        # Octets écrits sur disque depuis l'ouverture
+        self.bytes_written = 0
+
+        # {clé: {"timestamp": ..., "data": ...}}, "data" absent tant que non décodée
+        self.cache_data: Dict[str, Dict[str, Any]] = self._load_cache()
+        for key, entry in self.cache_data.items():
+            if key in self._offsets:
+                size = self._offsets[key][1]
+            else:
+                size = len(self._encode(entry.get("data")))
+            self._meta[key] = [namespace_of(key), size, self._entry_time(entry)]
+
+    @staticmethod
+    def _encode(data: Any) -> bytes:
+        """Encoder une valeur pour le fichier"""
+        return codec.encode(data).encode("utf-8")
+
+    @staticmethod
+    def _entry_time(entry: dict) -> float:
+        """Horodatage d'une entrée en secondes (0 si illisible)"""
+        try:
+            return datetime.datetime.fromisoformat(entry["timestamp"]).timestamp()
+        except (KeyError, TypeError, ValueError):
+            return 0.0
+
+    # --- Lecture du fichier ---
+
     def _load_cache(self) -> dict:
-        """Charger le cache depuis le fichier"""
-        if self.cache_file.exists():
+        """Charger l'index du cache (les valeurs restent sur disque)"""
+        if not self.cache_file.exists():
+            return {}
+        try:
+            with open(self.cache_file, 'rb') as f:
+                is_indexed = f.read(len(FILE_MAGIC)) == FILE_MAGIC
+            if not is_indexed:
+                return self._load_single_block()
+
+            self._token, self._payload_start, index, complete = self._read_index()
+            if not complete:
+                # Réécrire un fichier sain avec les entrées récupérées
+                self._dirty = True
+            self._open_payload()
+            cache_data = {}
+            for key, (offset, size, timestamp) in index.items():
+                self._offsets[key] = (offset, size)
+                cache_data[key] = {"timestamp": timestamp}
+            return cache_data
+
+        except CorruptCacheError as e:
+            self._set_aside(e)
+            self._dirty = True
+            return {}
+        except Exception as e:
+            logger.error(f"Erreur chargement cache: {e}")
+            return {}
+
+    def _load_single_block(self) -> dict:
+        """Lire un fichier d'un seul bloc (format précédent), réécrit ensuite au format indexé"""
+        try:
+            with open(self.cache_file, 'r', encoding='utf-8') as f:
+                cache_data = codec.decode(f.read())
+            self._dirty = True
+            return cache_data
+        except codec.CodecVersionError:
+            logger.info("Cache écrit dans un ancien format, ignoré")
+            return {}
+        except ValueError as e:
+            self._set_aside(e)
+            self._dirty = True
+            return {}
+
+    def _read_index(self) -> Tuple[str, int, Dict[str, list], bool]:
+        """
+        Lire l'en-tête et l'index du fichier
+
+        Les entrées dont la valeur dépasse la fin du fichier (écriture
+        tronquée) sont retirées de l'index plutôt que de tout rejeter.
+
+        Returns:
+            (jeton, début des valeurs, index, False si des entrées ont été retirées)
+
+        Raises:
+            CorruptCacheError: En-tête ou index illisible
+        """
+        try:
+            with open(self.cache_file, 'rb') as f:
+                header = f.readline()
+                parts = header.split()
+                if len(parts) != 3 or parts[0] != FILE_MAGIC:
+                    raise CorruptCacheError("en-tête invalide")
+                index_size = int(parts[1])
+                index_bytes = f.read(index_size)
+                if len(index_bytes) != index_size:
+                    raise CorruptCacheError("index tronqué")
+                index = json.loads(index_bytes)
+                file_size = os.fstat(f.fileno()).st_size
+            token = parts[2].decode("ascii")
+        except CorruptCacheError:
+            raise
+        except (ValueError, UnicodeDecodeError) as e:
+            raise CorruptCacheError(str(e)) from e
+
+        payload_start = len(header) + index_size
+        truncated = [
+            key for key, (offset, size, _) in index.items()
+            if payload_start + offset + size > file_size
+        ]
+        for key in truncated:
+            del index[key]
+        if truncated:
+            logger.warning(f"Cache tronqué: {len(truncated)} entrées perdues")
+        return token, payload_start, index, not truncated
+
+    def _set_aside(self, error: Exception):
+        """Mettre de côté un fichier corrompu (cache.json.corrupt); un fichier sain sera réécrit"""
+        logger.warning(f"Cache corrompu ({error}), reconstruction")
+        try:
+            os.replace(self.cache_file, self.cache_file.with_name(self.cache_file.name + ".corrupt"))
+        except OSError as e:
+            logger.error(f"Impossible de mettre de côté le cache corrompu: {e}")
+
+    def _open_payload(self):
+        """Ouvrir le fichier du cache pour lire les valeurs à la demande"""
+        if not KEEP_FILE_MAPPED or not self.cache_file.exists():
+            return
+        self._file = open(self.cache_file, 'rb')
+        try:
+            self._payload = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (ValueError, OSError):
+            # Fichier vide ou mmap indisponible: lectures classiques
+            self._payload = None
+
+    def _close_payload(self):
+        """Fermer le fichier du cache"""
+        if self._payload is not None:
+            self._payload.close()
+            self._payload = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _local_payload(self, key: str) -> Optional[bytes]:
+        """Valeur encodée disponible sans rouvrir le fichier (None sinon)"""
+        raw = self._raw.get(key)
+        if raw is not None:
+            return raw
+        entry = self.cache_data.get(key)
+        if entry is not None and "data" in entry:
+            return self._encode(entry["data"])
+        if self._file is not None and key in self._offsets:
+            offset, size = self._offsets[key]
+            start = self._payload_start + offset
+            if self._payload is not None:
+                return self._payload[start:start + size]
+            self._file.seek(start)
+            return self._file.read(size)
+        return None
+
+    def _read_payload(self, key: str) -> bytes:
+        """
+        Valeur encodée d'une entrée (en attente d'écriture ou lue dans le fichier)
+
+        Raises:
+            FileReplacedError: Le fichier a été réécrit depuis la lecture de l'index
+        """
+        payload = self._local_payload(key)
+        if payload is not None:
+            return payload
+
+        offset, size = self._offsets[key]
+        with open(self.cache_file, 'rb') as f:
+            parts = f.readline().split()
+            if len(parts) != 3 or parts[2].decode("ascii") != self._token:
+                raise FileReplacedError(str(self.cache_file))
+            f.seek(self._payload_start + offset)
+            return f.read(size)
+
+    # --- Écriture du fichier ---
+
+    def _save_cache(self):
+        """Enregistrer la modification (tout de suite ou via l'écriture différée)"""
+        self._dirty = True
+        if self._writer is None:
+            self.flush()
+        else:
+            self._writer.mark_dirty()
+
+    def flush(self):
+        """
+        Écrire le cache sur disque s'il a été modifié
+
+        Sous verrou de fichier: fusion avec les écritures des autres
+        processus, écriture dans un fichier temporaire puis renommage.
+        """
+        with self._save_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                self._dirty = False
             try:
-                with open(self.cache_file, 'r', encoding='utf-8') as f:
-                    return json.load(f)
+                with FileLock(self.lock_file):
+                    self._write_file()
             except Exception as e:
-                logger.error(f"Erreur chargement cache: {e}")
-                return {}
-        return {}
-    
-    def _save_cache(self):
-        """Sauvegarder le cache dans le fichier"""
+                logger.error(f"Erreur sauvegarde cache: {e}")
+                self._dirty = True
+
+    def _write_file(self):
+        """Fusionner puis réécrire le fichier (verrou de fichier déjà pris)"""
+        with self._lock:
+            self._merge_from_disk()
+            # Les valeurs jamais lues sont recopiées telles quelles, sans décodage
+            payloads = {key: self._read_payload(key) for key in self.cache_data}
+            timestamps = {key: entry["timestamp"] for key, entry in self.cache_data.items()}
+            deleted = dict(self._deleted)
+            cleared_at = self._cleared_at
+
+        index = {}
+        offset = 0
+        for key, payload in payloads.items():
+            index[key] = [offset, len(payload), timestamps[key]]
+            offset += len(payload)
+        index_bytes = json.dumps(index, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        token = uuid.uuid4().hex
+        header = FILE_MAGIC + f" {len(index_bytes)} {token}\n".encode("ascii")
+
+        # Fichier temporaire propre au processus: deux instances n'écrivent jamais le même
+        temp_file = self.cache_file.with_name(f"{self.cache_file.name}.{os.getpid()}.tmp")
+        with open(temp_file, 'wb') as f:
+            f.write(header)
+            f.write(index_bytes)
+            for payload in payloads.values():
+                f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        self.bytes_written += len(header) + len(index_bytes) + offset
+
+        with self._lock:
+            self._close_payload()
+            try:
+                # Le fichier n'est jamais vu à moitié écrit
+                os.replace(temp_file, self.cache_file)
+                self._token = token
+                self._payload_start = len(header) + len(index_bytes)
+                self._offsets = {key: (entry[0], entry[1]) for key, entry in index.items()}
+                for key, payload in payloads.items():
+                    if self._raw.get(key) is payload:
+                        del self._raw[key]
+                # Suppressions désormais reflétées par le fichier
+                for key, timestamp in deleted.items():
+                    if self._deleted.get(key) == timestamp:
+                        del self._deleted[key]
+                if self._cleared_at == cleared_at:
+                    self._cleared_at = None
+            finally:
+                self._open_payload()
+
+    def _merge_from_disk(self):
+        """
+        Intégrer les entrées écrites par un autre processus depuis notre dernière écriture
+
+        Pour chaque clé la version la plus récente gagne, et une entrée
+        supprimée ici n'est pas ressuscitée. Après la fusion, toute valeur
+        qui ne provient pas du fichier sur disque est gardée en mémoire (_raw).
+        """
+        token, payload_start, index = None, 0, {}
+        if self.cache_file.exists():
+            try:
+                token, payload_start, index, _ = self._read_index()
+            except CorruptCacheError as e:
+                self._set_aside(e)
+
+        if token is not None and token == self._token:
+            return
+
+        disk = open(self.cache_file, 'rb') if index else None
         try:
-            with open(self.cache_file, 'w', encoding='utf-8') as f:
-                json.dump(self.cache_data, f, ensure_ascii=False, indent=2, default=str)
-        except Exception as e:
-            logger.error(f"Erreur sauvegarde cache: {e}")
-    
+            def adopt(key: str):
+                offset, size, timestamp = index[key]
+                disk.seek(payload_start + offset)
+                self._raw[key] = disk.read(size)
+                self.cache_data[key] = {"timestamp": timestamp}
+                previous = self._meta.get(key)
+                last_access = previous[2] if previous else self._entry_time(self.cache_data[key])
+                self._meta[key] = [namespace_of(key), size, last_access]
+
+            for key in list(self.cache_data):
+                if key not in index:
+                    if key in self._offsets and key not in self._raw:
+                        # Écrite dans notre fichier puis supprimée par un autre processus
+                        self._forget(key)
+                        continue
+                elif index[key][2] > self.cache_data[key]["timestamp"]:
+                    adopt(key)
+                    continue
+                payload = self._local_payload(key)
+                if payload is not None:
+                    self._raw[key] = payload
+                elif key in index:
+                    adopt(key)
+                else:
+                    self._forget(key)
+
+            for key, (_, _, timestamp) in index.items():
+                if key in self.cache_data:
+                    continue
+                if key in self._deleted and timestamp <= self._deleted[key]:
+                    continue
+                if self._cleared_at is not None and timestamp <= self._cleared_at:
+                    continue
+                adopt(key)
+        finally:
+            if disk is not None:
+                disk.close()
+
+        # Les positions dans notre ancien fichier ne servent plus
+        self._close_payload()
+        self._offsets = {}
+
+    # --- Interface du cache ---
+
     def get(self, key: str, max_age_minutes: int = 30) -> Optional[Any]:
         """
         Récupérer une valeur du cache si elle n'est pas expirée
-        
+
         Args:
             key: Clé du cache
             max_age_minutes: Durée de validité en minutes
-            
+
         Returns:
             Valeur du cache ou None si expiré/inexistant
         """
-        if key not in self.cache_data:
-            return None
-        
-        cache_entry = self.cache_data[key]
-        
-        # Vérifier l'expiration
+        return self.lookup(key, max_age_minutes)[0]
+
+    def lookup(self, key: str, max_age_minutes: float = 30, grace_minutes: float = 0) -> Tuple[Optional[Any], bool]:
+        """
+        Récupérer une valeur, en acceptant une entrée expirée depuis peu
+
+        Args:
+            key: Clé du cache
+            max_age_minutes: Durée de validité en minutes
+            grace_minutes: Délai après expiration pendant lequel la valeur
+                est encore renvoyée, marquée périmée
+
+        Returns:
+            (valeur ou None, périmée)
+        """
+        with self._lock:
+            cache_entry = self.cache_data.get(key)
+            if cache_entry is not None:
+                self._meta[key][2] = time.time()
+
+        if cache_entry is None:
+            return None, False
+
+        # Vérifier l'expiration (sans décoder la valeur)
         timestamp_str = cache_entry.get("timestamp")
         if not timestamp_str:
-            return None
-        
+            return None, False
+
         try:
             timestamp = datetime.datetime.fromisoformat(timestamp_str)
             now = datetime.datetime.now()
             age_minutes = (now - timestamp).total_seconds() / 60
-            
-            if age_minutes > max_age_minutes:
+
+            if age_minutes > max_age_minutes + grace_minutes:
                 logger.debug(f"Cache expiré pour {key} (âge: {age_minutes:.1f} min)")
-                return None
-            
-            return cache_entry.get("data")
-            
+                return None, False
+
+            stale = age_minutes > max_age_minutes
+            if "data" in cache_entry:
+                return cache_entry["data"], stale
+
+            # Premier accès: décoder la valeur lue dans le fichier
+            with self._lock:
+                payload = self._read_payload(key)
+            data = codec.decode(payload.decode("utf-8"))
+            cache_entry["data"] = data
+            return data, stale
+
+        except FileReplacedError:
+            # Réécrit par un autre processus: fusionner puis relire une fois
+            token = self._token
+            self._dirty = True
+            self.flush()
+            if self._token == token:
+                return None, False
+            return self.lookup(key, max_age_minutes, grace_minutes)
+        except codec.CodecVersionError:
+            logger.debug(f"Entrée {key} écrite dans un ancien format, supprimée")
+            self.clear(key)
+            return None, False
+        except (KeyError, TypeError, ValueError, UnicodeDecodeError) as e:
+            logger.warning(f"Entrée {key} corrompue ({e}), supprimée")
+            self.clear(key)
+            return None, False
         except Exception as e:
             logger.error(f"Erreur lecture cache: {e}")
-            return None
-    
+            return None, False
+
     def set(self, key: str, value: Any):
         """
         Stocker une valeur dans le cache
-        
+
         Args:
             key: Clé du cache
             value: Valeur à stocker
         """
-        self.cache_data[key] = {
-            "timestamp": datetime.datetime.now().isoformat(),
-            "data": value,
-        }
+        payload = self._encode(value)
+        with self._lock:
+            self.cache_data[key] = {
+                "timestamp": datetime.datetime.now().isoformat(),
+                "data": value,
+            }
+            self._raw[key] = payload
+            self._deleted.pop(key, None)
+            self._meta[key] = [namespace_of(key), len(payload), time.time()]
+            self._enforce_budget()
+            self._maybe_purge()
+        # Hors du verrou: l'écriture immédiate prend le verrou de fichier
         self._save_cache()
-    
+
+    def _enforce_budget(self):
+        """Évincer les entrées les moins récemment utilisées au-delà du budget"""
+        counts: Dict[str, int] = {}
+        total_bytes = 0
+        for namespace, size, _ in self._meta.values():
+            counts[namespace] = counts.get(namespace, 0) + 1
+            total_bytes += size
+        if not self.budget.exceeded(len(self._meta), total_bytes, counts):
+            return
+
+        entries = [(key, *meta) for key, meta in self._meta.items()]
+        for key, reason in self.budget.victims(entries):
+            self._forget(key, deleted=True)
+            self.evictions[reason] += 1
+            logger.debug(f"Cache: éviction de {key} ({reason})")
+
+    def _forget(self, key: str, deleted: bool = False):
+        """
+        Retirer une entrée de la mémoire (le fichier suit au prochain flush)
+
+        Args:
+            key: Clé à retirer
+            deleted: Suppression voulue, que la fusion avec le fichier d'un
+                autre processus ne doit pas annuler
+        """
+        entry = self.cache_data.pop(key, None)
+        self._meta.pop(key, None)
+        self._raw.pop(key, None)
+        if deleted and entry is not None:
+            self._deleted[key] = entry["timestamp"]
+
+    def _maybe_purge(self):
+        """Purger régulièrement les entrées expirées depuis trop longtemps"""
+        if time.monotonic() - self._last_purge < CACHE_PURGE_INTERVAL:
+            return
+        self._last_purge = time.monotonic()
+        self._drop_older_than(CACHE_STALE_RETENTION_HOURS * 60)
+
+    def _drop_older_than(self, max_age_minutes: float) -> int:
+        """Retirer les entrées plus anciennes qu'une durée, sauf les périodes passées (verrou déjà pris)"""
+        limit = (datetime.datetime.now() - datetime.timedelta(minutes=max_age_minutes)).isoformat()
+        expired = [
+            key for key, entry in self.cache_data.items()
+            if entry.get("timestamp", "") < limit and not is_past_range(key)
+        ]
+        for key in expired:
+            self._forget(key, deleted=True)
+        self.evictions["expired"] += len(expired)
+        return len(expired)
+
     def clear(self, key: Optional[str] = None):
         """
         Vider le cache
-        
+
         Args:
             key: Clé spécifique à vider, ou None pour tout vider
         """
-        if key:
-            if key in self.cache_data:
-                del self.cache_data[key]
-                self._save_cache()
-        else:
-            self.cache_data = {}
+        with self._lock:
+            if key:
+                if key not in self.cache_data:
+                    return
+                self._forget(key, deleted=True)
+            else:
+                self.cache_data = {}
+                self._meta = {}
+                self._raw = {}
+                self._deleted = {}
+                self._cleared_at = datetime.datetime.now().isoformat()
+        self._save_cache()
+
+    def clear_prefix(self, prefix: str) -> int:
+        """
+        Supprimer toutes les entrées dont la clé commence par un préfixe
+
+        Args:
+            prefix: Début des clés (ex: cache_keys.account_prefix pour un compte)
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        with self._lock:
+            keys = self.keys(prefix)
+            for key in keys:
+                self._forget(key, deleted=True)
+        if keys:
             self._save_cache()
-    
+        return len(keys)
+
+    def keys(self, prefix: str = "") -> List[str]:
+        """
+        Clés présentes dans le cache (expirées comprises)
+
+        Args:
+            prefix: Ne garder que les clés commençant par ce préfixe
+        """
+        with self._lock:
+            return [key for key in self.cache_data if key.startswith(prefix)]
+
     def is_valid(self, key: str, max_age_minutes: int = 30) -> bool:
         """
         Vérifier si une entrée du cache est valide
-        
+
         Args:
             key: Clé du cache
             max_age_minutes: Durée de validité en minutes
-            
+
         Returns:
             True si valide, False sinon
         """
         return self.get(key, max_age_minutes) is not None
+
+    def age_minutes(self, key: str) -> Optional[float]:
+        """
+        Âge d'une entrée (expirée comprise)
+
+        Returns:
+            Minutes écoulées depuis son écriture, ou None si elle est absente
+        """
+        with self._lock:
+            entry = self.cache_data.get(key)
+        if entry is None:
+            return None
+        return (time.time() - self._entry_time(entry)) / 60
+
+    def purge_expired(self, max_age_minutes: float) -> int:
+        """
+        Supprimer les entrées plus anciennes qu'une durée
+
+        Les périodes entièrement passées ne changent plus: elles sont gardées
+        (le budget du cache les évince si la place manque).
+
+        Args:
+            max_age_minutes: Âge maximal conservé en minutes
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        with self._lock:
+            count = self._drop_older_than(max_age_minutes)
+        if count:
+            self._save_cache()
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Contenu du cache et activité depuis son ouverture
+
+        Returns:
+            Résumé par espace de noms (voir cache_stats.summarize) complété
+            de backend, file, file_bytes, evictions et bytes_written
+        """
+        with self._lock:
+            entries = [
+                (key, meta[1], self._entry_time(self.cache_data[key])) for key, meta in self._meta.items()
+            ]
+        stats = summarize(entries)
+        stats.update(
+            backend="json",
+            file=str(self.cache_file),
+            file_bytes=self.cache_file.stat().st_size if self.cache_file.exists() else 0,
+            evictions=dict(self.evictions),
+            bytes_written=self.bytes_written,
+        )
+        return stats
+
+    def compact(self) -> Tuple[int, int]:
+        """
+        Appliquer le budget puis réécrire le fichier
+
+        Returns:
+            (taille avant, taille après) en octets
+        """
+        before = self.cache_file.stat().st_size if self.cache_file.exists() else 0
+        with self._lock:
+            self._enforce_budget()
+            self._dirty = True
+        self.flush()
+        after = self.cache_file.stat().st_size if self.cache_file.exists() else 0
+        return before, after
+
+    def verify(self, repair: bool = False) -> Dict[str, str]:
+        """
+        Relire et décoder toutes les entrées
+
+        Args:
+            repair: Supprimer les entrées illisibles
+
+        Returns:
+            {clé: erreur} des entrées illisibles
+        """
+        # Partir du fichier à jour (fusionné avec les autres processus)
+        with self._lock:
+            self._dirty = True
+        self.flush()
+
+        problems = {}
+        for key in self.keys():
+            try:
+                with self._lock:
+                    entry = self.cache_data.get(key)
+                    if entry is None or "data" in entry:
+                        continue
+                    payload = self._read_payload(key)
+                codec.decode(payload.decode("utf-8"))
+            except FileReplacedError:
+                continue
+            except Exception as e:
+                problems[key] = f"{type(e).__name__}: {e}"
+
+        if repair:
+            for key in problems:
+                self.clear(key)
+        return problems
+
+    def close(self):
+        """Écrire les modifications en attente puis fermer le fichier"""
+        if self._writer is not None:
+            self._writer.close()
+        else:
+            self.flush()
+        with self._lock:
+            self._close_payload()
+
+
+def open_cache():
+    """
+    Ouvrir le cache configuré (CACHE_BACKEND)
+
+    Returns:
+        SQLiteCache (l'ancien cache.json est importé une fois) ou Cache JSON
+    """
+    if CACHE_BACKEND == "sqlite":
+        return SQLiteCache(CACHE_DB_FILE, legacy_file=CACHE_FILE)
+    return Cache(CACHE_FILE)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """
+    Inspection et maintenance du cache: python -m app.pronote_api.cache
+
+    Returns:
+        Code de sortie (1 si verify trouve des entrées illisibles)
+    """
+    parser = argparse.ArgumentParser(prog="python -m app.pronote_api.cache", description="Cache des données Pronote")
+    parser.add_argument("--backend", choices=("sqlite", "json"), default=CACHE_BACKEND,
+                        help="cache à ouvrir (CACHE_BACKEND par défaut)")
+    commands = parser.add_subparsers(dest="command")
+    stats_parser = commands.add_parser("stats", help="contenu par type de donnée et utilisation (défaut)")
+    stats_parser.add_argument("--json", action="store_true", help="sortie JSON")
+    purge_parser = commands.add_parser("purge-expired", help="supprimer les entrées trop anciennes")
+    purge_parser.add_argument("--older-than", type=float, default=CACHE_STALE_RETENTION_HOURS * 60,
+                              metavar="MINUTES", help="âge maximal conservé (CACHE_STALE_RETENTION_HOURS par défaut)")
+    commands.add_parser("compact", help="appliquer le budget et récupérer la place perdue")
+    verify_parser = commands.add_parser("verify", help="relire et décoder toutes les entrées")
+    verify_parser.add_argument("--repair", action="store_true", help="supprimer les entrées illisibles")
+    args = parser.parse_args(argv)
+
+    if args.backend == "sqlite":
+        # Pas d'import de l'ancien cache.json: l'outil ne fait qu'inspecter
+        cache = SQLiteCache(CACHE_DB_FILE, durability="immediate")
+    else:
+        cache = Cache(CACHE_FILE, durability="immediate")
+
+    try:
+        if args.command == "purge-expired":
+            print(f"{cache.purge_expired(args.older_than)} entrées supprimées")
+        elif args.command == "compact":
+            before, after = cache.compact()
+            print(f"Cache compacté: {before} -> {after} octets")
+        elif args.command == "verify":
+            problems = cache.verify(repair=args.repair)
+            for key, error in problems.items():
+                print(f"{key}: {error}")
+            action = "supprimées" if args.repair else "illisibles"
+            print(f"{len(problems)} entrées {action}")
+            return 1 if problems and not args.repair else 0
+        else:
+            # Succès/échecs: relevé écrit par l'application (METRICS_WRITE_INTERVAL > 0)
+            usage = None
+            if METRICS_FILE.exists():
+                try:
+                    with open(METRICS_FILE, 'r', encoding='utf-8') as f:
+                        usage = json.load(f)
+                except (OSError, ValueError) as e:
+                    logger.warning(f"Relevé des mesures illisible: {e}")
+            stats = cache.stats()
+            if getattr(args, "json", False):
+                print(json.dumps({"store": stats, "usage": usage}, ensure_ascii=False, indent=2))
+            else:
+                print(format_report(stats, usage))
+        return 0
+    finally:
+        cache.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,150 @@
+"""
+Clés du cache: espace de noms par compte et ressource, recherche par période
+
+Une clé est de la forme "url|utilisateur|enfant:ressource:partie:..." ; pour
+les ressources datées les deux premières parties sont les bornes de la
+période (ISO), la fin pouvant être absente pour une période ouverte
+(devoirs à partir d'une date).
+"""
+import datetime
+from typing import Any, Callable, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+
+class RangeHit(NamedTuple):
+    """Entrée du cache couvrant une période demandée"""
+    key: str
+    date_from: datetime.date
+    date_to: Optional[datetime.date]
+    value: Any
+    stale: bool
+
+
+def account_prefix(url: str, username: str) -> str:
+    """Préfixe commun à toutes les clés d'un compte (tous enfants confondus)"""
+    return f"{url}|{username}|"
+
+
+def account_id(url: str, username: str, child: Optional[str] = None) -> str:
+    """Identifiant de l'espace de noms d'un compte (et de l'enfant sélectionné)"""
+    return account_prefix(url, username) + (child or "")
+
+
+def make_key(account: str, resource: str, *parts: Any) -> str:
+    """
+    Construire une clé de cache
+
+    Args:
+        account: Identifiant du compte (account_id)
+        resource: Type de ressource (clé de CACHE_DURATION_MINUTES)
+        parts: Précisions (période, identifiant...)
+    """
+    return ":".join([account, resource] + [str(p) for p in parts])
+
+
+def range_key(account: str, resource: str, date_from: datetime.date,
+              date_to: Optional[datetime.date] = None) -> str:
+    """Clé d'une ressource datée (période ouverte si date_to est None)"""
+    if date_to is None:
+        return make_key(account, resource, date_from.isoformat())
+    return make_key(account, resource, date_from.isoformat(), date_to.isoformat())
+
+
+def parse_range(key: str, prefix: str) -> Optional[Tuple[datetime.date, Optional[datetime.date]]]:
+    """
+    Période d'une clé datée
+
+    Returns:
+        (début, fin ou None si ouverte), ou None si la clé n'est pas datée
+    """
+    parts = key[len(prefix):].split(":")
+    try:
+        date_from = datetime.date.fromisoformat(parts[0])
+        date_to = datetime.date.fromisoformat(parts[1]) if len(parts) > 1 and parts[1] else None
+    except ValueError:
+        return None
+    return date_from, date_to
+
+
+def is_past_range(key: str, today: Optional[datetime.date] = None) -> bool:
+    """
+    La clé porte-t-elle une période entièrement passée (donnée figée) ?
+
+    Args:
+        key: Clé du cache
+        today: Date du jour (aujourd'hui par défaut)
+    """
+    # enfant, ressource, début, fin
+    parts = key.rsplit("|", 1)[-1].split(":")
+    if len(parts) < 4:
+        return False
+    try:
+        date_to = datetime.date.fromisoformat(parts[3])
+    except ValueError:
+        return False
+    return date_to < (today or datetime.date.today())
+
+
+def covering(keys: Iterable[str], prefix: str, date_from: datetime.date,
+             date_to: Optional[datetime.date]) -> List[Tuple[str, datetime.date, Optional[datetime.date]]]:
+    """
+    Clés dont la période contient [date_from, date_to], la plus courte d'abord
+
+    Args:
+        keys: Clés candidates (toutes commençant par prefix)
+        prefix: "compte:ressource:"
+        date_from: Début demandé
+        date_to: Fin demandée (None: période ouverte)
+
+    Returns:
+        Liste de (clé, début, fin)
+    """
+    found = []
+    for key in keys:
+        bounds = parse_range(key, prefix)
+        if bounds is None:
+            continue
+        start, end = bounds
+        if start > date_from:
+            continue
+        if end is not None and (date_to is None or end < date_to):
+            continue
+        found.append((key, start, end))
+    # Une période ouverte couvre tout: elle passe après les périodes bornées
+    found.sort(key=lambda item: (item[2] is None, (item[2] or date_from) - item[1]))
+    return found
+
+
+def lookup_range(cache: Any, account: str, resource: str, date_from: datetime.date,
+                 date_to: Optional[datetime.date], max_age_minutes: Union[float, Callable[[str], float]],
+                 grace_minutes: float = 0) -> Optional[RangeHit]:
+    """
+    Trouver une entrée encore utilisable couvrant une période
+
+    Une demande du mardi au jeudi est servie par une entrée du lundi au
+    dimanche; l'appelant filtre ensuite la valeur sur la période demandée.
+
+    Args:
+        cache: Cache ou SQLiteCache
+        account: Identifiant du compte (account_id)
+        resource: Type de ressource
+        date_from: Début demandé
+        date_to: Fin demandée (None: période ouverte)
+        max_age_minutes: Durée de validité en minutes, ou fonction qui la
+            donne pour une clé (durées adaptatives)
+        grace_minutes: Délai pendant lequel une entrée expirée est servie périmée
+
+    Returns:
+        RangeHit, ou None si aucune entrée valide ne couvre la période
+    """
+    prefix = make_key(account, resource) + ":"
+    stale_hit = None
+    for key, start, end in covering(cache.keys(prefix), prefix, date_from, date_to):
+        max_age = max_age_minutes(key) if callable(max_age_minutes) else max_age_minutes
+        value, stale = cache.lookup(key, max_age, grace_minutes)
+        if value is None:
+            continue
+        if not stale:
+            return RangeHit(key, start, end, value, False)
+        if stale_hit is None:
+            stale_hit = RangeHit(key, start, end, value, True)
+    return stale_hit
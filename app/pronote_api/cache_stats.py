@@ -0,0 +1,109 @@
+"""
+Statistiques du contenu du cache (nombre d'entrées, tailles et âges par type de donnée)
+"""
+import time
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from app.config import CACHE_DURATION_MINUTES
+from app.pronote_api.eviction import namespace_of
+
+# (clé, taille en octets, horodatage de l'écriture en secondes)
+EntryStat = Tuple[str, int, float]
+
+
+def _median(values: List[float]) -> float:
+    """Médiane d'une liste triée non vide"""
+    middle = len(values) // 2
+    if len(values) % 2:
+        return values[middle]
+    return (values[middle - 1] + values[middle]) / 2
+
+
+def summarize(entries: Iterable[EntryStat], now: Optional[float] = None) -> Dict[str, Any]:
+    """
+    Résumer le contenu du cache par espace de noms
+
+    Args:
+        entries: (clé, taille, horodatage) de chaque entrée
+        now: Heure de référence (time.time() par défaut)
+
+    Returns:
+        {"entries", "bytes", "namespaces": {espace: {entries, bytes,
+        age_min/age_median/age_max en minutes, expired}}}; "expired" compte
+        les entrées plus vieilles que CACHE_DURATION_MINUTES
+    """
+    now = time.time() if now is None else now
+    ages: Dict[str, List[float]] = {}
+    sizes: Dict[str, int] = {}
+    for key, size, timestamp in entries:
+        namespace = namespace_of(key)
+        ages.setdefault(namespace, []).append(max(0.0, (now - timestamp) / 60))
+        sizes[namespace] = sizes.get(namespace, 0) + size
+
+    namespaces = {}
+    for namespace, values in sorted(ages.items()):
+        values.sort()
+        duration = CACHE_DURATION_MINUTES.get(namespace, 30)
+        namespaces[namespace] = {
+            "entries": len(values),
+            "bytes": sizes[namespace],
+            "age_min": round(values[0], 1),
+            "age_median": round(_median(values), 1),
+            "age_max": round(values[-1], 1),
+            "expired": sum(1 for age in values if age > duration),
+        }
+    return {
+        "entries": sum(item["entries"] for item in namespaces.values()),
+        "bytes": sum(item["bytes"] for item in namespaces.values()),
+        "namespaces": namespaces,
+    }
+
+
+def _size(value: float) -> str:
+    """Taille lisible (o, Ko, Mo)"""
+    for unit in ("o", "Ko"):
+        if value < 1024:
+            return f"{value:.0f} {unit}"
+        value /= 1024
+    return f"{value:.1f} Mo"
+
+
+def format_report(stats: Dict[str, Any], usage: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Mettre en forme les statistiques pour la ligne de commande
+
+    Args:
+        stats: Résultat de stats() d'un cache
+        usage: Photographie des mesures de l'application (metrics.json),
+            pour les succès/échecs par ressource
+
+    Returns:
+        Texte sur plusieurs lignes
+    """
+    lines = [
+        f"Cache {stats['backend']}: {stats['file']} ({_size(stats['file_bytes'])} sur disque)",
+        f"{stats['entries']} entrées, {_size(stats['bytes'])}",
+        "",
+        f"{'type':<10} {'entrées':>8} {'taille':>10} {'âge min':>9} {'médian':>9} {'max':>9} {'expirées':>9}",
+    ]
+    for namespace, item in stats["namespaces"].items():
+        lines.append(
+            f"{namespace:<10} {item['entries']:>8} {_size(item['bytes']):>10} "
+            f"{item['age_min']:>8.0f}m {item['age_median']:>8.0f}m {item['age_max']:>8.0f}m {item['expired']:>9}"
+        )
+    lines.append("")
+    lines.append(f"Évictions: {', '.join(f'{reason} {count}' for reason, count in stats['evictions'].items())}")
+    lines.append(f"Octets écrits depuis l'ouverture: {_size(stats['bytes_written'])}")
+
+    if usage and usage.get("cache"):
+        lines.append("")
+        lines.append(f"Utilisation par l'application (depuis {usage.get('since')}, relevé {usage.get('written_at')}):")
+        lines.append(f"{'ressource':<10} {'succès':>8} {'échecs':>8} {'périmées':>9} {'taux':>6}")
+        for resource, counters in sorted(usage["cache"].items()):
+            lines.append(
+                f"{resource:<10} {counters['hits']:>8} {counters['misses']:>8} "
+                f"{counters['stale']:>9} {counters['hit_ratio']:>6.0%}"
+            )
+        if "cache_store" in usage:
+            lines.append(f"Octets écrits par l'application: {_size(usage['cache_store']['bytes_written'])}")
+    return "\n".join(lines)
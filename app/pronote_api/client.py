@@ -3,20 +3,93 @@ Client Pronote - Wrapper autour de pronotepy
 """
 import pronotepy
 import datetime
-from typing import Optional, List, Dict, Any
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional, List, Dict, Any, Callable, Set, Tuple
 import logging
 
+from app.config import (
+    CACHE_STALE_GRACE_MINUTES,
+    CACHE_TTL_FILE,
+    SCHEDULE_FETCH_WINDOW,
+    SESSION_IDLE_SECONDS,
+    SESSION_KEEP_ALIVE,
+    SESSION_KEEP_ALIVE_INTERVAL,
+)
+from app.pronote_api.cache import Cache, open_cache
+from app.pronote_api.cache_keys import account_id, account_prefix, make_key, range_key, lookup_range
+from app.pronote_api.lesson_store import LessonStore
+from app.pronote_api.metrics import Metrics
+from app.pronote_api.models import Lesson, Homework, Grade, Period, to_records
+from app.pronote_api.ttl import AdaptiveTTL
+from app.pronote_api.resilience import (
+    PronoteError,
+    TransientError,
+    AuthError,
+    CircuitOpenError,
+    RetryPolicy,
+    CircuitBreaker,
+    classify,
+)
+
 logger = logging.getLogger(__name__)
 
 
 class PronoteClient:
     """Wrapper pour gérer la connexion et les requêtes à Pronote"""
     
-    def __init__(self):
+    def __init__(self, cache: Optional[Cache] = None, ttl_policy: Optional[AdaptiveTTL] = None):
         self.client: Optional[pronotepy.Client] = None
         self.logged_in = False
+        self.child: Optional[str] = None
+        self.cache = cache if cache is not None else open_cache()
+        # Durées de validité apprises de la fréquence des changements
+        self.ttl_policy = ttl_policy if ttl_policy is not None else AdaptiveTTL(CACHE_TTL_FILE)
+        # Même durée de validité que l'entrée du cache couvrant l'intervalle
+        self.lesson_store = LessonStore(
+            lambda start, end: self.ttl_policy.minutes("schedule", range_key(self._account(), "schedule", start, end))
+        )
+        
+        # Suivi de l'activité de la session
+        self.session_idle_seconds = SESSION_IDLE_SECONDS
+        self.last_success = 0.0
+        self._keep_alive = None
+        
+        # Nouvelles tentatives et disjoncteur pour les erreurs passagères
+        self.retry_policy = RetryPolicy()
+        self.breaker = CircuitBreaker()
+        
+        # Durées, volumes, erreurs et efficacité du cache (voir stats)
+        self.metrics = Metrics()
+        
+        # Une session pronotepy ne supporte pas les requêtes simultanées
+        self._api_lock = threading.RLock()
+        # Un verrou par clé de cache pour ne pas récupérer deux fois la même donnée
+        self._key_locks: Dict[str, threading.Lock] = {}
+        self._key_locks_guard = threading.Lock()
+        
+        # Revalidation en arrière-plan des entrées périmées servies depuis le cache
+        self._revalidate_listeners: List[Callable[[str], None]] = []
+        self._revalidating: Set[str] = set()
+        self._revalidate_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="pronote-revalidate")
         
-    def login(self, url: str, username: str, password: str) -> tuple[bool, str]:
+        # Erreur avalée par le dernier get_* (propre à chaque thread, voir last_error)
+        self._last_error = threading.local()
+        
+    @staticmethod
+    def _client_class(url: str, child: Optional[str]) -> type:
+        """Choisir le client pronotepy (élève ou parent) selon l'URL"""
+        if child or url.rstrip("/").endswith("parent.html"):
+            return pronotepy.ParentClient
+        return pronotepy.Client
+    
+    def _select_child(self):
+        """Sélectionner l'enfant demandé sur un compte parent"""
+        if self.child and isinstance(self.client, pronotepy.ParentClient):
+            self.client.set_child(self.child)
+    
+    def login(self, url: str, username: str, password: str, child: Optional[str] = None) -> tuple[bool, str]:
         """
         Se connecter à Pronote
         
@@ -24,15 +97,21 @@ class PronoteClient:
             url: URL de Pronote
             username: Nom d'utilisateur
             password: Mot de passe
+            child: Nom de l'enfant à sélectionner (compte parent)
             
         Returns:
             (succès, message)
         """
         try:
-            self.client = pronotepy.Client(url, username=username, password=password)
+            self.child = child
+            client_class = self._client_class(url, child)
+            with self.metrics.timer("pronote.login"):
+                self.client = client_class(url, username=username, password=password)
+            self._select_child()
             
             if self.client.logged_in:
                 self.logged_in = True
+                self._on_logged_in()
                 logger.info(f"Connexion réussie pour {username}")
                 return True, "Connexion réussie"
             else:
@@ -54,21 +133,27 @@ class PronoteClient:
             else:
                 return False, f"Erreur de connexion: {error_str}"
     
-    def login_with_token(self, credentials: Dict[str, Any]) -> tuple[bool, str]:
+    def login_with_token(self, credentials: Dict[str, Any], child: Optional[str] = None) -> tuple[bool, str]:
         """
         Se connecter avec des credentials sauvegardés
         
         Args:
             credentials: Dictionnaire de credentials exportés
+            child: Nom de l'enfant à sélectionner (compte parent)
             
         Returns:
             (succès, message)
         """
         try:
-            self.client = pronotepy.Client.token_login(**credentials)
+            self.child = child
+            client_class = self._client_class(credentials.get("pronote_url", ""), child)
+            with self.metrics.timer("pronote.login_with_token"):
+                self.client = client_class.token_login(**credentials)
+            self._select_child()
             
             if self.client.logged_in:
                 self.logged_in = True
+                self._on_logged_in()
                 logger.info("Connexion par token réussie")
                 return True, "Connexion réussie"
             else:
@@ -90,176 +175,695 @@ class PronoteClient:
                 return None
         return None
     
+    def _on_logged_in(self):
+        """Initialiser le suivi de session après une connexion réussie"""
+        self.lesson_store.clear()
+        self._mark_alive()
+        if SESSION_KEEP_ALIVE:
+            self.start_keep_alive()
+    
+    def _mark_alive(self):
+        """Noter l'heure du dernier appel réussi"""
+        self.last_success = time.monotonic()
+    
+    def start_keep_alive(self):
+        """
+        Démarrer le maintien de session en arrière-plan
+        
+        Le thread keep_alive de pronotepy interroge la session sans passer
+        par _api_lock et désordonne les requêtes des autres threads: la
+        session est donc entretenue ici, par un appel sérialisé comme les autres.
+        """
+        self.stop_keep_alive()
+        if not self.client:
+            return
+        stop = threading.Event()
+        self._keep_alive = stop
+        # Daemon: ne pas empêcher la fermeture de l'application
+        threading.Thread(
+            target=self._keep_alive_loop, args=(stop,), name="pronote-keep-alive", daemon=True
+        ).start()
+    
+    def _keep_alive_loop(self, stop: threading.Event):
+        """Vérifier la session quand aucun appel ne l'a fait depuis SESSION_KEEP_ALIVE_INTERVAL"""
+        while not stop.wait(SESSION_KEEP_ALIVE_INTERVAL):
+            if time.monotonic() - self.last_success < SESSION_KEEP_ALIVE_INTERVAL:
+                continue
+            client = self.client
+            if client is None:
+                return
+            try:
+                with self.metrics.timer("pronote.keep_alive"):
+                    self._call(client.session_check)
+            except PronoteError as e:
+                logger.warning(f"Maintien de session impossible: {e}")
+    
+    def stop_keep_alive(self):
+        """Arrêter le maintien de session en arrière-plan"""
+        if self._keep_alive is not None:
+            self._keep_alive.set()
+            self._keep_alive = None
+    
     def check_session(self) -> bool:
         """Vérifier et rafraîchir la session si nécessaire"""
         if self.client and self.logged_in:
             try:
-                return self.client.session_check()
+                with self._api_lock, self.metrics.timer("pronote.check_session"):
+                    expired = self.client.session_check()
+                self._mark_alive()
+                return expired
             except Exception as e:
                 logger.error(f"Erreur vérification session: {e}")
                 return False
         return False
     
+    def ensure_session(self):
+        """Revalider la session seulement après une période d'inactivité"""
+        if time.monotonic() - self.last_success < self.session_idle_seconds:
+            return
+        if self.check_session():
+            logger.info("Session expirée, reconnexion effectuée")
+    
+    def _call(self, fetch: Callable[[], Any]) -> Any:
+        """
+        Exécuter un appel Pronote de façon résiliente
+        
+        Les erreurs passagères sont réessayées avec un délai exponentiel,
+        une erreur de session déclenche une reconnexion transparente, et le
+        disjoncteur refuse les appels après trop d'échecs consécutifs.
+        
+        Args:
+            fetch: Fonction qui interroge Pronote
+            
+        Returns:
+            Résultat de l'appel
+            
+        Raises:
+            PronoteError: TransientError, AuthError, FatalError ou CircuitOpenError
+        """
+        if not self.breaker.allow():
+            raise CircuitOpenError("Serveur Pronote indisponible, nouvel essai dans quelques instants")
+        
+        delays = self.retry_policy.delays()
+        refreshed = False
+        while True:
+            try:
+                with self._api_lock:
+                    self.ensure_session()
+                    result = fetch()
+                self._mark_alive()
+                self.breaker.record_success()
+                return result
+            
+            except Exception as e:
+                error, kind = e, classify(e)
+                
+                if kind is AuthError and not refreshed:
+                    refreshed = True
+                    logger.warning(f"Session invalide ({e}), reconnexion...")
+                    try:
+                        with self._api_lock:
+                            self.client.refresh()
+                        continue
+                    except Exception as refresh_error:
+                        error, kind = refresh_error, classify(refresh_error)
+                
+                if issubclass(kind, TransientError):
+                    delay = next(delays, None)
+                    if delay is not None:
+                        logger.warning(f"Erreur passagère ({error}), nouvel essai dans {delay:.1f}s")
+                        time.sleep(delay)
+                        continue
+                    self.breaker.record_failure()
+                else:
+                    # Erreur sans rapport avec la disponibilité du serveur
+                    self.breaker.release_trial()
+                
+                self.metrics.record_error("call", error)
+                raise kind(str(error)) from error
+    
+    def _account(self) -> str:
+        """Espace de noms du cache pour le compte connecté (et l'enfant sélectionné)"""
+        return account_id(self.client.pronote_url, self.client.username, self.child)
+    
+    def _cache_key(self, resource: str, *parts: Any) -> str:
+        """Construire une clé de cache propre au compte connecté"""
+        return make_key(self._account(), resource, *parts)
+    
+    def _cached(self, resource: str, key: str, fetch: Callable[[], Any], force_refresh: bool = False,
+                on_refresh: Optional[Callable[[Any], None]] = None) -> Any:
+        """
+        Lecture à travers le cache: renvoie l'entrée valide ou interroge Pronote
+        
+        La durée de validité de chaque clé est adaptative (voir AdaptiveTTL).
+        Une entrée expirée depuis moins de CACHE_STALE_GRACE_MINUTES est
+        renvoyée immédiatement et rafraîchie en arrière-plan (voir
+        add_revalidate_listener).
+        
+        Args:
+            resource: Type de ressource (clé de CACHE_DURATION_MINUTES)
+            key: Clé du cache
+            fetch: Fonction qui interroge Pronote
+            force_refresh: Ignorer le cache et interroger Pronote
+            on_refresh: Appelée avec les données rafraîchies en arrière-plan
+            
+        Returns:
+            Données du cache ou fraîchement récupérées
+        """
+        with self._key_lock(key):
+            if not force_refresh:
+                data, stale = self.cache.lookup(
+                    key,
+                    self.ttl_policy.minutes(resource, key),
+                    CACHE_STALE_GRACE_MINUTES.get(resource, 0),
+                )
+                self.metrics.record_cache(resource, data is not None, stale)
+                if data is not None:
+                    if stale:
+                        logger.debug(f"Cache périmé utilisé pour {key}, revalidation")
+                        self._revalidate(resource, key, fetch, on_refresh)
+                    else:
+                        logger.debug(f"Cache utilisé pour {key}")
+                    return data
+            
+            try:
+                data = self._call(fetch)
+            except PronoteError as e:
+                # Joindre la dernière donnée connue, même expirée
+                e.stale_data = self.cache.get(key, float("inf"))
+                raise
+            self.cache.set(key, data)
+            self.ttl_policy.observe(resource, key, data)
+            return data
+    
+    def _cached_range(self, resource: str, date_from: datetime.date, date_to: Optional[datetime.date],
+                      fetch: Callable[[datetime.date, Optional[datetime.date]], Any],
+                      force_refresh: bool = False,
+                      on_refresh: Optional[Callable[[datetime.date, Optional[datetime.date], Any], None]] = None,
+                      fetch_range: Optional[Tuple[datetime.date, Optional[datetime.date]]] = None,
+                      ) -> Tuple[datetime.date, Optional[datetime.date], Any, Optional[float]]:
+        """
+        Lecture à travers le cache d'une ressource datée
+        
+        Une entrée couvrant une période plus large que celle demandée est
+        réutilisée telle quelle: c'est à l'appelant de filtrer.
+        
+        Args:
+            resource: Type de ressource (clé de CACHE_DURATION_MINUTES)
+            date_from: Début de la période demandée
+            date_to: Fin de la période demandée (None: période ouverte)
+            fetch: Fonction (début, fin) qui interroge Pronote
+            force_refresh: Ignorer le cache et interroger Pronote
+            on_refresh: Appelée avec (début, fin, données) rafraîchies en arrière-plan
+            fetch_range: Période à demander à Pronote si le cache ne couvre
+                pas la demande (par défaut la période demandée)
+            
+        Returns:
+            (début, fin, données, validité restante) de la période
+            effectivement couverte; la validité restante est en minutes,
+            0 pour une entrée périmée en cours de revalidation et None pour
+            une donnée qui vient d'être récupérée (durée entière)
+        """
+        account = self._account()
+        if not force_refresh:
+            hit = lookup_range(
+                self.cache, account, resource, date_from, date_to,
+                lambda key: self.ttl_policy.minutes(resource, key),
+                CACHE_STALE_GRACE_MINUTES.get(resource, 0),
+            )
+            if hit is not None:
+                self.metrics.record_cache(resource, True, hit.stale)
+                if hit.stale:
+                    logger.debug(f"Cache périmé utilisé pour {hit.key}, revalidation")
+                    self._revalidate(
+                        resource, hit.key, lambda: fetch(hit.date_from, hit.date_to),
+                        on_refresh and (lambda data: on_refresh(hit.date_from, hit.date_to, data)),
+                    )
+                    return hit.date_from, hit.date_to, hit.value, 0.0
+                logger.debug(f"Cache utilisé pour {hit.key}")
+                remaining = self.ttl_policy.minutes(resource, hit.key) - (self.cache.age_minutes(hit.key) or 0)
+                return hit.date_from, hit.date_to, hit.value, max(0.0, remaining)
+        
+        start, end = fetch_range or (date_from, date_to)
+        try:
+            data = self._cached(
+                resource, range_key(account, resource, start, end), lambda: fetch(start, end), force_refresh,
+                on_refresh=on_refresh and (lambda fresh: on_refresh(start, end, fresh)),
+            )
+        except PronoteError as e:
+            if e.stale_data is None:
+                # Dernière donnée connue d'une période plus large
+                hit = lookup_range(self.cache, account, resource, date_from, date_to, float("inf"))
+                if hit is not None:
+                    e.stale_data = hit.value
+            raise
+        return start, end, data, None
+    
+    def add_revalidate_listener(self, listener: Callable[[str], None]):
+        """
+        Être prévenu quand une ressource a été rafraîchie en arrière-plan
+        
+        Args:
+            listener: Appelée (depuis un thread de fond) avec le type de ressource
+        """
+        self._revalidate_listeners.append(listener)
+    
+    def _revalidate(self, resource: str, key: str, fetch: Callable[[], Any],
+                    on_refresh: Optional[Callable[[Any], None]]):
+        """Rafraîchir une entrée périmée en arrière-plan (une seule fois par clé)"""
+        with self._key_locks_guard:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+        
+        def refresh():
+            try:
+                with self._key_lock(key):
+                    data = self._call(fetch)
+                    self.cache.set(key, data)
+                    changed = self.ttl_policy.observe(resource, key, data)
+                    if on_refresh is not None:
+                        on_refresh(data)
+                # Donnée identique: inutile de réafficher les pages
+                if changed:
+                    for listener in list(self._revalidate_listeners):
+                        listener(resource)
+            except Exception as e:
+                logger.warning(f"Revalidation de {key} impossible: {e}")
+            finally:
+                with self._key_locks_guard:
+                    self._revalidating.discard(key)
+        
+        try:
+            self._revalidate_executor.submit(refresh)
+        except RuntimeError:
+            # Client en cours de fermeture
+            with self._key_locks_guard:
+                self._revalidating.discard(key)
+    
+    def _key_lock(self, key: str) -> threading.Lock:
+        """Verrou associé à une clé de cache (un appel en cours attend l'autre)"""
+        with self._key_locks_guard:
+            if key not in self._key_locks:
+                self._key_locks[key] = threading.Lock()
+            return self._key_locks[key]
+    
+    @property
+    def last_error(self) -> Optional[Exception]:
+        """
+        Erreur avalée par le dernier get_* appelé depuis ce thread
+        
+        Les get_* renvoient une valeur vide plutôt que de lever une erreur
+        inattendue; cette propriété permet de distinguer un échec d'un
+        résultat réellement vide. None si ce dernier appel a réussi.
+        """
+        return getattr(self._last_error, "value", None)
+    
     def get_user_info(self) -> Optional[Dict[str, Any]]:
         """Récupérer les informations de l'utilisateur"""
+        self._last_error.value = None
         if not self.client or not self.logged_in:
             return None
             
         try:
-            self.check_session()
-            return {
-                "name": self.client.info.name,
-                "start_day": self.client.start_day,
-            }
+            client = self.client
+            return self._call(lambda: {
+                "name": client.info.name,
+                "start_day": client.start_day,
+            })
         except Exception as e:
+            self._last_error.value = e
             logger.error(f"Erreur récupération infos utilisateur: {e}")
             return None
     
-    def get_schedule(self, date_from: datetime.date, date_to: datetime.date) -> List[Dict[str, Any]]:
+    def get_schedule(self, date_from: datetime.date, date_to: datetime.date, force_refresh: bool = False) -> List[Lesson]:
         """
         Récupérer l'emploi du temps
         
         Args:
             date_from: Date de début
             date_to: Date de fin
+            force_refresh: Ignorer le cache
             
         Returns:
             Liste des cours
+            
+        Raises:
+            PronoteError: Pronote injoignable (stale_data: dernière donnée connue)
         """
+        self._last_error.value = None
         if not self.client or not self.logged_in:
             return []
             
         try:
-            self.check_session()
-            lessons = self.client.lessons(date_from, date_to)
+            if force_refresh:
+                gaps = [(date_from, date_to)]
+            else:
+                gaps = self.lesson_store.missing(date_from, date_to)
             
-            result = []
-            for lesson in lessons:
-                result.append({
-                    "id": lesson.id,
-                    "subject": lesson.subject.name if lesson.subject else "Aucune matière",
-                    "teacher": lesson.teacher_name if hasattr(lesson, 'teacher_name') else "",
-                    "classroom": lesson.classroom if hasattr(lesson, 'classroom') else "",
-                    "start": lesson.start,
-                    "end": lesson.end,
-                    "status": lesson.status if hasattr(lesson, 'status') else "",
-                    "background_color": lesson.background_color if hasattr(lesson, 'background_color') else "#6b7280",
-                })
+            if gaps:
+                # Une seule requête élargie couvrant tous les trous, sauf si
+                # une entrée du cache les couvre déjà
+                gap_from, gap_to = gaps[0][0], gaps[-1][1]
+                range_from, range_to, lessons, remaining = self._cached_range(
+                    "schedule", gap_from, gap_to, self._fetch_schedule, force_refresh,
+                    on_refresh=lambda start, end, fresh: self.lesson_store.add(start, end, to_records(Lesson, fresh)),
+                    fetch_range=self._widen_schedule_range(gap_from, gap_to),
+                )
+                lessons = to_records(Lesson, lessons)
+                if remaining == 0:
+                    # Entrée périmée: servie sans entrer dans l'index, que la
+                    # revalidation remplira (on_refresh) si elle aboutit
+                    known = [
+                        lesson for lesson in self.lesson_store.get(date_from, date_to)
+                        if not gap_from <= lesson["start"].date() <= gap_to
+                    ]
+                    stale = [lesson for lesson in lessons if gap_from <= lesson["start"].date() <= gap_to]
+                    return sorted(known + stale, key=lambda lesson: lesson["start"])
+                # Pas plus longtemps que l'entrée du cache dont ils proviennent
+                self.lesson_store.add(range_from, range_to, lessons, remaining)
             
-            return result
+            return self.lesson_store.get(date_from, date_to)
             
+        except PronoteError as e:
+            logger.error(f"Erreur récupération emploi du temps: {e}")
+            if e.stale_data is not None:
+                e.stale_data = [
+                    lesson for lesson in to_records(Lesson, e.stale_data)
+                    if date_from <= lesson["start"].date() <= date_to
+                ]
+            raise
         except Exception as e:
+            self._last_error.value = e
             logger.error(f"Erreur récupération emploi du temps: {e}")
             return []
     
-    def get_homework(self, date_from: datetime.date) -> List[Dict[str, Any]]:
+    def prefetch_schedule(self, date_from: datetime.date, date_to: datetime.date,
+                          budget: Optional[Any] = None) -> bool:
+        """
+        Précharger l'emploi du temps d'une période qui sera probablement demandée
+        
+        Rien n'est demandé à Pronote si la période est déjà en mémoire ou
+        valide dans le cache; sinon la requête consomme une place du budget
+        et est abandonnée s'il est épuisé. Les erreurs sont ignorées: la
+        période sera récupérée normalement si elle est affichée.
+        
+        Args:
+            date_from: Date de début
+            date_to: Date de fin
+            budget: Budget des requêtes spéculatives (RequestBudget), None: illimité
+            
+        Returns:
+            True si Pronote a été interrogé
+        """
+        if not self.client or not self.logged_in:
+            return False
+        if not self.lesson_store.missing(date_from, date_to):
+            return False
+        
+        hit = lookup_range(
+            self.cache, self._account(), "schedule", date_from, date_to,
+            lambda key: self.ttl_policy.minutes("schedule", key),
+        )
+        if hit is None and budget is not None and not budget.try_acquire():
+            logger.debug(f"Préchargement de l'emploi du temps du {date_from} abandonné: budget épuisé")
+            return False
+        
+        try:
+            self.get_schedule(date_from, date_to)
+        except PronoteError as e:
+            logger.debug(f"Préchargement de l'emploi du temps du {date_from} échoué: {e}")
+        return hit is None
+    
+    @staticmethod
+    def _widen_schedule_range(date_from: datetime.date, date_to: datetime.date) -> tuple[datetime.date, datetime.date]:
+        """Élargir une période à récupérer selon SCHEDULE_FETCH_WINDOW"""
+        if SCHEDULE_FETCH_WINDOW != "month":
+            return date_from, date_to
+        
+        month_start = date_from.replace(day=1)
+        next_month = (date_to.replace(day=1) + datetime.timedelta(days=32)).replace(day=1)
+        return month_start, next_month - datetime.timedelta(days=1)
+    
+    def _fetch_schedule(self, date_from: datetime.date, date_to: datetime.date) -> List[Lesson]:
+        """Interroger Pronote pour l'emploi du temps"""
+        with self.metrics.timer("pronote.lessons"):
+            lessons = self.client.lessons(date_from, date_to)
+        self.metrics.record_items("pronote.lessons", len(lessons))
+        
+        with self.metrics.timer("convert.lessons"):
+            return [Lesson.from_pronote(lesson) for lesson in lessons]
+    
+    def get_homework(self, date_from: datetime.date, force_refresh: bool = False) -> List[Homework]:
         """
         Récupérer les devoirs
         
         Args:
             date_from: Date de début
+            force_refresh: Ignorer le cache
             
         Returns:
             Liste des devoirs
+            
+        Raises:
+            PronoteError: Pronote injoignable (stale_data: dernière donnée connue)
         """
+        self._last_error.value = None
         if not self.client or not self.logged_in:
             return []
             
         try:
-            self.check_session()
-            homework_list = self.client.homework(date_from)
-            
-            result = []
-            for hw in homework_list:
-                result.append({
-                    "id": hw.id,
-                    "subject": hw.subject.name if hw.subject else "Aucune matière",
-                    "description": hw.description,
-                    "done": hw.done,
-                    "date": hw.date,
-                })
-            
-            return result
+            # Les devoirs à partir d'une date antérieure contiennent ceux demandés
+            _, _, homework_list, _ = self._cached_range(
+                "homework", date_from, None, lambda start, _: self._fetch_homework(start), force_refresh
+            )
+            return self._homework_from(date_from, homework_list)
             
+        except PronoteError as e:
+            logger.error(f"Erreur récupération devoirs: {e}")
+            if e.stale_data is not None:
+                e.stale_data = self._homework_from(date_from, e.stale_data)
+            raise
         except Exception as e:
+            self._last_error.value = e
             logger.error(f"Erreur récupération devoirs: {e}")
             return []
     
-    def get_grades(self) -> Dict[str, Any]:
+    @staticmethod
+    def _homework_from(date_from: datetime.date, homework_list: List[Any]) -> List[Homework]:
+        """Devoirs à rendre à partir d'une date"""
+        return [hw for hw in to_records(Homework, homework_list) if hw["date"] is None or hw["date"] >= date_from]
+    
+    def _fetch_homework(self, date_from: datetime.date) -> List[Homework]:
+        """Interroger Pronote pour les devoirs"""
+        with self.metrics.timer("pronote.homework"):
+            homework_list = self.client.homework(date_from)
+        self.metrics.record_items("pronote.homework", len(homework_list))
+        
+        with self.metrics.timer("convert.homework"):
+            return [Homework.from_pronote(hw) for hw in homework_list]
+    
+    def get_grades(self, force_refresh: bool = False, lazy: bool = False) -> Dict[str, Any]:
         """
         Récupérer les notes par période
         
+        Args:
+            force_refresh: Ignorer le cache
+            lazy: Ne renvoyer que la liste des périodes (notes non chargées,
+                voir get_period_grades)
+            
         Returns:
             Dictionnaire avec les périodes et notes
+            
+        Raises:
+            PronoteError: Pronote injoignable (stale_data: dernière donnée connue)
         """
+        self._last_error.value = None
         if not self.client or not self.logged_in:
             return {}
             
         try:
-            self.check_session()
-            periods = self.client.periods
+            key = self._cache_key("grades", "periods")
+            periods_info = self._cached("grades", key, self._fetch_periods, force_refresh)
+            periods = list(to_records(Period, periods_info.get("periods", [])))
+            
+            failure = None
+            if not lazy:
+                loaded = []
+                for period in periods:
+                    try:
+                        loaded.append(self.get_period_grades(period["id"], force_refresh) or period)
+                    except PronoteError as e:
+                        failure = e
+                        loaded.append(e.stale_data or period)
+                periods = loaded
             
             result = {
-                "periods": [],
-                "current_period": None,
+                "periods": periods,
+                "current_period": periods_info.get("current_period"),
             }
-            
-            for period in periods:
-                period_data = {
-                    "id": period.id,
-                    "name": period.name,
-                    "grades": [],
-                }
-                
-                for grade in period.grades:
-                    period_data["grades"].append({
-                        "id": grade.id,
-                        "grade": grade.grade,
-                        "out_of": grade.out_of,
-                        "subject": grade.subject.name if grade.subject else "Aucune matière",
-                        "date": grade.date,
-                        "coefficient": grade.coefficient if hasattr(grade, 'coefficient') else 1,
-                    })
-                
-                result["periods"].append(period_data)
-            
-            # Période actuelle
-            if self.client.current_period:
-                result["current_period"] = self.client.current_period.name
-            
+            if failure is not None:
+                # Les périodes non récupérées sont servies depuis le cache
+                failure.stale_data = result
+                raise failure
             return result
             
+        except PronoteError as e:
+            logger.error(f"Erreur récupération notes: {e}")
+            if isinstance(e.stale_data, dict) and "periods" in e.stale_data:
+                e.stale_data["periods"] = to_records(Period, e.stale_data["periods"])
+            raise
         except Exception as e:
+            self._last_error.value = e
             logger.error(f"Erreur récupération notes: {e}")
             return {}
     
-    def get_messages(self) -> List[Dict[str, Any]]:
+    def _fetch_periods(self) -> Dict[str, Any]:
+        """Lister les périodes, sans leurs notes"""
+        with self.metrics.timer("pronote.periods"):
+            periods = self.client.periods
+        self.metrics.record_items("pronote.periods", len(periods))
+        
+        result = {
+            "periods": [Period(period.id, period.name, None) for period in periods],
+            "current_period": None,
+        }
+        
+        # Période actuelle
+        if self.client.current_period:
+            result["current_period"] = self.client.current_period.name
+        
+        return result
+    
+    def get_period_grades(self, period_id: str, force_refresh: bool = False) -> Optional[Period]:
+        """
+        Récupérer les notes d'une seule période
+        
+        Args:
+            period_id: Identifiant de la période
+            force_refresh: Ignorer le cache
+            
+        Returns:
+            Période avec ses notes, ou None en cas d'erreur inattendue
+            
+        Raises:
+            PronoteError: Pronote injoignable (stale_data: période en cache)
+        """
+        self._last_error.value = None
+        if not self.client or not self.logged_in:
+            return None
+        
+        try:
+            key = self._cache_key("grades", period_id)
+            period = self._cached("grades", key, lambda: self._fetch_period_grades(period_id), force_refresh)
+            return period if isinstance(period, Period) else Period.from_dict(period)
+            
+        except PronoteError as e:
+            logger.error(f"Erreur récupération notes de la période {period_id}: {e}")
+            if e.stale_data is not None and not isinstance(e.stale_data, Period):
+                e.stale_data = Period.from_dict(e.stale_data)
+            raise
+        except Exception as e:
+            self._last_error.value = e
+            logger.error(f"Erreur récupération notes de la période {period_id}: {e}")
+            return None
+    
+    def _fetch_period_grades(self, period_id: str) -> Period:
+        """Interroger Pronote pour les notes d'une période"""
+        for period in self.client.periods:
+            if period.id == period_id:
+                # period.grades interroge Pronote à chaque lecture
+                with self.metrics.timer("pronote.grades"):
+                    grades = period.grades
+                self.metrics.record_items("pronote.grades", len(grades))
+                
+                with self.metrics.timer("convert.grades"):
+                    return Period(period.id, period.name, tuple(Grade.from_pronote(grade) for grade in grades))
+        raise KeyError(f"Période inconnue: {period_id}")
+    
+    def get_messages(self, force_refresh: bool = False) -> List[Dict[str, Any]]:
         """
         Récupérer les messages
         
+        Args:
+            force_refresh: Ignorer le cache
+            
         Returns:
             Liste des messages/discussions
+            
+        Raises:
+            PronoteError: Pronote injoignable (stale_data: dernière donnée connue)
         """
+        self._last_error.value = None
         if not self.client or not self.logged_in:
             return []
             
         try:
-            self.check_session()
-            # Note: L'implémentation exacte dépend de la version de pronotepy
-            # Cette partie peut nécessiter des ajustements
-            messages = []
-            
-            # TODO: Implémenter la récupération des messages
-            # Cela dépend de l'API pronotepy disponible
-            
-            return messages
+            key = self._cache_key("messages")
+            return self._cached("messages", key, self._fetch_messages, force_refresh)
             
+        except PronoteError as e:
+            logger.error(f"Erreur récupération messages: {e}")
+            raise
         except Exception as e:
+            self._last_error.value = e
             logger.error(f"Erreur récupération messages: {e}")
             return []
     
-    def logout(self):
-        """Se déconnecter"""
+    def _fetch_messages(self) -> List[Dict[str, Any]]:
+        """Interroger Pronote pour les messages"""
+        # Note: L'implémentation exacte dépend de la version de pronotepy
+        # Cette partie peut nécessiter des ajustements
+        messages = []
+        
+        # TODO: Implémenter la récupération des messages
+        # Cela dépend de l'API pronotepy disponible
+        
+        return messages
+    
+    def stats(self) -> Dict[str, Any]:
+        """
+        Photographie des mesures des appels Pronote
+        
+        Returns:
+            Dictionnaire avec les durées par opération (count, p50/p95/max en ms),
+            le nombre d'objets renvoyés, les erreurs, les taux de succès et les
+            évictions du cache, le contenu du cache (cache_store: entrées,
+            tailles et âges par type, octets écrits), les durées de validité
+            apprises (cache_ttl) et l'état du disjoncteur
+        """
+        snapshot = self.metrics.snapshot()
+        snapshot["circuit"] = self.breaker.state
+        snapshot["cache_evictions"] = dict(self.cache.evictions)
+        snapshot["cache_store"] = self.cache.stats()
+        snapshot["cache_ttl"] = self.ttl_policy.stats()
+        return snapshot
+    
+    def close(self):
+        """
+        Arrêter les traitements en arrière-plan (maintien de session, revalidations)
+        
+        Attend la revalidation en cours: après l'appel, plus aucune écriture
+        de ce client n'atteint le cache, qui peut alors être fermé.
+        """
+        self.stop_keep_alive()
+        self._revalidate_executor.shutdown(wait=True, cancel_futures=True)
+    
+    def logout(self, clear_cache: bool = True):
+        """
+        Se déconnecter
+        
+        Args:
+            clear_cache: Oublier les données du compte dans le cache (False
+                pour une session simplement fermée par le pool)
+        """
+        self.stop_keep_alive()
+        self.lesson_store.clear()
+        if clear_cache and self.client is not None:
+            prefix = account_prefix(self.client.pronote_url, self.client.username)
+            removed = self.cache.clear_prefix(prefix)
+            self.ttl_policy.forget(prefix)
+            logger.info(f"Cache du compte vidé ({removed} entrées)")
         self.client = None
         self.logged_in = False
         logger.info("Déconnexion effectuée")
@@ -0,0 +1,87 @@
+"""
+Sérialisation typée et versionnée des données mises en cache
+
+Les dates, datetimes, Decimal et enregistrements (Lesson, Homework...)
+sont relus avec leur type d'origine, sans que les pages aient à reconvertir
+du texte. Le texte produit commence par la version du format: une entrée
+écrite avec un autre format est ignorée plutôt que mal relue.
+"""
+import datetime
+import json
+from decimal import Decimal
+from typing import Any, Dict
+
+from app.pronote_api.models import Record, Lesson, Homework, Grade, Period
+
+# À incrémenter à chaque changement de format ou de champs des enregistrements
+CODEC_VERSION = 1
+
+RECORD_TYPES: Dict[str, type] = {cls.__name__: cls for cls in (Lesson, Homework, Grade, Period)}
+
+_PREFIX = f"{CODEC_VERSION}:"
+
+
+class CodecVersionError(ValueError):
+    """Donnée écrite avec une autre version du format"""
+
+
+def _tag(value: Any) -> Any:
+    """Représentation JSON étiquetée d'une valeur non native"""
+    # datetime avant date: datetime est une sous-classe de date
+    if isinstance(value, datetime.datetime):
+        return {"$dt": value.isoformat()}
+    if isinstance(value, datetime.date):
+        return {"$d": value.isoformat()}
+    if isinstance(value, Record):
+        values = [getattr(value, name) for name in value.__slots__]
+        # Dates des enregistrements en texte: reconnues par leur position au décodage
+        for index in value._date_positions:
+            if isinstance(values[index], datetime.date):
+                values[index] = values[index].isoformat()
+        return {"$r": type(value).__name__, "v": values}
+    if isinstance(value, Decimal):
+        return {"$dec": str(value)}
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    return str(value)
+
+
+def _untag(obj: Dict[str, Any]) -> Any:
+    """Reconstruire une valeur étiquetée (object_hook de json)"""
+    if len(obj) > 2:
+        return obj
+    if "$r" in obj:
+        return RECORD_TYPES[obj["$r"]].from_values(obj["v"])
+    if "$dt" in obj:
+        return datetime.datetime.fromisoformat(obj["$dt"])
+    if "$d" in obj:
+        return datetime.date.fromisoformat(obj["$d"])
+    if "$dec" in obj:
+        return Decimal(obj["$dec"])
+    return obj
+
+
+_encoder = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"), default=_tag)
+_decoder = json.JSONDecoder(object_hook=_untag)
+
+
+def encode(value: Any) -> str:
+    """
+    Sérialiser une valeur
+
+    Returns:
+        Texte compact préfixé par la version du format
+    """
+    return _PREFIX + _encoder.encode(value)
+
+
+def decode(text: str) -> Any:
+    """
+    Relire une valeur sérialisée par encode()
+
+    Raises:
+        CodecVersionError: Format absent ou d'une autre version
+    """
+    if not text.startswith(_PREFIX):
+        raise CodecVersionError(f"Format de cache inattendu: {text[:10]!r}")
+    return _decoder.decode(text[len(_PREFIX):])
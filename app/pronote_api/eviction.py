@@ -0,0 +1,83 @@
+"""
+Budget du cache: nombre d'entrées, taille et quotas par type de donnée
+"""
+from typing import Dict, List, Optional, Tuple
+
+from app.config import CACHE_MAX_ENTRIES, CACHE_MAX_BYTES, CACHE_NAMESPACE_QUOTAS
+
+# (clé, espace de noms, taille en octets, dernier accès)
+EntryInfo = Tuple[str, str, int, float]
+
+
+def namespace_of(key: str) -> str:
+    """
+    Espace de noms (type de ressource) d'une clé de cache
+
+    Les clés sont de la forme "url|utilisateur|enfant:ressource:...".
+    """
+    parts = key.rsplit("|", 1)[-1].split(":")
+    return parts[1] if len(parts) > 1 else parts[0]
+
+
+class CacheBudget:
+    """
+    Choix des entrées à évincer
+
+    Chaque espace de noms est d'abord ramené sous son quota, puis tant que
+    le budget global est dépassé on évince l'entrée la moins récemment
+    utilisée de l'espace le plus rempli par rapport à son quota: l'historique
+    de l'emploi du temps ne peut donc pas faire sortir les notes.
+    """
+
+    def __init__(self, max_entries: int = CACHE_MAX_ENTRIES, max_bytes: int = CACHE_MAX_BYTES,
+                 quotas: Optional[Dict[str, int]] = None):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.quotas = quotas if quotas is not None else CACHE_NAMESPACE_QUOTAS
+
+    def exceeded(self, count: int, total_bytes: int, counts: Dict[str, int]) -> bool:
+        """Le budget global ou un quota est-il dépassé ?"""
+        if count > self.max_entries or total_bytes > self.max_bytes:
+            return True
+        return any(counts.get(namespace, 0) > quota for namespace, quota in self.quotas.items())
+
+    def victims(self, entries: List[EntryInfo]) -> List[Tuple[str, str]]:
+        """
+        Entrées à évincer pour respecter le budget
+
+        Args:
+            entries: Informations sur toutes les entrées du cache
+
+        Returns:
+            Liste de (clé, raison) avec raison "quota" ou "lru"
+        """
+        by_namespace: Dict[str, List[EntryInfo]] = {}
+        for entry in entries:
+            by_namespace.setdefault(entry[1], []).append(entry)
+        for items in by_namespace.values():
+            # Les plus anciennement utilisées en premier
+            items.sort(key=lambda entry: entry[3])
+
+        victims = []
+        for namespace, items in by_namespace.items():
+            quota = self.quotas.get(namespace)
+            while quota is not None and len(items) > quota:
+                victims.append((items.pop(0)[0], "quota"))
+
+        count = sum(len(items) for items in by_namespace.values())
+        total_bytes = sum(entry[2] for items in by_namespace.values() for entry in items)
+        while count and (count > self.max_entries or total_bytes > self.max_bytes):
+            namespace = max(
+                (namespace for namespace, items in by_namespace.items() if items),
+                # À remplissage égal, l'espace dont l'entrée la plus ancienne est la moins récemment utilisée
+                key=lambda namespace: (
+                    len(by_namespace[namespace]) / self.quotas.get(namespace, self.max_entries),
+                    len(by_namespace[namespace]),
+                    -by_namespace[namespace][0][3],
+                ),
+            )
+            key, _, size, _ = by_namespace[namespace].pop(0)
+            victims.append((key, "lru"))
+            count -= 1
+            total_bytes -= size
+        return victims
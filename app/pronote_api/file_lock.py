@@ -0,0 +1,84 @@
+"""
+Verrou de fichier entre processus (verrou consultatif)
+"""
+import os
+import time
+from pathlib import Path
+from typing import Optional, IO
+
+from app.config import CACHE_LOCK_TIMEOUT
+
+if os.name == "nt":
+    import msvcrt
+else:
+    import fcntl
+
+# Intervalle entre deux tentatives de verrouillage (secondes)
+RETRY_INTERVAL = 0.05
+
+
+class FileLock:
+    """
+    Verrou exclusif sur un fichier .lock, à utiliser avec `with`
+
+    Protège une lecture-fusion-écriture du cache contre une autre instance
+    de l'application (ou un autre processus) qui écrirait en même temps.
+    """
+
+    def __init__(self, path: Path, timeout: float = CACHE_LOCK_TIMEOUT):
+        self.path = path
+        self.timeout = timeout
+        self._handle: Optional[IO[bytes]] = None
+
+    def acquire(self):
+        """
+        Prendre le verrou
+
+        Raises:
+            TimeoutError: Verrou toujours tenu par un autre processus après `timeout`
+        """
+        handle = open(self.path, 'a+b')
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                self._lock(handle)
+                self._handle = handle
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    handle.close()
+                    raise TimeoutError(f"Verrou {self.path} indisponible")
+                time.sleep(RETRY_INTERVAL)
+
+    def release(self):
+        """Relâcher le verrou"""
+        if self._handle is None:
+            return
+        try:
+            self._unlock(self._handle)
+        finally:
+            self._handle.close()
+            self._handle = None
+
+    @staticmethod
+    def _lock(handle: IO[bytes]):
+        if os.name == "nt":
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    @staticmethod
+    def _unlock(handle: IO[bytes]):
+        if os.name == "nt":
+            handle.seek(0)
+            msvcrt.locking(handle.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+    def __enter__(self) -> "FileLock":
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.release()
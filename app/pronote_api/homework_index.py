@@ -0,0 +1,176 @@
+"""
+Index des devoirs par état, date et matière pour filtrer sans reparcourir la liste
+"""
+import bisect
+import datetime
+import re
+import unicodedata
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+import logging
+
+from app.pronote_api.models import Homework
+
+logger = logging.getLogger(__name__)
+
+WORD_RE = re.compile(r"\w+")
+
+
+def normalize(text: str) -> str:
+    """Texte en minuscules et sans accents, pour la recherche"""
+    decomposed = unicodedata.normalize("NFKD", text.lower())
+    return "".join(char for char in decomposed if not unicodedata.combining(char))
+
+
+class HomeworkIndex:
+    """
+    Devoirs d'un chargement, indexés une fois pour toutes
+
+    Chaque devoir est désigné par sa position dans items. Les index
+    (état, matière, mots de la matière et de la description) associent à
+    chaque valeur l'ensemble des positions concernées: un filtre combiné
+    est une intersection d'ensembles. Les dates d'échéance sont gardées
+    triées, une fenêtre de dates se résout par recherche dichotomique. Les
+    devoirs sans date forment une dernière section à part.
+    """
+
+    def __init__(self, homework: Iterable[Homework] = ()):
+        """
+        Args:
+            homework: Devoirs reçus (dans l'ordre d'affichage souhaité pour une même date)
+        """
+        self.items: List[Homework] = list(homework)
+        self.by_status: Dict[str, Set[int]] = {"todo": set(), "done": set()}
+        self.by_subject: Dict[str, Set[int]] = {}
+        self.by_date: Dict[datetime.date, List[int]] = {}
+        self.dates: List[datetime.date] = []
+        self.undated: List[int] = []
+        self._by_word: Dict[str, Set[int]] = {}
+        self._words: List[str] = []
+        self._position_by_id: Dict[str, int] = {}
+
+        for position, homework in enumerate(self.items):
+            self._position_by_id[homework["id"]] = position
+            self.by_status["done" if homework.get("done", False) else "todo"].add(position)
+            self.by_subject.setdefault(homework.get("subject", ""), set()).add(position)
+
+            date = homework.get("date")
+            if isinstance(date, datetime.datetime):
+                date = date.date()
+            if date:
+                self.by_date.setdefault(date, []).append(position)
+            else:
+                self.undated.append(position)
+
+            text = f"{homework.get('subject', '')} {homework.get('description', '')}"
+            for word in WORD_RE.findall(normalize(text)):
+                self._by_word.setdefault(word, set()).add(position)
+
+        self.dates = sorted(self.by_date)
+        self._words = sorted(self._by_word)
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def subjects(self) -> List[str]:
+        """Matières présentes, par ordre alphabétique"""
+        return sorted(subject for subject in self.by_subject if subject)
+
+    def set_done(self, homework_id: str, done: bool) -> Optional[Homework]:
+        """
+        Changer l'état d'un devoir (et les index d'état)
+
+        Args:
+            homework_id: Identifiant du devoir
+            done: Nouvel état
+
+        Returns:
+            Le devoir mis à jour, ou None s'il n'est pas indexé
+        """
+        position = self._position_by_id.get(homework_id)
+        if position is None:
+            return None
+        updated = self.items[position].replace(done=done)
+        self.items[position] = updated
+        self.by_status["todo" if done else "done"].discard(position)
+        self.by_status["done" if done else "todo"].add(position)
+        return updated
+
+    def search(self, query: str) -> Set[int]:
+        """
+        Devoirs dont la matière ou la description contient chaque mot de la requête
+
+        Un mot de la requête correspond aux mots qui commencent par lui
+        ("math" trouve "mathématiques"), sans tenir compte des accents.
+
+        Args:
+            query: Texte saisi
+
+        Returns:
+            Positions des devoirs correspondants (tous si la requête est vide)
+        """
+        found: Optional[Set[int]] = None
+        for token in WORD_RE.findall(normalize(query)):
+            matches: Set[int] = set()
+            start = bisect.bisect_left(self._words, token)
+            for word in self._words[start:]:
+                if not word.startswith(token):
+                    break
+                matches |= self._by_word[word]
+            found = matches if found is None else found & matches
+            if not found:
+                return set()
+        return set(range(len(self.items))) if found is None else found
+
+    def filter(self, status: Optional[str] = None, subject: Optional[str] = None,
+               query: str = "") -> Set[int]:
+        """
+        Positions des devoirs satisfaisant tous les critères donnés
+
+        Args:
+            status: "todo", "done" ou None (tous)
+            subject: Matière exacte ou None (toutes)
+            query: Recherche dans la matière et la description
+
+        Returns:
+            Ensemble de positions
+        """
+        sets = []
+        if status is not None:
+            sets.append(self.by_status.get(status, set()))
+        if subject is not None:
+            sets.append(self.by_subject.get(subject, set()))
+        if query.strip():
+            sets.append(self.search(query))
+        if not sets:
+            return set(range(len(self.items)))
+        # Intersection en partant du plus petit ensemble
+        sets.sort(key=len)
+        return set.intersection(*sets)
+
+    def sections(self, positions: Set[int], date_from: Optional[datetime.date] = None,
+                 date_to: Optional[datetime.date] = None) -> List[Tuple[Optional[datetime.date], List[Homework]]]:
+        """
+        Regrouper des devoirs par date d'échéance, dans l'ordre chronologique
+
+        Les devoirs sans date, qu'aucune fenêtre ne peut écarter, suivent
+        dans une dernière section de date None.
+
+        Args:
+            positions: Devoirs retenus (résultat de filter)
+            date_from: Première date incluse (None: pas de limite)
+            date_to: Dernière date incluse (None: pas de limite)
+
+        Returns:
+            Liste de (date ou None, devoirs), sans les sections vides
+        """
+        start = 0 if date_from is None else bisect.bisect_left(self.dates, date_from)
+        end = len(self.dates) if date_to is None else bisect.bisect_right(self.dates, date_to)
+        sections = []
+        for date in self.dates[start:end]:
+            homework = [self.items[position] for position in self.by_date[date] if position in positions]
+            if homework:
+                sections.append((date, homework))
+        undated = [self.items[position] for position in self.undated if position in positions]
+        if undated:
+            sections.append((None, undated))
+        return sections
@@ -0,0 +1,155 @@
+"""
+Index des cours par date pour regrouper les récupérations de l'emploi du temps
+"""
+import datetime
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+logger = logging.getLogger(__name__)
+
+ONE_DAY = datetime.timedelta(days=1)
+
+
+class LessonStore:
+    """
+    Cours indexés par jour et intervalles de dates déjà récupérés
+
+    Les intervalles sont gardés triés et disjoints, ce qui permet de servir
+    n'importe quelle sous-période depuis la mémoire et de ne demander à
+    Pronote que les trous. Chaque intervalle garde sa propre échéance: des
+    cours tout juste reçus ne prennent pas celle, plus proche, d'un
+    intervalle voisin plus ancien. Un intervalle expiré est oublié avec les
+    cours de ses jours.
+    """
+
+    def __init__(self, max_age: Callable[[datetime.date, datetime.date], float]):
+        """
+        Args:
+            max_age: Durée de validité en minutes des cours d'un intervalle
+                (début, fin) au moment où ils sont reçus
+        """
+        self.max_age = max_age
+        # [début, fin, échéance (monotonic)]
+        self.intervals: List[List[Any]] = []
+        self.lessons_by_day: Dict[datetime.date, List[Dict[str, Any]]] = {}
+        self._lock = threading.RLock()
+
+    def _drop_days(self, date_from: datetime.date, date_to: datetime.date):
+        """Oublier les cours d'une période"""
+        day = date_from
+        while day <= date_to:
+            self.lessons_by_day.pop(day, None)
+            day += ONE_DAY
+
+    def _prune(self):
+        """Oublier les intervalles expirés et les cours de leurs jours"""
+        now = time.monotonic()
+        kept = []
+        for interval in self.intervals:
+            if interval[2] > now:
+                kept.append(interval)
+            else:
+                self._drop_days(interval[0], interval[1])
+        self.intervals = kept
+
+    def missing(self, date_from: datetime.date, date_to: datetime.date) -> List[Tuple[datetime.date, datetime.date]]:
+        """
+        Trouver les périodes non couvertes (ou expirées) dans un intervalle
+
+        Args:
+            date_from: Date de début
+            date_to: Date de fin
+
+        Returns:
+            Liste triée de (début, fin) à récupérer
+        """
+        gaps = []
+        cursor = date_from
+        with self._lock:
+            self._prune()
+            for start, end, _ in self.intervals:
+                if end < cursor:
+                    continue
+                if start > date_to:
+                    break
+                if start > cursor:
+                    gaps.append((cursor, start - ONE_DAY))
+                cursor = max(cursor, end + ONE_DAY)
+                if cursor > date_to:
+                    break
+        if cursor <= date_to:
+            gaps.append((cursor, date_to))
+        return gaps
+
+    def add(self, date_from: datetime.date, date_to: datetime.date, lessons: List[Dict[str, Any]],
+            max_age_minutes: Optional[float] = None):
+        """
+        Enregistrer les cours récupérés pour un intervalle
+
+        Args:
+            date_from: Date de début de la requête
+            date_to: Date de fin de la requête
+            lessons: Cours renvoyés par Pronote pour cet intervalle
+            max_age_minutes: Validité restante des cours (ex: celle de
+                l'entrée du cache dont ils proviennent); par défaut max_age
+                pour des cours qui viennent d'être récupérés
+        """
+        if max_age_minutes is None:
+            max_age_minutes = self.max_age(date_from, date_to)
+        expires_at = time.monotonic() + max_age_minutes * 60
+        with self._lock:
+            self._prune()
+
+            # Les nouveaux cours remplacent ceux déjà connus sur l'intervalle
+            self._drop_days(date_from, date_to)
+
+            touched_days = set()
+            for lesson in lessons:
+                start = lesson["start"]
+                lesson_day = start.date() if isinstance(start, datetime.datetime) else start
+                self.lessons_by_day.setdefault(lesson_day, []).append(lesson)
+                touched_days.add(lesson_day)
+
+            for lesson_day in touched_days:
+                self.lessons_by_day[lesson_day].sort(key=lambda l: l["start"])
+
+            # Retirer l'intervalle des anciens (qui gardent leur échéance), puis insérer le nouveau
+            intervals = []
+            for start, end, expiry in self.intervals:
+                if end < date_from or start > date_to:
+                    intervals.append([start, end, expiry])
+                    continue
+                if start < date_from:
+                    intervals.append([start, date_from - ONE_DAY, expiry])
+                if end > date_to:
+                    intervals.append([date_to + ONE_DAY, end, expiry])
+            intervals.append([date_from, date_to, expires_at])
+            intervals.sort(key=lambda i: i[0])
+            self.intervals = intervals
+
+    def get(self, date_from: datetime.date, date_to: datetime.date) -> List[Dict[str, Any]]:
+        """
+        Récupérer les cours connus d'un intervalle, triés par heure
+
+        Args:
+            date_from: Date de début
+            date_to: Date de fin
+
+        Returns:
+            Liste des cours
+        """
+        result = []
+        with self._lock:
+            day = date_from
+            while day <= date_to:
+                result.extend(self.lessons_by_day.get(day, []))
+                day += ONE_DAY
+        return result
+
+    def clear(self):
+        """Oublier tous les cours et intervalles"""
+        with self._lock:
+            self.intervals = []
+            self.lessons_by_day = {}
@@ -0,0 +1,167 @@
+"""
+Mesures des appels Pronote: durées, volumes, erreurs et efficacité du cache
+"""
+import datetime
+import json
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Iterator, List, Optional
+import logging
+
+from app.config import METRICS_MAX_SAMPLES
+
+logger = logging.getLogger(__name__)
+
+
+def _percentile(sorted_samples: List[float], fraction: float) -> float:
+    """Percentile (rang le plus proche) d'une liste triée"""
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, max(0, round(fraction * len(sorted_samples)) - 1))
+    return sorted_samples[index]
+
+
+class Metrics:
+    """
+    Compteurs et chronomètres par opération
+
+    Les noms séparent l'appel pronotepy (« pronote.lessons »: réseau et
+    décodage) de notre conversion (« convert.lessons »), ce qui permet de
+    savoir d'où vient une lenteur.
+    """
+
+    def __init__(self, max_samples: int = METRICS_MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.started_at = datetime.datetime.now()
+        self._lock = threading.Lock()
+        self._samples: Dict[str, Deque[float]] = {}
+        self._counts: Dict[str, int] = {}
+        self._max: Dict[str, float] = {}
+        self._items: Dict[str, int] = {}
+        self._errors: Dict[str, Dict[str, int]] = {}
+        self._cache: Dict[str, Dict[str, int]] = {}
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """Chronométrer un bloc (les exceptions sont comptées comme erreurs)"""
+        start = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            self.record_error(name, e)
+            raise
+        finally:
+            self.record_time(name, time.perf_counter() - start)
+
+    def record_time(self, name: str, seconds: float):
+        """Enregistrer une durée (les derniers échantillons servent aux percentiles)"""
+        with self._lock:
+            samples = self._samples.get(name)
+            if samples is None:
+                samples = self._samples[name] = deque(maxlen=self.max_samples)
+            samples.append(seconds)
+            self._counts[name] = self._counts.get(name, 0) + 1
+            self._max[name] = max(self._max.get(name, 0.0), seconds)
+
+    def record_items(self, name: str, count: int):
+        """Ajouter le nombre d'objets renvoyés par une opération"""
+        with self._lock:
+            self._items[name] = self._items.get(name, 0) + count
+
+    def record_error(self, name: str, error: BaseException):
+        """Compter une erreur par opération et par type d'exception"""
+        with self._lock:
+            errors = self._errors.setdefault(name, {})
+            kind = type(error).__name__
+            errors[kind] = errors.get(kind, 0) + 1
+
+    def record_cache(self, resource: str, hit: bool, stale: bool = False):
+        """Compter un accès au cache (succès, échec, ou valeur périmée servie)"""
+        with self._lock:
+            counters = self._cache.setdefault(resource, {"hits": 0, "misses": 0, "stale": 0})
+            counters["hits" if hit else "misses"] += 1
+            if stale:
+                counters["stale"] += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Photographie des mesures
+
+        Returns:
+            Dictionnaire sérialisable en JSON (durées en millisecondes)
+        """
+        with self._lock:
+            timers = {}
+            for name, samples in self._samples.items():
+                ordered = sorted(samples)
+                timers[name] = {
+                    "count": self._counts[name],
+                    "p50_ms": round(_percentile(ordered, 0.50) * 1000, 2),
+                    "p95_ms": round(_percentile(ordered, 0.95) * 1000, 2),
+                    "max_ms": round(self._max[name] * 1000, 2),
+                }
+
+            cache = {}
+            for resource, counters in self._cache.items():
+                total = counters["hits"] + counters["misses"]
+                cache[resource] = dict(counters, hit_ratio=round(counters["hits"] / total, 3) if total else 0.0)
+
+            return {
+                "since": self.started_at.isoformat(timespec="seconds"),
+                "timers": timers,
+                "items": dict(self._items),
+                "errors": {name: dict(errors) for name, errors in self._errors.items()},
+                "cache": cache,
+            }
+
+    def reset(self):
+        """Remettre toutes les mesures à zéro"""
+        with self._lock:
+            self.started_at = datetime.datetime.now()
+            self._samples.clear()
+            self._counts.clear()
+            self._max.clear()
+            self._items.clear()
+            self._errors.clear()
+            self._cache.clear()
+
+
+class MetricsWriter:
+    """Écrit périodiquement une photographie des mesures dans un fichier JSON"""
+
+    def __init__(self, snapshot: Callable[[], Dict[str, Any]], metrics_file: Path, interval_seconds: float):
+        self.snapshot = snapshot
+        self.metrics_file = metrics_file
+        self.interval_seconds = interval_seconds
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        """Démarrer l'écriture périodique en arrière-plan"""
+        self._thread = threading.Thread(target=self._run, name="pronote-metrics", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while not self._stop.wait(self.interval_seconds):
+            self.write()
+
+    def write(self):
+        """Écrire la photographie courante"""
+        try:
+            data = self.snapshot()
+            data["written_at"] = datetime.datetime.now().isoformat(timespec="seconds")
+            with open(self.metrics_file, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, indent=2)
+        except Exception as e:
+            logger.error(f"Erreur écriture métriques: {e}")
+
+    def stop(self):
+        """Arrêter l'écriture périodique (après une dernière écriture)"""
+        if self._thread is None:
+            return
+        self._stop.set()
+        self.write()
+        self._thread = None
@@ -0,0 +1,269 @@
+"""
+Enregistrements compacts pour les données Pronote (cours, devoirs, notes, périodes)
+"""
+import datetime
+from operator import attrgetter
+from typing import Any, Callable, Dict, Iterator, Tuple
+
+NO_SUBJECT = "Aucune matière"
+
+
+class Record:
+    """
+    Enregistrement immuable à slots, consultable comme un dictionnaire
+
+    Les pages continuent d'utiliser record["champ"] et record.get("champ"),
+    sans le coût mémoire d'un dict par élément.
+    """
+
+    __slots__ = ()
+    # Valeurs par défaut des champs absents
+    _defaults: Dict[str, Any] = {}
+    # Champs date/datetime à reconvertir depuis du texte
+    _date_fields: Tuple[str, ...] = ()
+    # Convertisseurs par classe pronotepy (voir from_pronote)
+    _converters: Dict[type, Callable[[Any], "Record"]] = {}
+
+    def __init_subclass__(cls, **kwargs: Any):
+        super().__init_subclass__(**kwargs)
+        # Positions des champs date, pour from_values
+        cls._date_positions = tuple(
+            index for index, name in enumerate(cls.__slots__) if name in cls._date_fields
+        )
+    
+    def __init__(self, *values: Any):
+        for name, value in zip(self.__slots__, values):
+            object.__setattr__(self, name, value)
+
+    def __setattr__(self, name: str, value: Any):
+        raise AttributeError(f"{type(self).__name__} est immuable")
+
+    def __delattr__(self, name: str):
+        raise AttributeError(f"{type(self).__name__} est immuable")
+
+    # --- Vue dictionnaire ---
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        if key not in self.__slots__:
+            return default
+        return getattr(self, key)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.__slots__
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.__slots__)
+
+    def keys(self) -> Tuple[str, ...]:
+        return self.__slots__
+
+    def items(self):
+        return ((name, getattr(self, name)) for name in self.__slots__)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convertir en dictionnaire (export, stockage)"""
+        return {name: getattr(self, name) for name in self.__slots__}
+
+    def replace(self, **changes: Any) -> "Record":
+        """Copie de l'enregistrement avec certains champs modifiés"""
+        values = self.to_dict()
+        values.update(changes)
+        return type(self).from_dict(values)
+
+    # --- Comparaison / affichage ---
+
+    def _values(self) -> tuple:
+        return tuple(getattr(self, name) for name in self.__slots__)
+
+    def __eq__(self, other: object) -> bool:
+        if type(other) is not type(self):
+            return NotImplemented
+        return self._values() == other._values()
+
+    def __hash__(self) -> int:
+        return hash((type(self).__name__, self.get("id")))
+
+    def __repr__(self) -> str:
+        fields = ", ".join(f"{name}={getattr(self, name)!r}" for name in self.__slots__)
+        return f"{type(self).__name__}({fields})"
+
+    # --- Construction ---
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Record":
+        """Construire depuis un dictionnaire (ex: entrée relue du cache)"""
+        values = []
+        for name in cls.__slots__:
+            value = data.get(name, cls._defaults.get(name))
+            if name in cls._date_fields and isinstance(value, str):
+                value = _parse_date(value)
+            values.append(value)
+        return cls(*values)
+
+    @classmethod
+    def from_values(cls, values: list) -> "Record":
+        """Construire depuis les valeurs dans l'ordre des champs (dates en texte ISO acceptées)"""
+        for index in cls._date_positions:
+            value = values[index]
+            if isinstance(value, str):
+                values[index] = _parse_date(value)
+        return cls(*values)
+    
+    @classmethod
+    def from_pronote(cls, obj: Any) -> "Record":
+        """
+        Construire depuis un objet pronotepy
+
+        La présence des attributs optionnels est résolue une seule fois par
+        classe pronotepy: la lecture de chaque champ est choisie puis
+        réutilisée pour chaque objet.
+        """
+        converter = cls._converters.get(type(obj))
+        if converter is None:
+            converter = cls._build_converter(obj)
+            cls._converters[type(obj)] = converter
+        return converter(obj)
+
+    @classmethod
+    def _build_converter(cls, sample: Any) -> Callable[[Any], "Record"]:
+        """Préparer une fonction de conversion sans test d'attribut par objet"""
+        # (écriture directe dans le slot, lecture sur l'objet pronotepy),
+        # l'écriture directe contournant __setattr__ immuable
+        fields = tuple(
+            (getattr(cls, name).__set__, cls._field_getter(sample, name))
+            for name in cls.__slots__
+        )
+        new = object.__new__
+
+        def convert(obj: Any) -> "Record":
+            record = new(cls)
+            for set_field, get_field in fields:
+                set_field(record, get_field(obj))
+            return record
+
+        return convert
+
+    @classmethod
+    def _field_getter(cls, sample: Any, name: str) -> Callable[[Any], Any]:
+        """Fonction lisant un champ sur l'objet pronotepy (ou renvoyant sa valeur par défaut)"""
+        if hasattr(sample, name):
+            return attrgetter(name)
+        return _constant(cls._defaults.get(name))
+
+
+def _parse_date(value: str):
+    """Reconvertir une date ou un datetime stocké en texte"""
+    try:
+        if len(value) == 10:
+            return datetime.date.fromisoformat(value)
+        return datetime.datetime.fromisoformat(value)
+    except ValueError:
+        return value
+
+
+def _constant(value: Any) -> Callable[[Any], Any]:
+    """Lecture d'un champ absent de l'objet pronotepy: toujours la même valeur"""
+    return lambda obj: value
+
+
+def _subject_name(obj: Any) -> str:
+    """Nom de la matière, ou valeur par défaut si l'élément n'en a pas"""
+    return obj.subject.name if obj.subject else NO_SUBJECT
+
+
+class Lesson(Record):
+    """Cours de l'emploi du temps"""
+
+    __slots__ = ("id", "subject", "teacher", "classroom", "start", "end", "status", "background_color")
+    _defaults = {"teacher": "", "classroom": "", "status": "", "background_color": "#6b7280"}
+    _date_fields = ("start", "end")
+    _converters = {}
+
+    @classmethod
+    def _field_getter(cls, sample: Any, name: str) -> Callable[[Any], Any]:
+        if name == "subject":
+            return _subject_name
+        if name == "teacher":
+            return attrgetter("teacher_name") if hasattr(sample, "teacher_name") else _constant("")
+        return super()._field_getter(sample, name)
+
+
+class Homework(Record):
+    """Devoir"""
+
+    __slots__ = ("id", "subject", "description", "done", "date")
+    _defaults = {"description": "", "done": False}
+    _date_fields = ("date",)
+    _converters = {}
+
+    @classmethod
+    def _field_getter(cls, sample: Any, name: str) -> Callable[[Any], Any]:
+        if name == "subject":
+            return _subject_name
+        return super()._field_getter(sample, name)
+
+
+class Grade(Record):
+    """Note"""
+
+    __slots__ = ("id", "grade", "out_of", "subject", "date", "coefficient")
+    _defaults = {"coefficient": 1}
+    _date_fields = ("date",)
+    _converters = {}
+
+    @classmethod
+    def _field_getter(cls, sample: Any, name: str) -> Callable[[Any], Any]:
+        if name == "subject":
+            return _subject_name
+        return super()._field_getter(sample, name)
+
+
+class Period(Record):
+    """Période de notes (trimestre, semestre...), grades à None tant qu'elles ne sont pas chargées"""
+
+    __slots__ = ("id", "name", "grades")
+    _defaults = {"grades": ()}
+    _converters = {}
+
+    @property
+    def loaded(self) -> bool:
+        """Les notes de la période ont-elles été récupérées ?"""
+        return self.grades is not None
+
+    def to_dict(self) -> Dict[str, Any]:
+        values = super().to_dict()
+        if self.grades is not None:
+            values["grades"] = [grade.to_dict() for grade in self.grades]
+        return values
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Period":
+        grades = data.get("grades", ())
+        if grades is not None:
+            grades = tuple(
+                grade if isinstance(grade, Grade) else Grade.from_dict(grade)
+                for grade in grades
+            )
+        return cls(data.get("id"), data.get("name"), grades)
+
+    @classmethod
+    def from_values(cls, values: list) -> "Period":
+        period_id, name, grades = values
+        return cls(period_id, name, tuple(grades) if grades is not None else None)
+    
+    @classmethod
+    def from_pronote(cls, obj: Any) -> "Period":
+        return cls(obj.id, obj.name, tuple(Grade.from_pronote(grade) for grade in obj.grades))
+
+
+def to_records(record_class: type, items: list) -> list:
+    """Convertir sur place une liste relue du cache (dicts) en enregistrements"""
+    for index, item in enumerate(items):
+        if not isinstance(item, record_class):
+            items[index] = record_class.from_dict(item)
+    return items
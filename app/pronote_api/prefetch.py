@@ -0,0 +1,157 @@
+"""
+Préchargement des données Pronote: juste après la connexion, puis au fil de la navigation
+"""
+import collections
+import datetime
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import logging
+
+from app.config import PREFETCH_CANCEL_TIMEOUT, PREFETCH_TIMEOUTS, SCHEDULE_PREFETCH_BUDGET
+from app.pronote_api.client import PronoteClient
+
+logger = logging.getLogger(__name__)
+
+
+class RequestBudget:
+    """
+    Nombre maximal de requêtes spéculatives sur une fenêtre glissante
+
+    Une seule instance (speculative_budget) est partagée par tous les
+    comptes du processus: précharger pour plusieurs comptes ne multiplie
+    pas la charge imposée aux serveurs Pronote.
+    """
+
+    def __init__(self, max_requests: int, period: float = 60.0):
+        """
+        Args:
+            max_requests: Requêtes autorisées par période
+            period: Durée de la fenêtre glissante (secondes)
+        """
+        self.max_requests = max_requests
+        self.period = period
+        self._started: "collections.deque[float]" = collections.deque()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> bool:
+        """
+        Réserver une requête si le budget le permet
+
+        Returns:
+            True si la requête peut être envoyée
+        """
+        now = time.monotonic()
+        with self._lock:
+            while self._started and now - self._started[0] >= self.period:
+                self._started.popleft()
+            if len(self._started) >= self.max_requests:
+                return False
+            self._started.append(now)
+            return True
+
+
+# Budget commun du préchargement pendant la navigation
+speculative_budget = RequestBudget(SCHEDULE_PREFETCH_BUDGET)
+
+
+class Prefetcher:
+    """
+    Remplit le cache en arrière-plan pour que la première page s'affiche immédiatement
+
+    Les requêtes partent l'une après l'autre, dans l'ordre de jobs() (la
+    première page affichée d'abord): une session pronotepy n'en traite de
+    toute façon qu'une à la fois. Une ressource dont le délai est dépassé
+    avant son tour n'est pas demandée.
+    """
+
+    def __init__(self, client: PronoteClient, timeouts: Optional[Dict[str, float]] = None):
+        """
+        Args:
+            client: Client connecté
+            timeouts: {ressource: secondes depuis le lancement} au-delà
+                desquelles la ressource n'est plus demandée
+        """
+        self.client = client
+        self.timeouts = timeouts if timeouts is not None else PREFETCH_TIMEOUTS
+        self.results: Dict[str, bool] = {}
+        self._cancelled = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def jobs(self) -> List[Tuple[str, str, Callable[[], Any]]]:
+        """
+        Liste des requêtes à précharger, par priorité décroissante
+
+        Returns:
+            Liste de (nom, ressource, fonction)
+        """
+        today = datetime.date.today()
+        monday = today - datetime.timedelta(days=today.weekday())
+        next_monday = monday + datetime.timedelta(weeks=1)
+
+        return [
+            ("user_info", "user_info", self.client.get_user_info),
+            ("schedule_current_week", "schedule",
+             lambda: self.client.get_schedule(monday, monday + datetime.timedelta(days=6))),
+            ("homework", "homework", lambda: self.client.get_homework(today)),
+            ("grades", "grades", self.client.get_grades),
+            ("schedule_next_week", "schedule",
+             lambda: self.client.get_schedule(next_monday, next_monday + datetime.timedelta(days=6))),
+        ]
+
+    def start(self):
+        """Lancer le préchargement sans bloquer l'appelant"""
+        self._thread = threading.Thread(target=self.run, name="pronote-prefetch", daemon=True)
+        self._thread.start()
+
+    def run(self) -> Dict[str, bool]:
+        """
+        Précharger les ressources une à une, par ordre de priorité
+
+        Returns:
+            Dictionnaire nom -> succès
+        """
+        started = time.monotonic()
+        for name, resource, fetch in self.jobs():
+            if self._cancelled.is_set():
+                break
+            if time.monotonic() >= started + self.timeouts.get(resource, 30):
+                logger.warning(f"Préchargement {name}: délai dépassé, ressource ignorée")
+                self.results[name] = False
+                continue
+            try:
+                data = fetch()
+            except Exception as e:
+                logger.error(f"Erreur préchargement {name}: {e}")
+                self.results[name] = False
+                continue
+            # Les get_* renvoient une valeur vide sur erreur inattendue
+            error = self.client.last_error
+            if error is not None or data is None:
+                logger.error(f"Erreur préchargement {name}: {error or 'non connecté'}")
+                self.results[name] = False
+            else:
+                self.results[name] = True
+
+        logger.info(
+            f"Préchargement terminé en {time.monotonic() - started:.1f}s "
+            f"({sum(self.results.values())}/{len(self.results)} ressources)"
+        )
+        return self.results
+
+    def cancel(self, timeout: float = PREFETCH_CANCEL_TIMEOUT):
+        """
+        Ne plus lancer de requête et attendre un peu la fin de celle en cours
+
+        Appelée depuis l'interface à la fermeture: un serveur qui ne répond
+        pas ne doit pas la figer. Le thread (daemon) est abandonné au-delà
+        du délai.
+
+        Args:
+            timeout: Attente maximale en secondes
+        """
+        self._cancelled.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout)
+            if self._thread.is_alive():
+                logger.warning(f"Préchargement toujours en cours après {timeout}s, abandonné")
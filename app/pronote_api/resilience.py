@@ -0,0 +1,177 @@
+"""
+Résilience des appels Pronote: classification des erreurs, nouvelles tentatives et disjoncteur
+"""
+import random
+import re
+import threading
+import time
+from typing import Any, Iterator, Optional, Type
+import logging
+
+import pronotepy
+import requests
+
+from app.config import (
+    RETRY_ATTEMPTS,
+    RETRY_BASE_DELAY,
+    RETRY_MAX_DELAY,
+    CIRCUIT_FAILURE_THRESHOLD,
+    CIRCUIT_RESET_SECONDS,
+)
+
+logger = logging.getLogger(__name__)
+
+
+class PronoteError(Exception):
+    """
+    Erreur d'un appel Pronote
+
+    Attributes:
+        stale_data: Dernière donnée connue (expirée) à afficher à la place,
+            ou None si rien n'est en cache
+    """
+
+    def __init__(self, message: str, stale_data: Any = None):
+        super().__init__(message)
+        self.stale_data = stale_data
+
+
+class TransientError(PronoteError):
+    """Erreur passagère (réseau, serveur surchargé): une nouvelle tentative peut réussir"""
+
+
+class AuthError(PronoteError):
+    """Session expirée ou identifiants refusés"""
+
+
+class FatalError(PronoteError):
+    """Erreur qui ne se résoudra pas en réessayant"""
+
+
+class CircuitOpenError(TransientError):
+    """Appel refusé: trop d'échecs récents, le serveur est laissé au repos"""
+
+
+# Codes d'erreur Pronote (voir pronotepy)
+AUTH_ERROR_CODES = {10}          # Session expirée
+RATE_LIMIT_ERROR_CODES = {25}    # Trop de requêtes d'autorisation
+
+HTTP_STATUS_RE = re.compile(r"http status: (\d+)")
+
+
+def classify(error: BaseException) -> Type[PronoteError]:
+    """
+    Classer une exception levée par pronotepy/requests
+
+    Returns:
+        TransientError, AuthError ou FatalError
+    """
+    if isinstance(error, PronoteError):
+        return type(error)
+
+    if isinstance(error, (pronotepy.ExpiredObject, pronotepy.CryptoError, pronotepy.ENTLoginError)):
+        return AuthError
+
+    if isinstance(error, pronotepy.PronoteAPIError):
+        code = error.pronote_error_code
+        if code in AUTH_ERROR_CODES:
+            return AuthError
+        if code in RATE_LIMIT_ERROR_CODES:
+            return TransientError
+
+        message = str(error)
+        match = HTTP_STATUS_RE.search(message)
+        if match:
+            status = int(match.group(1))
+            return TransientError if status >= 500 or status == 429 else FatalError
+        if "JSONDecodeError" in message:
+            return TransientError
+        return FatalError
+
+    if isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout,
+                          requests.exceptions.ChunkedEncodingError, ConnectionError, TimeoutError)):
+        return TransientError
+
+    return FatalError
+
+
+class RetryPolicy:
+    """Délais d'attente exponentiels avec gigue (« full jitter »)"""
+
+    def __init__(self, attempts: int = RETRY_ATTEMPTS, base_delay: float = RETRY_BASE_DELAY,
+                 max_delay: float = RETRY_MAX_DELAY):
+        self.attempts = attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+
+    def delays(self) -> Iterator[float]:
+        """Délais à attendre avant chaque nouvelle tentative"""
+        for attempt in range(self.attempts - 1):
+            yield random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur: après plusieurs échecs consécutifs, les appels sont refusés
+    pendant un moment, puis un appel d'essai est autorisé (semi-ouvert)
+
+    Un seul appel d'essai à la fois: les autres restent refusés jusqu'à
+    son résultat (record_success, record_failure ou release_trial).
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+                 reset_seconds: float = CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.state = self.CLOSED
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_in_flight = False
+        self._lock = threading.Lock()
+
+    def allow(self) -> bool:
+        """Un appel peut-il être tenté ?"""
+        with self._lock:
+            if self.state == self.OPEN:
+                if time.monotonic() - self.opened_at < self.reset_seconds:
+                    return False
+                self.state = self.HALF_OPEN
+                logger.info("Disjoncteur semi-ouvert: appel d'essai")
+            if self.state == self.HALF_OPEN:
+                if self._trial_in_flight:
+                    return False
+                self._trial_in_flight = True
+            return True
+
+    def release_trial(self):
+        """L'appel d'essai s'est terminé sans renseigner sur le serveur: en autoriser un autre"""
+        with self._lock:
+            self._trial_in_flight = False
+
+    def record_success(self):
+        """Un appel a réussi: refermer le disjoncteur"""
+        with self._lock:
+            self._trial_in_flight = False
+            if self.state != self.CLOSED:
+                logger.info("Disjoncteur refermé")
+            self.state = self.CLOSED
+            self.failures = 0
+            self.opened_at = None
+
+    def record_failure(self):
+        """Un appel a échoué: ouvrir le disjoncteur au-delà du seuil"""
+        with self._lock:
+            self._trial_in_flight = False
+            self.failures += 1
+            if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    logger.warning(
+                        f"Disjoncteur ouvert après {self.failures} échecs "
+                        f"(pause de {self.reset_seconds}s)"
+                    )
+                self.state = self.OPEN
+                self.opened_at = time.monotonic()
@@ -0,0 +1,248 @@
+"""
+Pool de sessions Pronote pour plusieurs comptes (parent, enfants, établissements)
+"""
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Set, Tuple
+import logging
+
+from app.config import (
+    SESSION_POOL_FAN_OUT,
+    SESSION_POOL_MAX,
+    SESSION_POOL_MAX_LOGINS,
+    SESSION_POOL_IDLE_SECONDS,
+)
+from app.pronote_api.cache import Cache, open_cache
+from app.pronote_api.client import PronoteClient
+from app.pronote_api.ttl import AdaptiveTTL
+
+logger = logging.getLogger(__name__)
+
+# (url, nom d'utilisateur, enfant)
+SessionKey = Tuple[str, str, Optional[str]]
+
+
+class SessionPool:
+    """Garde plusieurs clients Pronote connectés et les réutilise"""
+
+    def __init__(self, cache: Optional[Cache] = None, max_sessions: int = SESSION_POOL_MAX,
+                 max_concurrent_logins: int = SESSION_POOL_MAX_LOGINS,
+                 idle_seconds: float = SESSION_POOL_IDLE_SECONDS,
+                 ttl_policy: Optional[AdaptiveTTL] = None):
+        self.cache = cache if cache is not None else open_cache()
+        # Partagée par toutes les sessions (None: une par client)
+        self.ttl_policy = ttl_policy
+        self.max_sessions = max_sessions
+        self.idle_seconds = idle_seconds
+        # Ordre LRU: la session la moins récemment utilisée en premier
+        self._sessions: "OrderedDict[SessionKey, PronoteClient]" = OrderedDict()
+        self._last_used: Dict[SessionKey, float] = {}
+        # Sessions jamais fermées automatiquement (ex: session de la fenêtre principale)
+        self._pinned: Set[SessionKey] = set()
+        self._lock = threading.RLock()
+        self._login_slots = threading.BoundedSemaphore(max_concurrent_logins)
+        # Connexions en cours, partagées par les appels concurrents pour la même clé
+        self._logins: Dict[SessionKey, "Future[Tuple[Optional[PronoteClient], str]]"] = {}
+
+    def get(self, url: str, username: str, child: Optional[str] = None) -> Optional[PronoteClient]:
+        """Récupérer une session déjà ouverte (et la marquer comme utilisée)"""
+        key = (url, username, child)
+        with self._lock:
+            self._prune()
+            client = self._sessions.get(key)
+            if client is None:
+                return None
+            self._touch(key)
+            return client
+
+    def acquire(self, url: str, username: str, password: Optional[str] = None,
+                credentials: Optional[Dict[str, Any]] = None,
+                child: Optional[str] = None, client: Optional[PronoteClient] = None,
+                pinned: bool = False) -> Tuple[Optional[PronoteClient], str]:
+        """
+        Obtenir une session, en réutilisant une session ouverte si possible
+
+        Deux appels simultanés pour la même clé ne se connectent qu'une fois:
+        le second attend la connexion du premier et en reçoit le résultat.
+
+        Args:
+            url: URL de Pronote
+            username: Nom d'utilisateur
+            password: Mot de passe (connexion classique)
+            credentials: Credentials exportés (connexion par token)
+            child: Nom de l'enfant (compte parent)
+            client: Client à connecter (par défaut un nouveau client
+                partageant le cache du pool)
+            pinned: Ne jamais fermer cette session automatiquement
+
+        Returns:
+            (client ou None, message)
+        """
+        key = (url, username, child)
+        with self._lock:
+            existing = self.get(url, username, child)
+            if existing is not None:
+                if pinned:
+                    self._pinned.add(key)
+                return existing, "Session réutilisée"
+            pending = self._logins.get(key)
+            leader = pending is None
+            if leader:
+                pending = self._logins[key] = Future()
+
+        if not leader:
+            return pending.result()
+
+        try:
+            result = self._login(key, password, credentials, client, pinned)
+            pending.set_result(result)
+            return result
+        except BaseException as e:
+            pending.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                self._logins.pop(key, None)
+
+    def _login(self, key: SessionKey, password: Optional[str],
+               credentials: Optional[Dict[str, Any]], client: Optional[PronoteClient],
+               pinned: bool) -> Tuple[Optional[PronoteClient], str]:
+        """Ouvrir une session puis l'enregistrer dans le pool"""
+        url, username, child = key
+        if client is None:
+            client = PronoteClient(cache=self.cache, ttl_policy=self.ttl_policy)
+        # Limiter le nombre de connexions simultanées au serveur
+        with self._login_slots:
+            if credentials:
+                success, message = client.login_with_token(credentials, child=child)
+            else:
+                success, message = client.login(url, username, password or "", child=child)
+
+        if not success:
+            return None, message
+
+        with self._lock:
+            if pinned:
+                self._pinned.add(key)
+            removed = self._store(key, client)
+        self._close(removed)
+        return client, message
+
+    def _store(self, key: SessionKey, client: PronoteClient) -> List[Tuple[SessionKey, PronoteClient]]:
+        """
+        Insérer une session puis appliquer les limites du pool (sous verrou)
+
+        Returns:
+            Sessions retirées du pool, à fermer une fois le verrou relâché
+        """
+        removed = []
+        previous = self._sessions.get(key)
+        if previous is not None and previous is not client:
+            removed.append((key, previous))
+        self._sessions[key] = client
+        self._touch(key)
+        return removed + self._over_limits()
+
+    def _touch(self, key: SessionKey):
+        """Marquer une session comme la plus récemment utilisée"""
+        self._sessions.move_to_end(key)
+        self._last_used[key] = time.monotonic()
+
+    def _prune(self):
+        """Oublier les sessions déconnectées hors du pool (ex: PronoteClient.logout())"""
+        for key in [key for key, client in self._sessions.items() if not client.logged_in]:
+            del self._sessions[key]
+            self._last_used.pop(key, None)
+            self._pinned.discard(key)
+
+    def _take(self, key: SessionKey) -> Optional[PronoteClient]:
+        """Retirer une session du pool sans la fermer (sous verrou)"""
+        client = self._sessions.pop(key, None)
+        self._last_used.pop(key, None)
+        self._pinned.discard(key)
+        return client
+
+    def _over_limits(self) -> List[Tuple[SessionKey, PronoteClient]]:
+        """Retirer les sessions inactives et les plus anciennes au-delà de la limite (sous verrou)"""
+        self._prune()
+        now = time.monotonic()
+        removed = []
+        for key in [key for key in self._sessions if key not in self._pinned]:
+            if now - self._last_used.get(key, now) > self.idle_seconds:
+                removed.append((key, self._take(key)))
+        evictable = [key for key in self._sessions if key not in self._pinned]
+        while len(self._sessions) > self.max_sessions and evictable:
+            key = evictable.pop(0)
+            removed.append((key, self._take(key)))
+        return removed
+
+    @staticmethod
+    def _close(removed: List[Tuple[SessionKey, PronoteClient]]):
+        """Fermer des sessions retirées du pool (hors verrou: la déconnexion interroge le serveur)"""
+        for key, client in removed:
+            logger.info(f"Fermeture de la session {key[1]} ({key[2] or 'compte principal'})")
+            client.close()
+            client.logout(clear_cache=False)
+
+    def evict(self):
+        """Fermer les sessions inactives et les plus anciennes au-delà de la limite"""
+        with self._lock:
+            removed = self._over_limits()
+        self._close(removed)
+
+    def release(self, key: SessionKey):
+        """Fermer une session et la retirer du pool"""
+        with self._lock:
+            client = self._take(key)
+        if client is not None:
+            self._close([(key, client)])
+
+    def keys(self) -> List[SessionKey]:
+        """Liste des sessions ouvertes"""
+        with self._lock:
+            return list(self._sessions)
+
+    def fan_out(self, method: str, *args: Any, **kwargs: Any) -> Dict[SessionKey, Any]:
+        """
+        Exécuter la même requête get_* sur toutes les sessions ouvertes
+
+        Au plus SESSION_POOL_FAN_OUT requêtes partent en même temps: les
+        serveurs Pronote limitent les appels simultanés.
+
+        Args:
+            method: Nom de la méthode de PronoteClient (ex: "get_homework")
+
+        Returns:
+            Dictionnaire clé de session -> résultat (None en cas d'erreur)
+        """
+        with self._lock:
+            self._prune()
+            sessions = list(self._sessions.items())
+            for key, _ in sessions:
+                self._touch(key)
+
+        if not sessions:
+            return {}
+
+        workers = min(len(sessions), SESSION_POOL_FAN_OUT)
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="pronote-pool") as executor:
+            futures = {
+                key: executor.submit(getattr(client, method), *args, **kwargs)
+                for key, client in sessions
+            }
+
+            results = {}
+            for key, future in futures.items():
+                try:
+                    results[key] = future.result()
+                except Exception as e:
+                    logger.error(f"Erreur {method} pour {key[1]}: {e}")
+                    results[key] = None
+            return results
+
+    def close_all(self):
+        """Fermer toutes les sessions"""
+        for key in self.keys():
+            self.release(key)
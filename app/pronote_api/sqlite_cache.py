@@ -0,0 +1,547 @@
+"""
+Cache local des données Pronote stocké dans SQLite (mode WAL)
+"""
+import datetime
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+import logging
+
+from app.config import (
+    CACHE_DURABILITY,
+    CACHE_FLUSH_DELAY,
+    CACHE_FLUSH_MAX_DELAY,
+    CACHE_LOCK_TIMEOUT,
+    CACHE_PURGE_INTERVAL,
+    CACHE_STALE_RETENTION_HOURS,
+)
+from app.pronote_api import codec
+from app.pronote_api.cache_keys import is_past_range
+from app.pronote_api.cache_stats import summarize
+from app.pronote_api.eviction import CacheBudget, namespace_of
+from app.pronote_api.write_behind import WriteBehind
+
+logger = logging.getLogger(__name__)
+
+# Début d'un cache.json au format indexé (voir cache.FILE_MAGIC)
+FILE_MAGIC = b"PCACHE1"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS entries (
+    key TEXT PRIMARY KEY,
+    timestamp REAL NOT NULL,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_timestamp ON entries (timestamp);
+"""
+
+
+def prefix_range(prefix: str) -> Tuple[str, tuple]:
+    """
+    Condition SQL sur les clés commençant par un préfixe, utilisable par l'index de key
+
+    Les clés du préfixe sont celles comprises entre le préfixe et le même
+    texte dont le dernier caractère est incrémenté (l'ordre des chaînes
+    UTF-8 de SQLite suit celui des caractères).
+
+    Returns:
+        (condition, paramètres)
+    """
+    if not prefix:
+        return "1", ()
+    return "key >= ? AND key < ?", (prefix, prefix[:-1] + chr(ord(prefix[-1]) + 1))
+
+
+# Colonnes ajoutées après la première version du schéma
+EXTRA_COLUMNS = {
+    "namespace": "TEXT NOT NULL DEFAULT ''",
+    "size": "INTEGER NOT NULL DEFAULT 0",
+    "last_access": "REAL NOT NULL DEFAULT 0",
+}
+
+
+class SQLiteCache:
+    """
+    Cache clé/valeur dans une base SQLite
+
+    Même interface que Cache (get/set/clear/is_valid), mais chaque écriture
+    ne touche que sa propre clé et rien n'est chargé au démarrage. Plusieurs
+    processus peuvent partager la base: SQLite verrouille et fusionne clé
+    par clé.
+    """
+
+    def __init__(self, db_file: Path, legacy_file: Optional[Path] = None,
+                 durability: str = CACHE_DURABILITY):
+        """
+        Args:
+            db_file: Fichier de la base SQLite
+            legacy_file: Ancien cache JSON à importer une seule fois
+            durability: "immediate" (écriture à chaque modification) ou
+                "write_behind" (écritures regroupées en une transaction)
+        """
+        self.db_file = db_file
+        # Une seule connexion partagée entre le worker Pronote et le préchargement
+        self._lock = threading.RLock()
+        try:
+            self._conn = self._connect()
+        except sqlite3.DatabaseError as e:
+            # Base corrompue: la mettre de côté et repartir d'une base vide
+            logger.warning(f"Cache SQLite corrompu ({e}), reconstruction")
+            for suffix in ("", "-wal", "-shm"):
+                path = db_file.with_name(db_file.name + suffix)
+                if path.exists():
+                    path.replace(path.with_name(path.name + ".corrupt"))
+            self._conn = self._connect()
+        
+        # Écritures en attente: clé -> (timestamp, valeur), ou None pour une suppression
+        self._pending: Dict[str, Optional[Tuple[float, Any]]] = {}
+        # Derniers accès en lecture, enregistrés avec les écritures
+        self._accessed: Dict[str, float] = {}
+        self._writer: Optional[WriteBehind] = None
+        if durability == "write_behind":
+            self._writer = WriteBehind(self.flush, CACHE_FLUSH_DELAY, CACHE_FLUSH_MAX_DELAY)
+        
+        self.budget = CacheBudget()
+        self.evictions = {"lru": 0, "quota": 0, "expired": 0}
+        self._last_purge = time.monotonic()
+        # Octets de données écrits dans la base depuis l'ouverture
+        self.bytes_written = 0
+
+        if legacy_file is not None and legacy_file.exists():
+            self._migrate(legacy_file)
+
+    def _connect(self) -> sqlite3.Connection:
+        """
+        Ouvrir la base et créer ou mettre à jour son schéma
+
+        Aucune vérification complète ici (elle parcourt toute la base):
+        un fichier illisible échoue dès les premières instructions, le
+        reste est vérifié par verify() et l'outil de maintenance.
+
+        Raises:
+            sqlite3.DatabaseError: Fichier qui n'est pas une base valide
+        """
+        # Un autre processus peut tenir le verrou d'écriture: patienter plutôt qu'échouer
+        conn = sqlite3.connect(
+            str(self.db_file), timeout=CACHE_LOCK_TIMEOUT, check_same_thread=False, isolation_level=None
+        )
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.executescript(SCHEMA)
+            self._conn = conn
+            self._upgrade_schema()
+        except sqlite3.DatabaseError:
+            conn.close()
+            raise
+        return conn
+
+    def _upgrade_schema(self):
+        """Ajouter les colonnes manquantes d'une base créée par une version précédente"""
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(entries)")}
+        for name, definition in EXTRA_COLUMNS.items():
+            if name not in columns:
+                self._conn.execute(f"ALTER TABLE entries ADD COLUMN {name} {definition}")
+                if name == "namespace":
+                    for (key,) in self._conn.execute("SELECT key FROM entries").fetchall():
+                        self._conn.execute(
+                            "UPDATE entries SET namespace = ? WHERE key = ?", (namespace_of(key), key)
+                        )
+                elif name == "size":
+                    self._conn.execute("UPDATE entries SET size = length(data)")
+                elif name == "last_access":
+                    self._conn.execute("UPDATE entries SET last_access = timestamp")
+
+    def _migrate(self, legacy_file: Path):
+        """Importer un cache.json existant puis le renommer pour ne pas le réimporter"""
+        try:
+            with open(legacy_file, 'rb') as f:
+                text = f.read()
+            if text.startswith(FILE_MAGIC):
+                legacy = self._read_indexed(legacy_file)
+            else:
+                try:
+                    legacy = codec.decode(text.decode("utf-8"))
+                except codec.CodecVersionError:
+                    # Fichier écrit avant le format versionné
+                    legacy = json.loads(text)
+
+            rows = []
+            for key, entry in legacy.items():
+                try:
+                    timestamp = datetime.datetime.fromisoformat(entry["timestamp"]).timestamp()
+                except (KeyError, TypeError, ValueError):
+                    continue
+                data = codec.encode(entry.get("data"))
+                rows.append((key, timestamp, data, namespace_of(key), len(data), timestamp))
+
+            with self._lock:
+                self._conn.execute("BEGIN")
+                # Une entrée déjà présente dans la base est plus récente
+                self._conn.executemany(
+                    "INSERT OR IGNORE INTO entries (key, timestamp, data, namespace, size, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", rows
+                )
+                self._conn.execute("COMMIT")
+
+            legacy_file.replace(legacy_file.with_name(legacy_file.name + ".migrated"))
+            logger.info(f"Cache JSON migré vers SQLite ({len(rows)} entrées)")
+        except Exception as e:
+            logger.error(f"Erreur migration cache JSON: {e}")
+
+    @staticmethod
+    def _read_indexed(legacy_file: Path) -> Dict[str, Dict[str, Any]]:
+        """Lire un cache JSON au format indexé (entrées décodées une à une)"""
+        # Import local: cache.py importe ce module
+        from app.pronote_api.cache import Cache
+        legacy_cache = Cache(legacy_file, durability="immediate")
+        try:
+            return {
+                key: {
+                    "timestamp": legacy_cache.cache_data[key]["timestamp"],
+                    "data": legacy_cache.get(key, float("inf")),
+                }
+                for key in legacy_cache.keys()
+            }
+        finally:
+            legacy_cache.close()
+
+    def get(self, key: str, max_age_minutes: float = 30) -> Optional[Any]:
+        """
+        Récupérer une valeur du cache si elle n'est pas expirée
+
+        Args:
+            key: Clé du cache
+            max_age_minutes: Durée de validité en minutes
+
+        Returns:
+            Valeur du cache ou None si expiré/inexistant
+        """
+        return self.lookup(key, max_age_minutes)[0]
+
+    def lookup(self, key: str, max_age_minutes: float = 30, grace_minutes: float = 0) -> Tuple[Optional[Any], bool]:
+        """
+        Récupérer une valeur, en acceptant une entrée expirée depuis peu
+
+        Args:
+            key: Clé du cache
+            max_age_minutes: Durée de validité en minutes
+            grace_minutes: Délai après expiration pendant lequel la valeur
+                est encore renvoyée, marquée périmée
+
+        Returns:
+            (valeur ou None, périmée)
+        """
+        try:
+            with self._lock:
+                pending = key in self._pending
+                if pending:
+                    row = self._pending[key]
+                else:
+                    row = self._conn.execute(
+                        "SELECT timestamp, data FROM entries WHERE key = ?", (key,)
+                    ).fetchone()
+                if row is not None:
+                    self._accessed[key] = time.time()
+            if row is None:
+                return None, False
+
+            timestamp, data = row
+            age_minutes = (time.time() - timestamp) / 60
+            if age_minutes > max_age_minutes + grace_minutes:
+                logger.debug(f"Cache expiré pour {key} (âge: {age_minutes:.1f} min)")
+                return None, False
+
+            # Une écriture en attente n'est pas encore sérialisée
+            return (data if pending else codec.decode(data)), age_minutes > max_age_minutes
+
+        except codec.CodecVersionError:
+            logger.debug(f"Entrée {key} écrite dans un ancien format, supprimée")
+            self.clear(key)
+            return None, False
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Entrée {key} corrompue ({e}), supprimée")
+            self.clear(key)
+            return None, False
+        except Exception as e:
+            logger.error(f"Erreur lecture cache: {e}")
+            return None, False
+
+    def set(self, key: str, value: Any):
+        """
+        Stocker une valeur dans le cache
+
+        Args:
+            key: Clé du cache
+            value: Valeur à stocker
+        """
+        with self._lock:
+            self._pending[key] = (time.time(), value)
+        self._schedule_flush()
+
+    def _schedule_flush(self):
+        """Écrire tout de suite ou laisser l'écriture différée regrouper"""
+        if self._writer is None:
+            self.flush()
+        else:
+            self._writer.mark_dirty()
+
+    def flush(self):
+        """Écrire les modifications en attente en une seule transaction"""
+        with self._lock:
+            if not self._pending and not self._accessed:
+                return
+            try:
+                updates = []
+                for key, entry in self._pending.items():
+                    if entry is None:
+                        continue
+                    data = codec.encode(entry[1])
+                    updates.append((key, entry[0], data, namespace_of(key), len(data), entry[0]))
+                deletions = [(key,) for key, entry in self._pending.items() if entry is None]
+                accesses = [(at, key) for key, at in self._accessed.items()]
+
+                self._conn.execute("BEGIN")
+                self._conn.executemany("DELETE FROM entries WHERE key = ?", deletions)
+                self._conn.executemany(
+                    "INSERT OR REPLACE INTO entries (key, timestamp, data, namespace, size, last_access) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", updates
+                )
+                self._conn.executemany("UPDATE entries SET last_access = ? WHERE key = ?", accesses)
+                if updates:
+                    self._enforce_budget()
+                    self._maybe_purge()
+                self._conn.execute("COMMIT")
+                self._pending.clear()
+                self._accessed.clear()
+                self.bytes_written += sum(update[4] for update in updates)
+            except Exception as e:
+                logger.error(f"Erreur sauvegarde cache: {e}")
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+
+    def _enforce_budget(self):
+        """Évincer les entrées les moins récemment utilisées au-delà du budget"""
+        counts = dict(self._conn.execute("SELECT namespace, COUNT(*) FROM entries GROUP BY namespace"))
+        total_bytes = self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM entries").fetchone()[0]
+        if not self.budget.exceeded(sum(counts.values()), total_bytes, counts):
+            return
+
+        entries = self._conn.execute("SELECT key, namespace, size, last_access FROM entries").fetchall()
+        victims = self.budget.victims(entries)
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", [(key,) for key, _ in victims])
+        for key, reason in victims:
+            self.evictions[reason] += 1
+            logger.debug(f"Cache: éviction de {key} ({reason})")
+
+    def _maybe_purge(self):
+        """Purger régulièrement les entrées expirées depuis trop longtemps"""
+        if time.monotonic() - self._last_purge < CACHE_PURGE_INTERVAL:
+            return
+        self._last_purge = time.monotonic()
+        self._delete_older_than(time.time() - CACHE_STALE_RETENTION_HOURS * 3600)
+
+    def _delete_older_than(self, limit: float) -> int:
+        """Supprimer les entrées écrites avant limit, sauf les périodes passées (verrou déjà pris)"""
+        rows = self._conn.execute("SELECT key FROM entries WHERE timestamp < ?", (limit,)).fetchall()
+        expired = [(key,) for (key,) in rows if not is_past_range(key)]
+        self._conn.executemany("DELETE FROM entries WHERE key = ?", expired)
+        self.evictions["expired"] += len(expired)
+        return len(expired)
+
+    def clear(self, key: Optional[str] = None):
+        """
+        Vider le cache
+
+        Args:
+            key: Clé spécifique à vider, ou None pour tout vider
+        """
+        with self._lock:
+            if key:
+                self._pending[key] = None
+            else:
+                self._pending.clear()
+                self._accessed.clear()
+                self._conn.execute("DELETE FROM entries")
+        if key:
+            self._schedule_flush()
+
+    def clear_prefix(self, prefix: str) -> int:
+        """
+        Supprimer toutes les entrées dont la clé commence par un préfixe
+
+        Args:
+            prefix: Début des clés (ex: cache_keys.account_prefix pour un compte)
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        condition, params = prefix_range(prefix)
+        # Écritures en attente et base purgées ensemble: une écriture
+        # différée ne peut pas faire réapparaître une entrée supprimée
+        with self._lock:
+            keys = self.keys(prefix)
+            for key in [key for key in self._pending if key.startswith(prefix)]:
+                del self._pending[key]
+            for key in keys:
+                self._accessed.pop(key, None)
+            self._conn.execute(f"DELETE FROM entries WHERE {condition}", params)
+        return len(keys)
+
+    def keys(self, prefix: str = "") -> List[str]:
+        """
+        Clés présentes dans le cache (expirées comprises)
+
+        Args:
+            prefix: Ne garder que les clés commençant par ce préfixe
+        """
+        condition, params = prefix_range(prefix)
+        with self._lock:
+            rows = self._conn.execute(f"SELECT key FROM entries WHERE {condition}", params).fetchall()
+            keys = {row[0] for row in rows}
+            for key, entry in self._pending.items():
+                if not key.startswith(prefix):
+                    continue
+                if entry is None:
+                    keys.discard(key)
+                else:
+                    keys.add(key)
+        return sorted(keys)
+
+    def age_minutes(self, key: str) -> Optional[float]:
+        """
+        Âge d'une entrée (expirée comprise)
+
+        Returns:
+            Minutes écoulées depuis son écriture, ou None si elle est absente
+        """
+        with self._lock:
+            if key in self._pending:
+                entry = self._pending[key]
+                timestamp = None if entry is None else entry[0]
+            else:
+                row = self._conn.execute("SELECT timestamp FROM entries WHERE key = ?", (key,)).fetchone()
+                timestamp = None if row is None else row[0]
+        if timestamp is None:
+            return None
+        return (time.time() - timestamp) / 60
+
+    def is_valid(self, key: str, max_age_minutes: float = 30) -> bool:
+        """
+        Vérifier si une entrée du cache est valide
+
+        Args:
+            key: Clé du cache
+            max_age_minutes: Durée de validité en minutes
+
+        Returns:
+            True si valide, False sinon
+        """
+        limit = time.time() - max_age_minutes * 60
+        with self._lock:
+            if key in self._pending:
+                entry = self._pending[key]
+                return entry is not None and entry[0] >= limit
+            row = self._conn.execute(
+                "SELECT 1 FROM entries WHERE key = ? AND timestamp >= ?", (key, limit)
+            ).fetchone()
+        return row is not None
+
+    def purge_expired(self, max_age_minutes: float) -> int:
+        """
+        Supprimer les entrées plus anciennes qu'une durée
+
+        Les périodes entièrement passées ne changent plus: elles sont gardées
+        (le budget du cache les évince si la place manque).
+
+        Args:
+            max_age_minutes: Âge maximal conservé en minutes
+
+        Returns:
+            Nombre d'entrées supprimées
+        """
+        self.flush()
+        with self._lock:
+            self._conn.execute("BEGIN")
+            count = self._delete_older_than(time.time() - max_age_minutes * 60)
+            self._conn.execute("COMMIT")
+        return count
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Contenu du cache et activité depuis son ouverture
+
+        Returns:
+            Résumé par espace de noms (voir cache_stats.summarize) complété
+            de backend, file, file_bytes, evictions et bytes_written
+        """
+        self.flush()
+        with self._lock:
+            entries = self._conn.execute("SELECT key, size, timestamp FROM entries").fetchall()
+        stats = summarize(entries)
+        stats.update(
+            backend="sqlite",
+            file=str(self.db_file),
+            file_bytes=sum(
+                path.stat().st_size
+                for path in (self.db_file, self.db_file.with_name(self.db_file.name + "-wal"))
+                if path.exists()
+            ),
+            evictions=dict(self.evictions),
+            bytes_written=self.bytes_written,
+        )
+        return stats
+
+    def compact(self) -> Tuple[int, int]:
+        """
+        Appliquer le budget, vider le journal WAL et reconstruire la base (VACUUM)
+
+        Returns:
+            (taille avant, taille après) en octets, journal compris
+        """
+        before = self.stats()["file_bytes"]
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._enforce_budget()
+            self._conn.execute("COMMIT")
+            self._conn.execute("VACUUM")
+            # VACUUM passe par le journal: le reporter dans la base puis le vider
+            self._conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+        return before, self.stats()["file_bytes"]
+
+    def verify(self, repair: bool = False) -> Dict[str, str]:
+        """
+        Vérifier l'intégrité de la base puis décoder toutes les entrées
+
+        Args:
+            repair: Supprimer les entrées illisibles
+
+        Returns:
+            {clé: erreur} des entrées illisibles ("<base>" pour la base elle-même)
+        """
+        self.flush()
+        problems = {}
+        with self._lock:
+            checks = [row[0] for row in self._conn.execute("PRAGMA integrity_check")]
+            if checks != ["ok"]:
+                problems["<base>"] = "; ".join(checks)
+            for key, data in self._conn.execute("SELECT key, data FROM entries").fetchall():
+                try:
+                    codec.decode(data)
+                except Exception as e:
+                    problems[key] = f"{type(e).__name__}: {e}"
+            if repair:
+                self._conn.executemany(
+                    "DELETE FROM entries WHERE key = ?", [(key,) for key in problems if key != "<base>"]
+                )
+        return problems
+
+    def close(self):
+        """Écrire les modifications en attente puis fermer la connexion à la base"""
+        if self._writer is not None:
+            self._writer.close()
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,176 @@
+"""
+Durées de validité adaptatives du cache, apprises de la fréquence réelle des changements
+"""
+import datetime
+import hashlib
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+import logging
+
+from app.config import (
+    CACHE_DURATION_MINUTES,
+    CACHE_TTL_BOUNDS,
+    CACHE_TTL_GROWTH,
+    CACHE_TTL_SHRINK,
+    CACHE_TTL_PINNED_MINUTES,
+    CACHE_TTL_STATE_RETENTION_DAYS,
+)
+from app.pronote_api import codec
+from app.pronote_api.cache_keys import is_past_range
+from app.pronote_api.eviction import namespace_of
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(data: Any) -> str:
+    """Empreinte d'une valeur, indépendante de l'objet Python qui la porte"""
+    return hashlib.blake2b(codec.encode(data).encode("utf-8"), digest_size=16).hexdigest()
+
+
+class AdaptiveTTL:
+    """
+    Durée de validité par clé, ajustée à chaque rafraîchissement
+
+    Une valeur rafraîchie identique à la précédente allonge la durée de
+    CACHE_TTL_GROWTH, une valeur modifiée la raccourcit de CACHE_TTL_SHRINK,
+    toujours dans les bornes CACHE_TTL_BOUNDS du type de donnée. Une période
+    entièrement passée (emploi du temps des semaines écoulées) ne change
+    plus: elle reçoit CACHE_TTL_PINNED_MINUTES.
+    """
+
+    def __init__(self, state_file: Optional[Path] = None):
+        """
+        Args:
+            state_file: Fichier où garder l'apprentissage entre deux lancements
+        """
+        self.state_file = state_file
+        self._lock = threading.Lock()
+        # {clé: {"hash", "ttl" (minutes), "checks", "changes", "checked_at"}}
+        self._state: Dict[str, Dict[str, Any]] = self._load()
+
+    def _load(self) -> Dict[str, Dict[str, Any]]:
+        """Relire l'apprentissage du lancement précédent"""
+        if self.state_file is None or not self.state_file.exists():
+            return {}
+        try:
+            with open(self.state_file, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning(f"Durées de cache apprises illisibles, ignorées: {e}")
+            return {}
+
+    def save(self):
+        """Enregistrer l'apprentissage (les clés inutilisées depuis longtemps sont oubliées)"""
+        if self.state_file is None:
+            return
+        limit = time.time() - CACHE_TTL_STATE_RETENTION_DAYS * 86400
+        with self._lock:
+            self._state = {key: item for key, item in self._state.items() if item["checked_at"] >= limit}
+            text = json.dumps(self._state, separators=(",", ":"))
+        temp_file = self.state_file.with_name(f"{self.state_file.name}.{os.getpid()}.tmp")
+        try:
+            with open(temp_file, 'w', encoding='utf-8') as f:
+                f.write(text)
+            os.replace(temp_file, self.state_file)
+        except Exception as e:
+            logger.error(f"Erreur sauvegarde des durées de cache: {e}")
+
+    @staticmethod
+    def _bounds(resource: str) -> tuple:
+        """(minimum, maximum) en minutes de la durée d'un type de ressource"""
+        base = CACHE_DURATION_MINUTES.get(resource, 30)
+        return CACHE_TTL_BOUNDS.get(resource, (base, base))
+
+    def minutes(self, resource: str, key: str, today: Optional[datetime.date] = None) -> float:
+        """
+        Durée de validité actuelle d'une clé
+
+        Args:
+            resource: Type de ressource (clé de CACHE_DURATION_MINUTES)
+            key: Clé du cache
+            today: Date du jour (aujourd'hui par défaut)
+
+        Returns:
+            Durée en minutes
+        """
+        if is_past_range(key, today):
+            return CACHE_TTL_PINNED_MINUTES
+        with self._lock:
+            item = self._state.get(key)
+        if item is None:
+            return CACHE_DURATION_MINUTES.get(resource, 30)
+        low, high = self._bounds(resource)
+        return min(max(item["ttl"], low), high)
+
+    def observe(self, resource: str, key: str, data: Any) -> bool:
+        """
+        Enregistrer une valeur fraîchement récupérée et ajuster la durée de la clé
+
+        Args:
+            resource: Type de ressource
+            key: Clé du cache
+            data: Valeur renvoyée par Pronote
+
+        Returns:
+            True si la valeur diffère de la précédente (ou est nouvelle)
+        """
+        digest = content_hash(data)
+        low, high = self._bounds(resource)
+        with self._lock:
+            item = self._state.get(key)
+            if item is None:
+                self._state[key] = {
+                    "hash": digest,
+                    "ttl": CACHE_DURATION_MINUTES.get(resource, 30),
+                    "checks": 1,
+                    "changes": 0,
+                    "checked_at": time.time(),
+                }
+                return True
+
+            changed = item["hash"] != digest
+            factor = CACHE_TTL_SHRINK if changed else CACHE_TTL_GROWTH
+            item["ttl"] = min(max(item["ttl"] * factor, low), high)
+            item["hash"] = digest
+            item["checks"] += 1
+            item["changes"] += changed
+            item["checked_at"] = time.time()
+        if changed:
+            logger.debug(f"{key} a changé, validité ramenée à {item['ttl']:.0f} min")
+        return changed
+
+    def forget(self, prefix: str):
+        """Oublier l'apprentissage des clés commençant par un préfixe (déconnexion)"""
+        with self._lock:
+            for key in [key for key in self._state if key.startswith(prefix)]:
+                del self._state[key]
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Résumé par type de ressource
+
+        Returns:
+            {ressource: {keys, ttl_min, ttl_max, ttl_mean (minutes), change_ratio}}
+            où change_ratio est la part des rafraîchissements qui ont changé la valeur
+        """
+        by_resource: Dict[str, list] = {}
+        with self._lock:
+            for key, item in self._state.items():
+                by_resource.setdefault(namespace_of(key), []).append(item)
+
+        stats = {}
+        for resource, items in sorted(by_resource.items()):
+            ttls = [item["ttl"] for item in items]
+            refreshes = sum(item["checks"] - 1 for item in items)
+            stats[resource] = {
+                "keys": len(items),
+                "ttl_min": round(min(ttls), 1),
+                "ttl_max": round(max(ttls), 1),
+                "ttl_mean": round(sum(ttls) / len(ttls), 1),
+                "change_ratio": round(sum(item["changes"] for item in items) / refreshes, 3) if refreshes else 0.0,
+            }
+        return stats
@@ -0,0 +1,74 @@
+"""
+Écriture différée: regroupe les modifications du cache avant de les écrire sur disque
+"""
+import threading
+import time
+from typing import Callable, Optional
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class WriteBehind:
+    """
+    Thread d'écriture en arrière-plan avec anti-rebond
+
+    Chaque modification appelle mark_dirty(); l'écriture n'a lieu qu'une fois
+    les modifications calmées pendant `delay` secondes (et au plus tard
+    `max_delay` secondes après la première), puis close() écrit ce qui reste.
+    """
+
+    def __init__(self, flush: Callable[[], None], delay: float, max_delay: float,
+                 name: str = "cache-flush"):
+        self._flush = flush
+        self.delay = delay
+        self.max_delay = max_delay
+        self.name = name
+        self._dirty = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._guard = threading.Lock()
+
+    def mark_dirty(self):
+        """Signaler une modification à écrire"""
+        with self._guard:
+            closed = self._stop.is_set()
+            if self._thread is None and not closed:
+                self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+        if closed:
+            # Après close(), plus de regroupement: écrire tout de suite
+            self.flush()
+            return
+        self._dirty.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            self._dirty.wait()
+            first = time.monotonic()
+            # Attendre que les modifications se calment, sans dépasser max_delay
+            while not self._stop.is_set():
+                self._dirty.clear()
+                remaining = min(self.delay, first + self.max_delay - time.monotonic())
+                if remaining <= 0:
+                    break
+                if self._stop.wait(remaining) or not self._dirty.is_set():
+                    break
+            self.flush()
+
+    def flush(self):
+        """Écrire immédiatement les modifications en attente"""
+        try:
+            self._flush()
+        except Exception as e:
+            logger.error(f"Erreur écriture différée du cache: {e}")
+
+    def close(self):
+        """Arrêter le thread et écrire les modifications restantes"""
+        with self._guard:
+            self._stop.set()
+            thread, self._thread = self._thread, None
+        self._dirty.set()
+        if thread is not None:
+            thread.join()
+        self.flush()
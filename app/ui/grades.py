@@ -2,28 +2,36 @@
 Page des notes
 """
 import customtkinter as ctk
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional
 import logging
 
-from app.pronote_api.client import PronoteClient
+from app.pronote_api.async_client import AsyncPronoteClient
+from app.pronote_api.models import Period
+from app.ui.virtual_list import RowTemplate, VirtualList
 from app.utils.export import DataExporter
 from tkinter import filedialog, messagebox
 
 logger = logging.getLogger(__name__)
 
 
-class GradesPage(ctk.CTkScrollableFrame):
+class GradesPage(ctk.CTkFrame):
     """Page d'affichage des notes"""
     
-    def __init__(self, parent, pronote_client: PronoteClient):
+    def __init__(self, parent, pronote_client: AsyncPronoteClient, view_state: Optional[Dict[str, Any]] = None):
         super().__init__(parent, fg_color="transparent")
         
         self.pronote_client = pronote_client
         self.grades_data = {}
         self.current_period_index = 0
+        self.selected_period_id = None
         
         self.create_widgets()
+        if view_state:
+            self.restore_view_state(view_state)
         self.load_grades()
+        
+        # Réafficher quand des notes périmées ont été rafraîchies en arrière-plan
+        self.pronote_client.on_revalidated("grades", self, self.on_grades_revalidated)
     
     def create_widgets(self):
         """Créer les widgets de la page"""
@@ -69,14 +77,77 @@ class GradesPage(ctk.CTkScrollableFrame):
         )
         self.period_selector.pack(side="left", fill="x", expand=True)
         
-        # Zone de contenu
+        # Zone de contenu: messages au-dessus de la liste virtualisée des notes
         self.grades_container = ctk.CTkFrame(self)
         self.grades_container.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        
+        self.grade_list = VirtualList(self.grades_container, {
+            "subject": RowTemplate(self.create_subject_header, self.update_subject_header, 64),
+            "grade": RowTemplate(self.create_grade_row, self.update_grade_row, 36),
+        })
+        self.grade_list.pack(fill="both", expand=True, padx=5, pady=5)
+    
+    def yview(self):
+        """Partie visible de la liste des notes (position de défilement)"""
+        return self.grade_list.yview()
+    
+    def yview_moveto(self, fraction: float):
+        """Faire défiler la liste des notes"""
+        self.grade_list.yview_moveto(fraction)
+    
+    def clear_container(self):
+        """Retirer les messages affichés et vider la liste des notes"""
+        for widget in self.grades_container.winfo_children():
+            if widget is not self.grade_list:
+                widget.destroy()
+        self.grade_list.clear()
+    
+    def refresh(self, force_refresh: bool = False):
+        """Recharger les notes (page réaffichée après un moment, F5)"""
+        self.load_grades(force_refresh=force_refresh)
+    
+    def view_state(self) -> Dict[str, Any]:
+        """État d'affichage à garder si la page est libérée"""
+        return {"period_id": self.selected_period_id}
+    
+    def restore_view_state(self, state: Dict[str, Any]):
+        """Revenir sur la période sélectionnée avant la libération de la page"""
+        # Appliqué à la réception de la liste des périodes (display_grades)
+        self.selected_period_id = state.get("period_id")
     
-    def load_grades(self):
-        """Charger les notes"""
+    def load_grades(self, force_refresh: bool = False):
+        """
+        Charger les notes
+        
+        Args:
+            force_refresh: Ignorer le cache et interroger Pronote
+        """
+        # Nettoyer le conteneur et afficher un indicateur de chargement
+        self.clear_container()
+        
+        loading_label = ctk.CTkLabel(
+            self.grades_container,
+            text="Chargement...",
+            font=ctk.CTkFont(size=16),
+            text_color="gray"
+        )
+        loading_label.pack(pady=50, before=self.grade_list)
+        
+        # Seule la liste des périodes est chargée ici, les notes à la sélection
+        self.pronote_client.submit_grades(
+            force_refresh=force_refresh,
+            lazy=True,
+            owner=self,
+            on_done=self.display_grades,
+            on_error=self.display_error,
+        )
+    
+    def display_grades(self, grades_data: Dict[str, Any]):
+        """Afficher les notes reçues"""
+        self.clear_container()
+        
         try:
-            self.grades_data = self.pronote_client.get_grades()
+            self.grades_data = grades_data
             
             periods = self.grades_data.get("periods", [])
             
@@ -87,33 +158,62 @@ class GradesPage(ctk.CTkScrollableFrame):
                     font=ctk.CTkFont(size=16),
                     text_color="gray"
                 )
-                no_data_label.pack(pady=50)
+                no_data_label.pack(pady=50, before=self.grade_list)
                 return
             
             # Mettre à jour le sélecteur de période
             period_names = [p["name"] for p in periods]
             self.period_selector.configure(values=period_names)
             
-            # Sélectionner la première période
-            if period_names:
-                self.period_selector.set(period_names[0])
-                self.display_period_grades(periods[0])
+            # Garder la période déjà sélectionnée, sinon la première
+            selected = next((p for p in periods if p["id"] == self.selected_period_id), periods[0])
+            self.period_selector.set(selected["name"])
+            self.display_period_grades(selected)
         
         except Exception as e:
-            logger.error(f"Erreur chargement notes: {e}")
-            error_label = ctk.CTkLabel(
-                self.grades_container,
-                text=f"Erreur: {str(e)}",
-                font=ctk.CTkFont(size=14),
-                text_color="red"
-            )
-            error_label.pack(pady=20)
+            self.display_error(e)
+    
+    def display_error(self, error: BaseException):
+        """Afficher une erreur de chargement (ou les dernières données connues)"""
+        stale_data = getattr(error, "stale_data", None)
+        if isinstance(stale_data, Period):
+            self.on_period_grades_loaded(stale_data)
+            self.show_stale_banner()
+            return
+        if stale_data is not None:
+            self.display_grades(stale_data)
+            self.show_stale_banner()
+            return
+        
+        logger.error(f"Erreur chargement notes: {error}")
+        self.clear_container()
+        
+        error_label = ctk.CTkLabel(
+            self.grades_container,
+            text=f"Erreur: {str(error)}",
+            font=ctk.CTkFont(size=14),
+            text_color="red"
+        )
+        error_label.pack(pady=20, before=self.grade_list)
+    
+    def show_stale_banner(self):
+        """Signaler que les données affichées viennent du cache (Pronote injoignable)"""
+        stale_label = ctk.CTkLabel(
+            self.grades_container,
+            text="⚠️ Pronote injoignable : affichage des dernières données connues",
+            font=ctk.CTkFont(size=12),
+            text_color="orange"
+        )
+        children = self.grades_container.winfo_children()
+        if len(children) > 1:
+            stale_label.pack(pady=(10, 0), before=children[0])
+        else:
+            stale_label.pack(pady=(10, 0))
     
     def on_period_changed(self, period_name: str):
         """Gérer le changement de période"""
         # Nettoyer le conteneur
-        for widget in self.grades_container.winfo_children():
-            widget.destroy()
+        self.clear_container()
         
         # Trouver la période correspondante
         periods = self.grades_data.get("periods", [])
@@ -122,9 +222,28 @@ class GradesPage(ctk.CTkScrollableFrame):
                 self.display_period_grades(period)
                 break
     
-    def display_period_grades(self, period: Dict[str, Any]):
-        """Afficher les notes d'une période"""
-        grades = period.get("grades", [])
+    def display_period_grades(self, period: Period):
+        """Afficher les notes d'une période (en les chargeant si nécessaire)"""
+        self.selected_period_id = period["id"]
+        
+        if not period.loaded:
+            loading_label = ctk.CTkLabel(
+                self.grades_container,
+                text="Chargement...",
+                font=ctk.CTkFont(size=16),
+                text_color="gray"
+            )
+            loading_label.pack(pady=50, before=self.grade_list)
+            
+            self.pronote_client.submit_period_grades(
+                period["id"],
+                owner=self,
+                on_done=self.on_period_grades_loaded,
+                on_error=self.display_error,
+            )
+            return
+        
+        grades = period.get("grades") or []
         
         if not grades:
             no_grades_label = ctk.CTkLabel(
@@ -133,7 +252,7 @@ class GradesPage(ctk.CTkScrollableFrame):
                 font=ctk.CTkFont(size=16),
                 text_color="gray"
             )
-            no_grades_label.pack(pady=50)
+            no_grades_label.pack(pady=50, before=self.grade_list)
             return
         
         # Organiser par matière
@@ -144,29 +263,43 @@ class GradesPage(ctk.CTkScrollableFrame):
                 grades_by_subject[subject] = []
             grades_by_subject[subject].append(grade)
         
-        # Afficher par matière
+        # Afficher par matière: un en-tête puis une ligne par note
+        items = []
         for subject, subject_grades in grades_by_subject.items():
-            self.create_subject_card(subject, subject_grades)
+            items.append(("subject", (subject, self.subject_average(subject_grades))))
+            items.extend(("grade", grade) for grade in subject_grades)
+        self.grade_list.set_items(items)
     
-    def create_subject_card(self, subject: str, grades: List[Dict[str, Any]]):
-        """Créer une carte pour une matière"""
-        
-        # Carte de la matière
-        card = ctk.CTkFrame(self.grades_container)
-        card.pack(fill="x", pady=10, padx=10)
-        
-        # En-tête de la matière
-        header = ctk.CTkFrame(card, fg_color=["#D0D0D0", "#3B3B3B"])
-        header.pack(fill="x", padx=5, pady=5)
-        
-        subject_label = ctk.CTkLabel(
-            header,
-            text=subject,
-            font=ctk.CTkFont(size=16, weight="bold")
+    def on_grades_revalidated(self):
+        """Recharger la période affichée avec les notes rafraîchies en arrière-plan"""
+        if self.selected_period_id is None:
+            return
+        self.pronote_client.submit_period_grades(
+            self.selected_period_id,
+            owner=self,
+            on_done=self.on_period_grades_loaded,
+            on_error=self.display_error,
         )
-        subject_label.pack(side="left", padx=15, pady=10)
+    
+    def on_period_grades_loaded(self, period: Optional[Period]):
+        """Enregistrer les notes d'une période reçues et les afficher si elle est sélectionnée"""
+        if period is None:
+            self.display_error(Exception("Impossible de récupérer les notes de cette période"))
+            return
         
-        # Calculer la moyenne
+        periods = self.grades_data.get("periods", [])
+        for index, known in enumerate(periods):
+            if known["id"] == period["id"]:
+                periods[index] = period
+                break
+        
+        if period["id"] == self.selected_period_id:
+            self.clear_container()
+            self.display_period_grades(period)
+    
+    @staticmethod
+    def subject_average(grades: List[Dict[str, Any]]) -> Optional[float]:
+        """Moyenne sur 20 des notes d'une matière (None si aucune note chiffrée)"""
         total_points = 0
         total_coef = 0
         
@@ -184,56 +317,78 @@ class GradesPage(ctk.CTkScrollableFrame):
                 pass
         
         if total_coef > 0:
-            average = total_points / total_coef
-            avg_label = ctk.CTkLabel(
-                header,
-                text=f"Moyenne: {average:.2f}/20",
-                font=ctk.CTkFont(size=14, weight="bold"),
-                text_color=["#2B7DC0", "#4A9FD8"]
-            )
-            avg_label.pack(side="right", padx=15, pady=10)
+            return total_points / total_coef
+        return None
+    
+    def create_subject_header(self, parent) -> ctk.CTkFrame:
+        """Créer un en-tête de matière (réutilisé par la liste virtualisée)"""
+        frame = ctk.CTkFrame(parent, fg_color="transparent", corner_radius=0)
         
-        # Liste des notes
-        for grade in grades:
-            self.create_grade_row(card, grade)
+        # En-tête de la matière, séparé de la matière précédente
+        header = ctk.CTkFrame(frame, fg_color=["#D0D0D0", "#3B3B3B"])
+        header.pack(fill="both", expand=True, padx=10, pady=(10, 2))
+        
+        frame.subject_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=ctk.CTkFont(size=16, weight="bold")
+        )
+        frame.subject_label.pack(side="left", padx=15, pady=10)
+        
+        frame.avg_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=ctk.CTkFont(size=14, weight="bold"),
+            text_color=["#2B7DC0", "#4A9FD8"]
+        )
+        frame.avg_label.pack(side="right", padx=15, pady=10)
+        return frame
+    
+    def update_subject_header(self, frame: ctk.CTkFrame, section: tuple):
+        """Afficher une matière et sa moyenne dans un en-tête"""
+        subject, average = section
+        frame.subject_label.configure(text=subject)
+        frame.avg_label.configure(text=f"Moyenne: {average:.2f}/20" if average is not None else "")
     
-    def create_grade_row(self, parent, grade: Dict[str, Any]):
-        """Créer une ligne pour une note"""
+    def create_grade_row(self, parent) -> ctk.CTkFrame:
+        """Créer une ligne de note (réutilisée par la liste virtualisée)"""
         
-        row = ctk.CTkFrame(parent, fg_color="transparent")
-        row.pack(fill="x", padx=15, pady=5)
+        row = ctk.CTkFrame(parent, fg_color="transparent", corner_radius=0)
         
         # Note
-        grade_text = f"{grade['grade']}/{grade['out_of']}"
-        grade_label = ctk.CTkLabel(
+        row.grade_label = ctk.CTkLabel(
             row,
-            text=grade_text,
+            text="",
             font=ctk.CTkFont(size=15, weight="bold"),
             width=80
         )
-        grade_label.pack(side="left", padx=(0, 15))
+        row.grade_label.pack(side="left", padx=(25, 15))
         
         # Coefficient
-        coef = grade.get("coefficient", 1)
-        coef_label = ctk.CTkLabel(
+        row.coef_label = ctk.CTkLabel(
             row,
-            text=f"Coef. {coef}",
+            text="",
             font=ctk.CTkFont(size=12),
             text_color="gray",
             width=70
         )
-        coef_label.pack(side="left", padx=(0, 15))
+        row.coef_label.pack(side="left", padx=(0, 15))
         
         # Date
-        date_str = str(grade.get("date", ""))
-        if date_str:
-            date_label = ctk.CTkLabel(
-                row,
-                text=date_str,
-                font=ctk.CTkFont(size=12),
-                text_color="gray"
-            )
-            date_label.pack(side="right")
+        row.date_label = ctk.CTkLabel(
+            row,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="gray"
+        )
+        row.date_label.pack(side="right", padx=(0, 25))
+        return row
+    
+    def update_grade_row(self, row: ctk.CTkFrame, grade: Dict[str, Any]):
+        """Afficher une note dans une ligne"""
+        row.grade_label.configure(text=f"{grade['grade']}/{grade['out_of']}")
+        row.coef_label.configure(text=f"Coef. {grade.get('coefficient', 1)}")
+        row.date_label.configure(text=str(grade.get("date", "")))
     
     def export_grades(self):
         """Exporter les notes en CSV"""
@@ -248,10 +403,19 @@ class GradesPage(ctk.CTkScrollableFrame):
         )
         
         if filepath:
-            from pathlib import Path
-            success = DataExporter.export_grades_to_csv(self.grades_data, Path(filepath))
-            
-            if success:
-                messagebox.showinfo("Succès", f"Notes exportées avec succès vers:\n{filepath}")
-            else:
-                messagebox.showerror("Erreur", "Erreur lors de l'export")
+            # L'export couvre toutes les périodes, y compris celles pas encore affichées
+            self.pronote_client.submit_grades(
+                owner=self,
+                on_done=lambda grades_data: self.write_export(grades_data, filepath),
+                on_error=self.display_error,
+            )
+    
+    def write_export(self, grades_data: Dict[str, Any], filepath: str):
+        """Écrire le fichier CSV des notes"""
+        from pathlib import Path
+        success = DataExporter.export_grades_to_csv(grades_data, Path(filepath))
+        
+        if success:
+            messagebox.showinfo("Succès", f"Notes exportées avec succès vers:\n{filepath}")
+        else:
+            messagebox.showerror("Erreur", "Erreur lors de l'export")
@@ -3,27 +3,54 @@ Page des devoirs
 """
 import customtkinter as ctk
 import datetime
-from typing import List, Dict, Any
+import math
+from typing import List, Dict, Any, Optional, Tuple
 import logging
 
-from app.pronote_api.client import PronoteClient
+from app.pronote_api.async_client import AsyncPronoteClient
+from app.pronote_api.homework_index import HomeworkIndex
+from app.pronote_api.models import Homework
+from app.ui.virtual_list import RowTemplate, VirtualList
 from tkinter import messagebox
 
 logger = logging.getLogger(__name__)
 
+ALL_SUBJECTS = "Toutes les matières"
+# Fenêtres d'échéance proposées: jours à partir d'aujourd'hui (None: toutes)
+DATE_WINDOWS = {
+    "Toutes les dates": None,
+    "Sous 7 jours": 7,
+    "Sous 30 jours": 30,
+}
+# Largeur à laquelle la description d'un devoir passe à la ligne
+DESCRIPTION_WRAPLENGTH = 600
 
-class HomeworkPage(ctk.CTkScrollableFrame):
+
+class HomeworkPage(ctk.CTkFrame):
     """Page d'affichage des devoirs"""
     
-    def __init__(self, parent, pronote_client: PronoteClient):
+    def __init__(self, parent, pronote_client: AsyncPronoteClient, view_state: Optional[Dict[str, Any]] = None):
         super().__init__(parent, fg_color="transparent")
         
         self.pronote_client = pronote_client
         self.current_filter = "all"  # all, todo, done
+        self.current_subject = None  # None = toutes les matières
+        self.current_window = None   # Jours d'échéance à partir d'aujourd'hui, None = tous
         self.homework_data = []
+        # Index par état, date et matière, reconstruit à chaque chargement
+        self.homework_index = HomeworkIndex()
+        # Hauteur mesurée d'une carte dont la description tient sur une ligne
+        self._card_base_height: Optional[int] = None
+        # {(largeur, description): nombre de lignes}
+        self._description_lines: Dict[Tuple[int, str], int] = {}
         
         self.create_widgets()
+        if view_state:
+            self.restore_view_state(view_state)
         self.load_homework()
+        
+        # Réafficher quand des devoirs périmés ont été rafraîchis en arrière-plan
+        self.pronote_client.on_revalidated("homework", self, self.on_homework_revalidated)
     
     def create_widgets(self):
         """Créer les widgets de la page"""
@@ -64,26 +91,144 @@ class HomeworkPage(ctk.CTkScrollableFrame):
         refresh_button = ctk.CTkButton(
             filter_frame,
             text="🔄 Rafraîchir",
-            command=self.load_homework,
+            command=lambda: self.load_homework(force_refresh=True),
             width=120,
             font=ctk.CTkFont(size=12)
         )
         refresh_button.pack(side="right")
         
-        # Zone de contenu
+        # Filtres combinables: matière, échéance et recherche
+        search_frame = ctk.CTkFrame(self, fg_color="transparent")
+        search_frame.pack(fill="x", padx=20, pady=(0, 10))
+        
+        self.subject_menu = ctk.CTkOptionMenu(
+            search_frame,
+            values=[ALL_SUBJECTS],
+            command=self.on_subject_changed,
+            width=200,
+            font=ctk.CTkFont(size=13)
+        )
+        self.subject_menu.pack(side="left", padx=(0, 10))
+        
+        self.window_menu = ctk.CTkOptionMenu(
+            search_frame,
+            values=list(DATE_WINDOWS),
+            command=self.on_window_changed,
+            width=150,
+            font=ctk.CTkFont(size=13)
+        )
+        self.window_menu.pack(side="left", padx=(0, 10))
+        
+        self.search_entry = ctk.CTkEntry(
+            search_frame,
+            placeholder_text="🔍 Rechercher (matière, consigne)...",
+            font=ctk.CTkFont(size=13)
+        )
+        self.search_entry.pack(side="left", fill="x", expand=True)
+        self.search_entry.bind("<KeyRelease>", lambda event: self.apply_filter())
+        
+        # Zone de contenu: messages au-dessus de la liste virtualisée des devoirs
+        self.description_font = ctk.CTkFont(size=12)
         self.homework_container = ctk.CTkFrame(self)
         self.homework_container.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        
+        self.homework_list = VirtualList(self.homework_container, {
+            "date": RowTemplate(self.create_date_header, self.update_date_header, 64),
+            "homework": RowTemplate(self.create_homework_card, self.update_homework_card, self.homework_card_height),
+        })
+        self.homework_list.pack(fill="both", expand=True, padx=5, pady=5)
     
-    def load_homework(self):
-        """Charger les devoirs"""
-        # Nettoyer le conteneur
+    def yview(self):
+        """Partie visible de la liste des devoirs (position de défilement)"""
+        return self.homework_list.yview()
+    
+    def yview_moveto(self, fraction: float):
+        """Faire défiler la liste des devoirs"""
+        self.homework_list.yview_moveto(fraction)
+    
+    def clear_container(self):
+        """Retirer les messages affichés et vider la liste des devoirs"""
         for widget in self.homework_container.winfo_children():
-            widget.destroy()
+            if widget is not self.homework_list:
+                widget.destroy()
+        self.homework_list.clear()
+    
+    def refresh(self, force_refresh: bool = False):
+        """Recharger les devoirs (page réaffichée après un moment, F5)"""
+        self.load_homework(force_refresh=force_refresh)
+    
+    def view_state(self) -> Dict[str, Any]:
+        """État d'affichage à garder si la page est libérée"""
+        return {
+            "filter": self.current_filter,
+            "subject": self.current_subject,
+            "window": self.current_window,
+            "query": self.search_entry.get(),
+        }
+    
+    def restore_view_state(self, state: Dict[str, Any]):
+        """Réappliquer les filtres choisis avant la libération de la page (avant le premier chargement)"""
+        names = {"all": "Tous", "todo": "À faire", "done": "Terminés"}
+        self.current_filter = state.get("filter", "all")
+        self.filter_selector.set(names.get(self.current_filter, "Tous"))
+        
+        # La matière est vérifiée à la réception des devoirs (update_subject_menu)
+        self.current_subject = state.get("subject")
+        self.subject_menu.set(self.current_subject or ALL_SUBJECTS)
+        
+        self.current_window = state.get("window")
+        window_names = {days: name for name, days in DATE_WINDOWS.items()}
+        self.window_menu.set(window_names.get(self.current_window, "Toutes les dates"))
+        
+        if state.get("query"):
+            self.search_entry.insert(0, state["query"])
+    
+    def load_homework(self, force_refresh: bool = False):
+        """
+        Charger les devoirs
+        
+        Args:
+            force_refresh: Ignorer le cache et interroger Pronote
+        """
+        # Nettoyer le conteneur
+        self.clear_container()
+        
+        loading_label = ctk.CTkLabel(
+            self.homework_container,
+            text="Chargement...",
+            font=ctk.CTkFont(size=16),
+            text_color="gray"
+        )
+        loading_label.pack(pady=50, before=self.homework_list)
+        
+        # Récupérer les devoirs à partir d'aujourd'hui, en arrière-plan
+        today = datetime.date.today()
+        self.pronote_client.submit_homework(
+            today,
+            force_refresh=force_refresh,
+            owner=self,
+            on_done=self.display_homework,
+            on_error=self.display_error,
+        )
+    
+    def on_homework_revalidated(self):
+        """Réafficher les devoirs rafraîchis en arrière-plan"""
+        self.pronote_client.submit_homework(
+            datetime.date.today(),
+            owner=self,
+            on_done=self.display_homework,
+            on_error=self.display_error,
+        )
+    
+    def display_homework(self, homework_data: List[Dict[str, Any]]):
+        """Afficher les devoirs reçus"""
+        self.clear_container()
         
         try:
-            # Récupérer les devoirs à partir d'aujourd'hui
-            today = datetime.date.today()
-            self.homework_data = self.pronote_client.get_homework(today)
+            # Indexer une fois par chargement: les filtres n'ont plus qu'à consulter les index
+            self.homework_index = HomeworkIndex(homework_data)
+            self.homework_data = self.homework_index.items
+            self.update_subject_menu()
             
             if not self.homework_data:
                 no_data_label = ctk.CTkLabel(
@@ -92,21 +237,47 @@ class HomeworkPage(ctk.CTkScrollableFrame):
                     font=ctk.CTkFont(size=16),
                     text_color="gray"
                 )
-                no_data_label.pack(pady=50)
+                no_data_label.pack(pady=50, before=self.homework_list)
                 return
             
             # Appliquer le filtre
             self.apply_filter()
         
         except Exception as e:
-            logger.error(f"Erreur chargement devoirs: {e}")
-            error_label = ctk.CTkLabel(
-                self.homework_container,
-                text=f"Erreur: {str(e)}",
-                font=ctk.CTkFont(size=14),
-                text_color="red"
-            )
-            error_label.pack(pady=20)
+            self.display_error(e)
+    
+    def display_error(self, error: BaseException):
+        """Afficher une erreur de chargement (ou les dernières données connues)"""
+        stale_data = getattr(error, "stale_data", None)
+        if stale_data is not None:
+            self.display_homework(stale_data)
+            self.show_stale_banner()
+            return
+        
+        logger.error(f"Erreur chargement devoirs: {error}")
+        self.clear_container()
+        
+        error_label = ctk.CTkLabel(
+            self.homework_container,
+            text=f"Erreur: {str(error)}",
+            font=ctk.CTkFont(size=14),
+            text_color="red"
+        )
+        error_label.pack(pady=20, before=self.homework_list)
+    
+    def show_stale_banner(self):
+        """Signaler que les données affichées viennent du cache (Pronote injoignable)"""
+        stale_label = ctk.CTkLabel(
+            self.homework_container,
+            text="⚠️ Pronote injoignable : affichage des dernières données connues",
+            font=ctk.CTkFont(size=12),
+            text_color="orange"
+        )
+        children = self.homework_container.winfo_children()
+        if len(children) > 1:
+            stale_label.pack(pady=(10, 0), before=children[0])
+        else:
+            stale_label.pack(pady=(10, 0))
     
     def on_filter_changed(self, filter_name: str):
         """Gérer le changement de filtre"""
@@ -119,69 +290,91 @@ class HomeworkPage(ctk.CTkScrollableFrame):
         self.current_filter = filter_map.get(filter_name, "all")
         self.apply_filter()
     
+    def on_subject_changed(self, subject: str):
+        """Gérer le changement de matière"""
+        self.current_subject = None if subject == ALL_SUBJECTS else subject
+        self.apply_filter()
+    
+    def on_window_changed(self, window_name: str):
+        """Gérer le changement de fenêtre d'échéance"""
+        self.current_window = DATE_WINDOWS.get(window_name)
+        self.apply_filter()
+    
+    def update_subject_menu(self):
+        """Proposer les matières des devoirs chargés (en gardant la sélection si elle existe encore)"""
+        subjects = self.homework_index.subjects()
+        self.subject_menu.configure(values=[ALL_SUBJECTS] + subjects)
+        if self.current_subject not in subjects:
+            self.current_subject = None
+            self.subject_menu.set(ALL_SUBJECTS)
+    
     def apply_filter(self):
-        """Appliquer le filtre actuel"""
+        """Appliquer les filtres actuels (état, matière, échéance et recherche)"""
         # Nettoyer le conteneur
-        for widget in self.homework_container.winfo_children():
-            widget.destroy()
+        self.clear_container()
         
-        # Filtrer les devoirs
-        filtered_homework = []
-        
-        for hw in self.homework_data:
-            if self.current_filter == "all":
-                filtered_homework.append(hw)
-            elif self.current_filter == "todo" and not hw.get("done", False):
-                filtered_homework.append(hw)
-            elif self.current_filter == "done" and hw.get("done", False):
-                filtered_homework.append(hw)
+        # Intersection des index, puis regroupement par date déjà trié
+        positions = self.homework_index.filter(
+            status=None if self.current_filter == "all" else self.current_filter,
+            subject=self.current_subject,
+            query=self.search_entry.get(),
+        )
+        date_to = None
+        if self.current_window is not None:
+            date_to = datetime.date.today() + datetime.timedelta(days=self.current_window)
+        sections = self.homework_index.sections(positions, date_to=date_to)
         
-        if not filtered_homework:
+        if not sections:
             no_data_label = ctk.CTkLabel(
                 self.homework_container,
                 text="Aucun devoir dans cette catégorie",
                 font=ctk.CTkFont(size=16),
                 text_color="gray"
             )
-            no_data_label.pack(pady=50)
+            no_data_label.pack(pady=50, before=self.homework_list)
             return
         
-        # Organiser par date
-        homework_by_date = {}
-        for hw in filtered_homework:
-            date = hw.get("date")
-            if isinstance(date, datetime.datetime):
-                date = date.date()
-            elif isinstance(date, str):
-                try:
-                    date = datetime.datetime.fromisoformat(date).date()
-                except:
-                    date = None
-            
-            if date:
-                if date not in homework_by_date:
-                    homework_by_date[date] = []
-                homework_by_date[date].append(hw)
-        
-        # Trier par date
-        sorted_dates = sorted(homework_by_date.keys())
-        
-        # Afficher par date
-        for date in sorted_dates:
-            self.create_date_section(date, homework_by_date[date])
+        # Afficher par date: un en-tête puis une carte par devoir (lignes recyclées)
+        items = []
+        for date, homework_list in sections:
+            items.append(("date", (date, len(homework_list))))
+            items.extend(("homework", hw) for hw in homework_list)
+        self.homework_list.set_items(items)
     
-    def create_date_section(self, date: datetime.date, homework_list: List[Dict[str, Any]]):
-        """Créer une section pour une date"""
+    def create_date_header(self, parent) -> ctk.CTkFrame:
+        """Créer un en-tête de date (réutilisé par la liste virtualisée)"""
+        frame = ctk.CTkFrame(parent, fg_color="transparent", corner_radius=0)
+        
+        # En-tête de la date, séparé de la date précédente
+        header = ctk.CTkFrame(frame, fg_color=["#E0E0E0", "#2B2B2B"])
+        header.pack(fill="both", expand=True, padx=10, pady=(10, 2))
         
-        # Frame de la date
-        date_frame = ctk.CTkFrame(self.homework_container)
-        date_frame.pack(fill="x", pady=10, padx=10)
+        frame.date_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=ctk.CTkFont(size=16, weight="bold")
+        )
+        frame.date_label.pack(side="left", padx=15, pady=10)
         
-        # En-tête de la date
+        frame.count_label = ctk.CTkLabel(
+            header,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="gray"
+        )
+        frame.count_label.pack(side="right", padx=15, pady=10)
+        return frame
+    
+    def update_date_header(self, frame: ctk.CTkFrame, section: tuple):
+        """Afficher une date (et son nombre de devoirs) dans un en-tête"""
+        date, count = section
         today = datetime.date.today()
-        days_until = (date - today).days
+        days_until = None if date is None else (date - today).days
         
-        if days_until == 0:
+        if days_until is None:
+            date_text = "Sans date"
+            color = "gray"
+        elif days_until == 0:
             date_text = f"Aujourd'hui - {date.strftime('%d/%m/%Y')}"
             color = "red"
         elif days_until == 1:
@@ -194,49 +387,94 @@ class HomeworkPage(ctk.CTkScrollableFrame):
             date_text = f"Dans {days_until} jours - {date.strftime('%d/%m/%Y')}"
             color = "green"
         
-        header = ctk.CTkFrame(date_frame, fg_color=["#E0E0E0", "#2B2B2B"])
-        header.pack(fill="x", padx=5, pady=5)
-        
-        date_label = ctk.CTkLabel(
-            header,
-            text=date_text,
-            font=ctk.CTkFont(size=16, weight="bold"),
-            text_color=color
-        )
-        date_label.pack(side="left", padx=15, pady=10)
-        
-        count_label = ctk.CTkLabel(
-            header,
-            text=f"{len(homework_list)} devoir{'s' if len(homework_list) > 1 else ''}",
-            font=ctk.CTkFont(size=12),
-            text_color="gray"
-        )
-        count_label.pack(side="right", padx=15, pady=10)
-        
-        # Devoirs
-        for hw in homework_list:
-            self.create_homework_card(date_frame, hw)
+        frame.date_label.configure(text=date_text, text_color=color)
+        frame.count_label.configure(text=f"{count} devoir{'s' if count > 1 else ''}")
+    
+    @staticmethod
+    def short_description(homework: Dict[str, Any]) -> str:
+        """Description d'un devoir limitée à 150 caractères"""
+        description = homework.get("description", "Pas de description")
+        if len(description) > 150:
+            description = description[:150] + "..."
+        return description
+    
+    def homework_card_height(self, homework: Dict[str, Any]) -> int:
+        """
+        Hauteur d'une carte de devoir, sans créer de widget pour elle
+
+        La hauteur d'une carte d'une ligne est mesurée une fois sur une
+        vraie carte; chaque ligne de description en plus ajoute la hauteur
+        d'une ligne de la police.
+        """
+        if self._card_base_height is None:
+            self._card_base_height = self.measure_card_height()
+        lines = self.description_line_count(self.short_description(homework), DESCRIPTION_WRAPLENGTH)
+        return self._card_base_height + (lines - 1) * self.description_font.metrics("linespace")
     
-    def create_homework_card(self, parent, homework: Dict[str, Any]):
-        """Créer une carte pour un devoir"""
+    def measure_card_height(self) -> int:
+        """Hauteur demandée par une carte hors écran dont la description tient sur une ligne"""
+        card = self.create_homework_card(self.homework_list)
+        self.update_homework_card(card, {"subject": "Matière", "description": "Consigne", "done": False})
+        card.update_idletasks()
+        # Hauteur avant mise à l'échelle (la liste l'applique elle-même)
+        height = card.winfo_reqheight() / self._get_widget_scaling()
+        card.destroy()
+        return math.ceil(height)
+    
+    def description_line_count(self, text: str, width: int) -> int:
+        """
+        Nombre de lignes d'une description passée à la ligne comme le fait Tk
+        (entre les mots, un mot trop long étant coupé)
+        
+        Args:
+            text: Description affichée
+            width: Largeur de passage à la ligne (pixels avant mise à l'échelle)
+            
+        Returns:
+            Nombre de lignes (au moins une)
+        """
+        key = (width, text)
+        lines = self._description_lines.get(key)
+        if lines is None:
+            lines = 0
+            for paragraph in text.split("\n"):
+                lines += 1
+                line_width = 0
+                for word in paragraph.split(" "):
+                    word_width = self.description_font.measure(f" {word}" if line_width else word)
+                    if line_width and line_width + word_width > width:
+                        lines += 1
+                        line_width, word_width = 0, self.description_font.measure(word)
+                    line_width += word_width
+                    # Mot plus large que la ligne: coupé sur plusieurs lignes
+                    while line_width > width:
+                        lines += 1
+                        line_width -= width
+            self._description_lines[key] = lines
+        return lines
+    
+    def create_homework_card(self, parent) -> ctk.CTkFrame:
+        """Créer une carte de devoir (réutilisée par la liste virtualisée)"""
+        frame = ctk.CTkFrame(parent, fg_color="transparent", corner_radius=0)
+        frame.homework = None
         
         # Carte
-        card = ctk.CTkFrame(parent)
-        card.pack(fill="x", padx=10, pady=5)
+        card = ctk.CTkFrame(frame)
+        card.pack(fill="both", expand=True, padx=20, pady=5)
         
         # Frame interne
         content_frame = ctk.CTkFrame(card, fg_color="transparent")
         content_frame.pack(fill="x", padx=15, pady=12)
         
         # Checkbox "fait"
-        done_var = ctk.BooleanVar(value=homework.get("done", False))
+        frame.done_var = ctk.BooleanVar(value=False)
         
         checkbox = ctk.CTkCheckBox(
             content_frame,
             text="",
-            variable=done_var,
+            variable=frame.done_var,
             width=30,
-            command=lambda: self.toggle_homework_done(homework, done_var.get())
+            command=lambda: self.toggle_homework_done(frame.homework, frame.done_var.get())
         )
         checkbox.pack(side="left", padx=(0, 15))
         
@@ -245,34 +483,41 @@ class HomeworkPage(ctk.CTkScrollableFrame):
         info_frame.pack(side="left", fill="both", expand=True)
         
         # Matière
-        subject = homework.get("subject", "Matière inconnue")
-        subject_label = ctk.CTkLabel(
+        frame.subject_label = ctk.CTkLabel(
             info_frame,
-            text=subject,
+            text="",
             font=ctk.CTkFont(size=15, weight="bold"),
             anchor="w"
         )
-        subject_label.pack(anchor="w")
+        frame.subject_label.pack(anchor="w")
         
         # Description
-        description = homework.get("description", "Pas de description")
-        # Limiter la longueur de la description
-        if len(description) > 150:
-            description = description[:150] + "..."
-        
-        desc_label = ctk.CTkLabel(
+        frame.desc_label = ctk.CTkLabel(
             info_frame,
-            text=description,
-            font=ctk.CTkFont(size=12),
+            text="",
+            font=self.description_font,
             text_color="gray",
             anchor="w",
-            wraplength=600
+            justify="left",
+            wraplength=DESCRIPTION_WRAPLENGTH
         )
-        desc_label.pack(anchor="w", pady=(5, 0))
+        frame.desc_label.pack(anchor="w", pady=(5, 0))
+        return frame
+    
+    def update_homework_card(self, frame: ctk.CTkFrame, homework: Dict[str, Any]):
+        """Afficher un devoir dans une carte"""
+        frame.homework = homework
+        frame.done_var.set(homework.get("done", False))
+        frame.subject_label.configure(text=homework.get("subject", "Matière inconnue"))
+        frame.desc_label.configure(text=self.short_description(homework))
     
-    def toggle_homework_done(self, homework: Dict[str, Any], done: bool):
+    def toggle_homework_done(self, homework: Homework, done: bool):
         """Marquer un devoir comme fait/non fait"""
         # Note: pronotepy ne supporte pas forcément la modification de l'état "done"
         # Ceci est une fonctionnalité locale pour l'instant
-        homework["done"] = done
+        updated = self.homework_index.set_done(homework["id"], done) or homework.replace(done=done)
+        for index, (kind, hw) in enumerate(self.homework_list.items):
+            if kind == "homework" and hw["id"] == homework["id"]:
+                self.homework_list.replace(index, updated)
+                break
         logger.info(f"Devoir {homework.get('subject', '')} marqué comme {'fait' if done else 'non fait'}")
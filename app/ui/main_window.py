@@ -2,16 +2,18 @@
 Fenêtre principale de l'application
 """
 import customtkinter as ctk
-from typing import Optional
+from typing import Callable, Optional
 import logging
 
 from app.config import APP_NAME, WINDOW_SIZE, MIN_WINDOW_SIZE
 from app.pronote_api.client import PronoteClient
+from app.pronote_api.async_client import AsyncPronoteClient
 from app.utils.themes import ThemeManager
 from app.ui.schedule import SchedulePage
 from app.ui.grades import GradesPage
 from app.ui.homework import HomeworkPage
 from app.ui.messages import MessagesPage
+from app.ui.page_manager import PageManager
 
 logger = logging.getLogger(__name__)
 
@@ -19,11 +21,22 @@ logger = logging.getLogger(__name__)
 class MainWindow(ctk.CTk):
     """Fenêtre principale de l'application"""
     
-    def __init__(self, pronote_client: PronoteClient, theme_manager: ThemeManager):
+    def __init__(self, pronote_client: PronoteClient, async_client: AsyncPronoteClient, theme_manager: ThemeManager,
+                 on_logout: Callable[[], None]):
+        """
+        Args:
+            pronote_client: Client Pronote connecté
+            async_client: Façade asynchrone utilisée par les pages
+            theme_manager: Gestionnaire du thème
+            on_logout: Appelée après confirmation de la déconnexion; arrête
+                l'application (vidage du cache, fermeture des sessions, fenêtre)
+        """
         super().__init__()
         
         self.pronote_client = pronote_client
+        self.async_client = async_client
         self.theme_manager = theme_manager
+        self.on_logout = on_logout
         
         # Configuration de la fenêtre
         self.title(APP_NAME)
@@ -37,6 +50,26 @@ class MainWindow(ctk.CTk):
         # Créer l'interface
         self.create_widgets()
         
+        # Pages gardées en mémoire entre deux navigations
+        self.pages = PageManager(self.content_frame, {
+            "schedule": lambda parent, state: SchedulePage(parent, self.async_client, state),
+            "grades": lambda parent, state: GradesPage(parent, self.async_client, state),
+            "homework": lambda parent, state: HomeworkPage(parent, self.async_client, state),
+            "messages": lambda parent, state: MessagesPage(parent, self.async_client),
+        })
+        self.nav_buttons = {
+            "schedule": self.schedule_button,
+            "grades": self.grades_button,
+            "homework": self.homework_button,
+            "messages": self.messages_button,
+        }
+        
+        # F5: recharger la page affichée depuis Pronote
+        self.bind("<F5>", lambda event: self.pages.refresh_current())
+        
+        # Relayer les données rafraîchies en arrière-plan vers les pages
+        self.async_client.watch_revalidations(self)
+        
         # Charger les infos utilisateur
         self.load_user_info()
         
@@ -146,85 +179,55 @@ class MainWindow(ctk.CTk):
         self.content_frame.grid_columnconfigure(0, weight=1)
         
     def load_user_info(self):
-        """Charger les informations utilisateur"""
-        self.user_info = self.pronote_client.get_user_info()
+        """Charger les informations utilisateur en arrière-plan"""
+        self.async_client.submit_user_info(owner=self, on_done=self.display_user_info)
+    
+    def display_user_info(self, user_info: Optional[dict]):
+        """Afficher les informations utilisateur reçues"""
+        self.user_info = user_info
         if self.user_info:
             self.user_label.configure(text=f"👤 {self.user_info['name']}")
         else:
             self.user_label.configure(text="👤 Utilisateur")
     
-    def clear_content(self):
-        """Effacer le contenu actuel"""
-        for widget in self.content_frame.winfo_children():
-            widget.destroy()
-        self.current_page = None
-    
     def reset_button_colors(self):
         """Réinitialiser les couleurs des boutons de navigation"""
-        buttons = [
-            self.schedule_button,
-            self.grades_button,
-            self.homework_button,
-            self.messages_button
-        ]
-        for button in buttons:
+        for button in self.nav_buttons.values():
             button.configure(fg_color=["#3B8ED0", "#1F6AA5"])
     
-    def show_schedule(self):
-        """Afficher la page emploi du temps"""
-        if isinstance(self.current_page, SchedulePage):
+    def show_page(self, name: str, label: str):
+        """
+        Afficher une page (réutilisée si elle est encore en mémoire)
+        
+        Args:
+            name: Nom de la page dans le gestionnaire de pages
+            label: Nom affiché dans le journal
+        """
+        if self.pages.current == name:
             return
         
-        self.clear_content()
         self.reset_button_colors()
-        self.schedule_button.configure(fg_color=["#2B7DC0", "#164A75"])
+        self.nav_buttons[name].configure(fg_color=["#2B7DC0", "#164A75"])
         
-        self.current_page = SchedulePage(self.content_frame, self.pronote_client)
-        self.current_page.pack(fill="both", expand=True)
+        self.current_page = self.pages.show(name)
         
-        logger.info("Page emploi du temps affichée")
+        logger.info(f"Page {label} affichée")
+    
+    def show_schedule(self):
+        """Afficher la page emploi du temps"""
+        self.show_page("schedule", "emploi du temps")
     
     def show_grades(self):
         """Afficher la page notes"""
-        if isinstance(self.current_page, GradesPage):
-            return
-        
-        self.clear_content()
-        self.reset_button_colors()
-        self.grades_button.configure(fg_color=["#2B7DC0", "#164A75"])
-        
-        self.current_page = GradesPage(self.content_frame, self.pronote_client)
-        self.current_page.pack(fill="both", expand=True)
-        
-        logger.info("Page notes affichée")
+        self.show_page("grades", "notes")
     
     def show_homework(self):
         """Afficher la page devoirs"""
-        if isinstance(self.current_page, HomeworkPage):
-            return
-        
-        self.clear_content()
-        self.reset_button_colors()
-        self.homework_button.configure(fg_color=["#2B7DC0", "#164A75"])
-        
-        self.current_page = HomeworkPage(self.content_frame, self.pronote_client)
-        self.current_page.pack(fill="both", expand=True)
-        
-        logger.info("Page devoirs affichée")
+        self.show_page("homework", "devoirs")
     
     def show_messages(self):
         """Afficher la page messages"""
-        if isinstance(self.current_page, MessagesPage):
-            return
-        
-        self.clear_content()
-        self.reset_button_colors()
-        self.messages_button.configure(fg_color=["#2B7DC0", "#164A75"])
-        
-        self.current_page = MessagesPage(self.content_frame, self.pronote_client)
-        self.current_page.pack(fill="both", expand=True)
-        
-        logger.info("Page messages affichée")
+        self.show_page("messages", "messages")
     
     def toggle_theme(self):
         """Basculer le thème"""
@@ -243,9 +246,5 @@ class MainWindow(ctk.CTk):
         from tkinter import messagebox
         
         if messagebox.askyesno("Déconnexion", "Voulez-vous vraiment vous déconnecter ?"):
-            logger.info("Déconnexion demandée")
-            self.pronote_client.logout()
-            
-            # Fermer l'application proprement
-            self.quit()
-            self.destroy()
+            # Même arrêt que la fermeture de la fenêtre (écritures du cache, sessions...)
+            self.on_logout()
@@ -5,7 +5,7 @@ import customtkinter as ctk
 from typing import List, Dict, Any
 import logging
 
-from app.pronote_api.client import PronoteClient
+from app.pronote_api.async_client import AsyncPronoteClient
 
 logger = logging.getLogger(__name__)
 
@@ -13,7 +13,7 @@ logger = logging.getLogger(__name__)
 class MessagesPage(ctk.CTkScrollableFrame):
     """Page d'affichage de la messagerie"""
     
-    def __init__(self, parent, pronote_client: PronoteClient):
+    def __init__(self, parent, pronote_client: AsyncPronoteClient):
         super().__init__(parent, fg_color="transparent")
         
         self.pronote_client = pronote_client
@@ -41,7 +41,7 @@ class MessagesPage(ctk.CTkScrollableFrame):
         refresh_button = ctk.CTkButton(
             header_frame,
             text="🔄 Rafraîchir",
-            command=self.load_messages,
+            command=lambda: self.load_messages(force_refresh=True),
             width=120,
             font=ctk.CTkFont(size=12)
         )
@@ -51,14 +51,43 @@ class MessagesPage(ctk.CTkScrollableFrame):
         self.messages_container = ctk.CTkFrame(self)
         self.messages_container.pack(fill="both", expand=True, padx=20, pady=(0, 20))
     
-    def load_messages(self):
-        """Charger les messages"""
+    def refresh(self, force_refresh: bool = False):
+        """Recharger les messages (page réaffichée après un moment, F5)"""
+        self.load_messages(force_refresh=force_refresh)
+    
+    def load_messages(self, force_refresh: bool = False):
+        """
+        Charger les messages
+        
+        Args:
+            force_refresh: Ignorer le cache et interroger Pronote
+        """
         # Nettoyer le conteneur
         for widget in self.messages_container.winfo_children():
             widget.destroy()
         
+        loading_label = ctk.CTkLabel(
+            self.messages_container,
+            text="Chargement...",
+            font=ctk.CTkFont(size=16),
+            text_color="gray"
+        )
+        loading_label.pack(pady=50)
+        
+        self.pronote_client.submit_messages(
+            force_refresh=force_refresh,
+            owner=self,
+            on_done=self.display_messages,
+            on_error=self.display_error,
+        )
+    
+    def display_messages(self, messages_data: List[Dict[str, Any]]):
+        """Afficher les messages reçus"""
+        for widget in self.messages_container.winfo_children():
+            widget.destroy()
+        
         try:
-            self.messages_data = self.pronote_client.get_messages()
+            self.messages_data = messages_data
             
             if not self.messages_data:
                 # Message informatif
@@ -103,14 +132,41 @@ class MessagesPage(ctk.CTkScrollableFrame):
                 self.create_message_card(message)
         
         except Exception as e:
-            logger.error(f"Erreur chargement messages: {e}")
-            error_label = ctk.CTkLabel(
-                self.messages_container,
-                text=f"Erreur: {str(e)}",
-                font=ctk.CTkFont(size=14),
-                text_color="red"
-            )
-            error_label.pack(pady=20)
+            self.display_error(e)
+    
+    def display_error(self, error: BaseException):
+        """Afficher une erreur de chargement (ou les dernières données connues)"""
+        stale_data = getattr(error, "stale_data", None)
+        if stale_data is not None:
+            self.display_messages(stale_data)
+            self.show_stale_banner()
+            return
+        
+        logger.error(f"Erreur chargement messages: {error}")
+        for widget in self.messages_container.winfo_children():
+            widget.destroy()
+        
+        error_label = ctk.CTkLabel(
+            self.messages_container,
+            text=f"Erreur: {str(error)}",
+            font=ctk.CTkFont(size=14),
+            text_color="red"
+        )
+        error_label.pack(pady=20)
+    
+    def show_stale_banner(self):
+        """Signaler que les données affichées viennent du cache (Pronote injoignable)"""
+        stale_label = ctk.CTkLabel(
+            self.messages_container,
+            text="⚠️ Pronote injoignable : affichage des dernières données connues",
+            font=ctk.CTkFont(size=12),
+            text_color="orange"
+        )
+        children = self.messages_container.winfo_children()
+        if len(children) > 1:
+            stale_label.pack(pady=(10, 0), before=children[0])
+        else:
+            stale_label.pack(pady=(10, 0))
     
     def create_message_card(self, message: Dict[str, Any]):
         """Créer une carte pour un message"""
@@ -0,0 +1,178 @@
+"""
+Gestion des pages de la fenêtre principale: chaque page est créée une fois
+puis masquée et réaffichée, sans être reconstruite à chaque navigation
+"""
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Optional
+import logging
+
+from app.config import UI_PAGE_CACHE_SIZE, UI_PAGE_REFRESH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class PageManager:
+    """
+    Pages vivantes de la zone de contenu, de la moins à la plus récemment vue
+
+    Une page masquée garde ses widgets, ses données et sa position de
+    défilement; réafficher l'onglet est donc immédiat. Elle n'est rechargée
+    que sur demande (refresh_current) ou si elle n'a pas été rafraîchie
+    depuis refresh_seconds. Au-delà de max_pages pages vivantes, la moins
+    récemment vue est détruite: son état d'affichage (semaine, période,
+    filtre, défilement) est gardé pour la reconstruire au même endroit.
+
+    Une page peut fournir:
+        refresh(force_refresh=False): recharger ses données
+        view_state() -> dict: état d'affichage à garder si elle est libérée
+        restore_view_state(state): réappliquer cet état; la fabrique reçoit
+            l'état gardé pour l'appliquer avant le premier chargement
+        yview() / yview_moveto(fraction): son défilement, si ce n'est pas
+            celui d'un CTkScrollableFrame
+    """
+
+    def __init__(self, container, factories: Dict[str, Callable[[Any], Any]],
+                 max_pages: int = UI_PAGE_CACHE_SIZE,
+                 refresh_seconds: float = UI_PAGE_REFRESH_SECONDS):
+        """
+        Args:
+            container: Widget parent des pages
+            factories: {nom: fonction créant la page à partir du parent et
+                de son état d'affichage gardé (None si elle n'a pas été libérée)}
+            max_pages: Pages gardées en mémoire au maximum (au moins 1)
+            refresh_seconds: Délai après lequel une page réaffichée est rechargée
+        """
+        self.container = container
+        self.factories = factories
+        self.max_pages = max(1, max_pages)
+        self.refresh_seconds = refresh_seconds
+
+        self._pages: "OrderedDict[str, Any]" = OrderedDict()
+        self._refreshed_at: Dict[str, float] = {}
+        self._scroll: Dict[str, float] = {}
+        self._saved_state: Dict[str, Dict[str, Any]] = {}
+        self._current: Optional[str] = None
+
+    @property
+    def current(self) -> Optional[str]:
+        """Nom de la page affichée"""
+        return self._current
+
+    @property
+    def current_page(self) -> Optional[Any]:
+        """Page affichée"""
+        return self._pages.get(self._current) if self._current else None
+
+    def show(self, name: str) -> Any:
+        """
+        Afficher une page, en la créant si elle n'est pas vivante
+
+        Args:
+            name: Nom de la page (clé de factories)
+
+        Returns:
+            La page affichée
+
+        Raises:
+            KeyError: Page inconnue
+        """
+        if name == self._current:
+            return self._pages[name]
+        if name not in self.factories:
+            raise KeyError(name)
+
+        previous = self.current_page
+        if previous is not None:
+            self._scroll[self._current] = self._get_scroll(previous)
+            previous.pack_forget()
+
+        page = self._pages.get(name)
+        if page is None:
+            page = self._create(name)
+        elif time.monotonic() - self._refreshed_at.get(name, 0) >= self.refresh_seconds:
+            self._refresh(name, page)
+
+        page.pack(fill="both", expand=True)
+        self._current = name
+        self._pages.move_to_end(name)
+
+        # Le défilement ne s'applique qu'une fois la page remise en place
+        offset = self._scroll.get(name)
+        if offset:
+            page.after_idle(lambda: self._set_scroll(page, offset))
+
+        self._release_extra()
+        return page
+
+    def refresh_current(self, force_refresh: bool = True):
+        """
+        Recharger la page affichée
+
+        Args:
+            force_refresh: Interroger Pronote même si le cache est valide
+        """
+        page = self.current_page
+        if page is not None:
+            self._refresh(self._current, page, force_refresh)
+
+    def invalidate(self):
+        """Recharger chaque page vivante à son prochain affichage"""
+        self._refreshed_at.clear()
+
+    def destroy_all(self):
+        """Détruire toutes les pages (et oublier leur état)"""
+        for page in self._pages.values():
+            page.destroy()
+        self._pages.clear()
+        self._refreshed_at.clear()
+        self._scroll.clear()
+        self._saved_state.clear()
+        self._current = None
+
+    def _create(self, name: str) -> Any:
+        """Construire une page (dans l'état où elle a été libérée, le cas échéant)"""
+        page = self.factories[name](self.container, self._saved_state.pop(name, None))
+        self._pages[name] = page
+        self._refreshed_at[name] = time.monotonic()
+        logger.debug(f"Page {name} créée")
+        return page
+
+    def _refresh(self, name: str, page: Any, force_refresh: bool = False):
+        """Recharger les données d'une page"""
+        self._refreshed_at[name] = time.monotonic()
+        if hasattr(page, "refresh"):
+            page.refresh(force_refresh=force_refresh)
+
+    def _release_extra(self):
+        """Détruire les pages les moins récemment vues au-delà de max_pages"""
+        while len(self._pages) > self.max_pages:
+            name, page = next(iter(self._pages.items()))
+            if name == self._current:
+                break
+            del self._pages[name]
+            self._refreshed_at.pop(name, None)
+            if hasattr(page, "view_state"):
+                self._saved_state[name] = page.view_state()
+            page.destroy()
+            logger.debug(f"Page {name} libérée")
+
+    @staticmethod
+    def _scroller(page: Any) -> Optional[Any]:
+        """Widget portant le défilement d'une page (la page si elle a yview, sinon son canevas)"""
+        if hasattr(page, "yview"):
+            return page
+        return getattr(page, "_parent_canvas", None)
+
+    def _get_scroll(self, page: Any) -> float:
+        """Position de défilement verticale d'une page (0 = en haut)"""
+        scroller = self._scroller(page)
+        if scroller is None:
+            return 0.0
+        return scroller.yview()[0]
+
+    def _set_scroll(self, page: Any, offset: float):
+        """Replacer le défilement vertical d'une page"""
+        scroller = self._scroller(page)
+        if scroller is not None and page.winfo_exists():
+            scroller.yview_moveto(offset)
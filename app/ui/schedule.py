@@ -3,26 +3,35 @@ Page emploi du temps
 """
 import customtkinter as ctk
 import datetime
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 import logging
 
-from app.pronote_api.client import PronoteClient
-from app.config import SUBJECT_COLORS
+from app.pronote_api.async_client import AsyncPronoteClient
+from app.config import SUBJECT_COLORS, SCHEDULE_PREFETCH_RADIUS
 
 logger = logging.getLogger(__name__)
 
+DAY_NAMES = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"]
+
 
 class SchedulePage(ctk.CTkScrollableFrame):
     """Page d'affichage de l'emploi du temps"""
     
-    def __init__(self, parent, pronote_client: PronoteClient):
+    def __init__(self, parent, pronote_client: AsyncPronoteClient, view_state: Optional[Dict[str, Any]] = None):
         super().__init__(parent, fg_color="transparent")
         
         self.pronote_client = pronote_client
         self.current_week_offset = 0  # 0 = semaine actuelle, -1 = précédente, +1 = suivante
+        self.load_token = 0  # Ignorer les réponses des semaines quittées entre-temps
+        self.prefetch_future = None  # Préchargement en attente d'une semaine voisine
         
         self.create_widgets()
+        if view_state:
+            self.restore_view_state(view_state)
         self.load_schedule()
+        
+        # Réafficher quand des cours périmés ont été rafraîchis en arrière-plan
+        self.pronote_client.on_revalidated("schedule", self, self.on_schedule_revalidated)
     
     def create_widgets(self):
         """Créer les widgets de la page"""
@@ -68,9 +77,27 @@ class SchedulePage(ctk.CTkScrollableFrame):
         )
         next_button.pack(side="left", padx=5)
         
-        # Zone de contenu
+        # Zone de contenu: squelette fixe de la semaine, mis à jour à chaque navigation
         self.schedule_container = ctk.CTkFrame(self)
         self.schedule_container.pack(fill="both", expand=True, padx=20, pady=(0, 20))
+        
+        # Chargement, semaine vide ou erreur
+        self.status_label = ctk.CTkLabel(
+            self.schedule_container,
+            text="",
+            font=ctk.CTkFont(size=16),
+            text_color="gray"
+        )
+        
+        self.stale_label = ctk.CTkLabel(
+            self.schedule_container,
+            text="⚠️ Pronote injoignable : affichage des dernières données connues",
+            font=ctk.CTkFont(size=12),
+            text_color="orange"
+        )
+        
+        self.day_sections = [self.create_day_section() for _ in DAY_NAMES]
+        self.visible_days: List[int] = []
     
     def get_week_dates(self) -> tuple[datetime.date, datetime.date]:
         """Obtenir les dates de début et fin de la semaine"""
@@ -94,11 +121,27 @@ class SchedulePage(ctk.CTkScrollableFrame):
         self.current_week_offset += 1
         self.load_schedule()
     
-    def load_schedule(self):
-        """Charger l'emploi du temps"""
-        # Nettoyer le conteneur
-        for widget in self.schedule_container.winfo_children():
-            widget.destroy()
+    def refresh(self, force_refresh: bool = False):
+        """Recharger la semaine affichée (page réaffichée après un moment, F5)"""
+        self.load_schedule(force_refresh=force_refresh)
+    
+    def view_state(self) -> Dict[str, Any]:
+        """État d'affichage à garder si la page est libérée"""
+        return {"week_offset": self.current_week_offset}
+    
+    def restore_view_state(self, state: Dict[str, Any]):
+        """Revenir sur la semaine affichée avant la libération de la page (avant le premier chargement)"""
+        self.current_week_offset = state.get("week_offset", 0)
+    
+    def load_schedule(self, force_refresh: bool = False):
+        """
+        Charger l'emploi du temps
+        
+        Args:
+            force_refresh: Ignorer le cache et interroger Pronote
+        """
+        # La semaine voisine en attente n'est peut-être plus celle qui sera demandée
+        self.cancel_prefetch()
         
         # Obtenir les dates
         monday, sunday = self.get_week_dates()
@@ -115,42 +158,145 @@ class SchedulePage(ctk.CTkScrollableFrame):
         
         self.week_label.configure(text=week_text)
         
-        # Récupérer l'emploi du temps
+        # Afficher un indicateur de chargement en attendant les données
+        self.show_status("Chargement...")
+        
+        # Récupérer l'emploi du temps en arrière-plan
+        self.load_token += 1
+        token = self.load_token
+        self.pronote_client.submit_schedule(
+            monday,
+            sunday,
+            force_refresh=force_refresh,
+            owner=self,
+            on_done=lambda lessons: self.display_schedule(token, monday, lessons),
+            on_error=lambda e: self.display_error(token, e, monday),
+        )
+    
+    def on_schedule_revalidated(self):
+        """Réafficher la semaine avec les cours rafraîchis en arrière-plan"""
+        monday, sunday = self.get_week_dates()
+        self.load_token += 1
+        token = self.load_token
+        self.pronote_client.submit_schedule(
+            monday,
+            sunday,
+            owner=self,
+            on_done=lambda lessons: self.display_schedule(token, monday, lessons),
+            on_error=lambda e: self.display_error(token, e, monday),
+        )
+    
+    def display_schedule(self, token: int, monday: datetime.date, lessons: List[Dict[str, Any]]):
+        """Afficher l'emploi du temps reçu"""
+        if token != self.load_token:
+            return
+        
+        # Une fois la semaine affichée, préparer les suivantes probables
+        self.after_idle(lambda: self.prefetch_weeks(token, self.prefetch_offsets()))
+        
         try:
-            lessons = self.pronote_client.get_schedule(monday, sunday)
-            
             if not lessons:
-                no_data_label = ctk.CTkLabel(
-                    self.schedule_container,
-                    text="Aucun cours pour cette semaine",
-                    font=ctk.CTkFont(size=16),
-                    text_color="gray"
-                )
-                no_data_label.pack(pady=50)
+                self.show_status("Aucun cours pour cette semaine")
                 return
             
             # Organiser par jour
             lessons_by_day = self.organize_by_day(lessons, monday)
             
-            # Afficher par jour
-            for day_offset in range(7):
+            # Mettre à jour chaque jour du squelette
+            visible_days = []
+            for day_offset, day_name in enumerate(DAY_NAMES):
                 day_date = monday + datetime.timedelta(days=day_offset)
-                day_name = ["Lundi", "Mardi", "Mercredi", "Jeudi", "Vendredi", "Samedi", "Dimanche"][day_offset]
-                
                 day_lessons = lessons_by_day.get(day_date, [])
                 
                 if day_lessons or day_offset < 5:  # Afficher les jours de semaine même sans cours
-                    self.create_day_section(day_name, day_date, day_lessons)
+                    self.update_day_section(self.day_sections[day_offset], day_name, day_date, day_lessons)
+                    visible_days.append(day_offset)
+            
+            self.status_label.pack_forget()
+            self.stale_label.pack_forget()
+            self.show_days(visible_days)
         
         except Exception as e:
-            logger.error(f"Erreur chargement emploi du temps: {e}")
-            error_label = ctk.CTkLabel(
-                self.schedule_container,
-                text=f"Erreur: {str(e)}",
-                font=ctk.CTkFont(size=14),
-                text_color="red"
-            )
-            error_label.pack(pady=20)
+            self.display_error(token, e)
+    
+    @staticmethod
+    def prefetch_offsets() -> List[int]:
+        """Décalages des semaines à précharger, les plus proches d'abord (suivante avant précédente)"""
+        offsets = []
+        for distance in range(1, SCHEDULE_PREFETCH_RADIUS + 1):
+            offsets += [distance, -distance]
+        return offsets
+    
+    def prefetch_weeks(self, token: int, offsets: List[int]):
+        """
+        Précharger les semaines voisines une à une, tant que la semaine affichée ne change pas
+        
+        Args:
+            token: Chargement de la semaine affichée (load_token)
+            offsets: Décalages restants par rapport à la semaine affichée
+        """
+        if token != self.load_token or not offsets:
+            return
+        
+        monday, _ = self.get_week_dates()
+        start = monday + datetime.timedelta(weeks=offsets[0])
+        # Une seule requête en attente à la fois: un clic n'attend jamais toute la série
+        self.prefetch_future = self.pronote_client.submit_schedule_prefetch(
+            start,
+            start + datetime.timedelta(days=6),
+            owner=self,
+            on_done=lambda _: self.prefetch_weeks(token, offsets[1:]),
+        )
+    
+    def cancel_prefetch(self):
+        """Abandonner le préchargement pas encore démarré"""
+        if self.prefetch_future is not None:
+            self.prefetch_future.cancel()
+            self.prefetch_future = None
+    
+    def display_error(self, token: int, error: BaseException, monday: datetime.date = None):
+        """Afficher une erreur de chargement (ou les dernières données connues)"""
+        if token != self.load_token:
+            return
+        
+        stale_data = getattr(error, "stale_data", None)
+        if stale_data is not None and monday is not None:
+            self.display_schedule(token, monday, stale_data)
+            self.show_stale_banner()
+            return
+        
+        logger.error(f"Erreur chargement emploi du temps: {error}")
+        self.show_status(f"Erreur: {str(error)}", text_color="red", size=14, pady=20)
+    
+    def show_status(self, text: str, text_color: str = "gray", size: int = 16, pady: int = 50):
+        """Masquer la semaine et afficher un message à la place"""
+        self.show_days([])
+        self.stale_label.pack_forget()
+        self.status_label.configure(text=text, text_color=text_color, font=ctk.CTkFont(size=size))
+        self.status_label.pack(pady=pady)
+    
+    def show_stale_banner(self):
+        """Signaler que les données affichées viennent du cache (Pronote injoignable)"""
+        if self.visible_days:
+            self.stale_label.pack(pady=(10, 0), before=self.day_sections[self.visible_days[0]])
+        else:
+            self.stale_label.pack(pady=(10, 0), before=self.status_label)
+    
+    def show_days(self, visible_days: List[int]):
+        """
+        Afficher les sections de certains jours, dans l'ordre de la semaine
+        
+        Args:
+            visible_days: Indices des jours à afficher (0 = lundi)
+        """
+        if visible_days == self.visible_days:
+            return
+        # Les jours restent dans l'ordre: on ne réempile que si l'ensemble change
+        for day_offset in self.visible_days:
+            self.day_sections[day_offset].pack_forget()
+        for day_offset in visible_days:
+            self.day_sections[day_offset].pack(fill="x", pady=10, padx=10)
+        self.visible_days = visible_days
     
     def organize_by_day(self, lessons: List[Dict[str, Any]], monday: datetime.date) -> Dict[datetime.date, List[Dict[str, Any]]]:
         """Organiser les cours par jour"""
@@ -173,78 +319,123 @@ class SchedulePage(ctk.CTkScrollableFrame):
         
         return by_day
     
-    def create_day_section(self, day_name: str, day_date: datetime.date, lessons: List[Dict[str, Any]]):
-        """Créer une section pour un jour"""
+    def create_day_section(self) -> ctk.CTkFrame:
+        """Créer la section vide d'un jour (réutilisée d'une semaine à l'autre)"""
         
         # Frame du jour
         day_frame = ctk.CTkFrame(self.schedule_container)
-        day_frame.pack(fill="x", pady=10, padx=10)
         
         # En-tête du jour
         header = ctk.CTkFrame(day_frame, fg_color=["#E0E0E0", "#2B2B2B"])
         header.pack(fill="x", padx=5, pady=5)
         
-        day_label = ctk.CTkLabel(
+        day_frame.day_label = ctk.CTkLabel(
             header,
-            text=f"{day_name} {day_date.strftime('%d/%m')}",
+            text="",
             font=ctk.CTkFont(size=16, weight="bold")
         )
-        day_label.pack(side="left", padx=15, pady=10)
+        day_frame.day_label.pack(side="left", padx=15, pady=10)
         
-        count_label = ctk.CTkLabel(
+        day_frame.count_label = ctk.CTkLabel(
             header,
-            text=f"{len(lessons)} cours",
+            text="",
             font=ctk.CTkFont(size=12),
             text_color="gray"
         )
-        count_label.pack(side="right", padx=15, pady=10)
+        day_frame.count_label.pack(side="right", padx=15, pady=10)
         
-        # Cours du jour
-        if lessons:
-            for lesson in lessons:
-                self.create_lesson_card(day_frame, lesson)
-        else:
-            no_lesson_label = ctk.CTkLabel(
-                day_frame,
-                text="Aucun cours",
-                font=ctk.CTkFont(size=13),
-                text_color="gray"
-            )
-            no_lesson_label.pack(pady=15)
-    
-    def create_lesson_card(self, parent, lesson: Dict[str, Any]):
-        """Créer une carte pour un cours"""
+        day_frame.no_lesson_label = ctk.CTkLabel(
+            day_frame,
+            text="Aucun cours",
+            font=ctk.CTkFont(size=13),
+            text_color="gray"
+        )
         
-        # Couleur basée sur la matière
-        subject = lesson.get("subject", "")
-        color = SUBJECT_COLORS.get(subject, SUBJECT_COLORS["default"])
+        # Cartes de cours créées au besoin puis gardées; les premières
+        # "shown" sont affichées, les suivantes attendent une journée plus chargée
+        day_frame.cards = []
+        day_frame.shown = 0
+        day_frame.empty = None
+        return day_frame
+    
+    def update_day_section(self, day_frame: ctk.CTkFrame, day_name: str, day_date: datetime.date,
+                           lessons: List[Dict[str, Any]]):
+        """Afficher un jour et ses cours dans une section existante"""
+        day_frame.day_label.configure(text=f"{day_name} {day_date.strftime('%d/%m')}")
+        day_frame.count_label.configure(text=f"{len(lessons)} cours")
+        
+        empty = not lessons
+        if empty != day_frame.empty:
+            if empty:
+                day_frame.no_lesson_label.pack(pady=15)
+            else:
+                day_frame.no_lesson_label.pack_forget()
+            day_frame.empty = empty
+        
+        # Compléter la réserve de cartes si la journée en demande plus
+        while len(day_frame.cards) < len(lessons):
+            day_frame.cards.append(self.create_lesson_card(day_frame))
+        
+        for card, lesson in zip(day_frame.cards, lessons):
+            self.update_lesson_card(card, lesson)
+        
+        # Les cartes affichées sont toujours les premières: l'ordre est conservé
+        for card in day_frame.cards[len(lessons):day_frame.shown]:
+            card.pack_forget()
+        for card in day_frame.cards[day_frame.shown:len(lessons)]:
+            card.pack(fill="x", padx=10, pady=5)
+        day_frame.shown = len(lessons)
+    
+    def create_lesson_card(self, parent) -> ctk.CTkFrame:
+        """Créer une carte de cours vide (réutilisée d'une semaine à l'autre)"""
         
         # Carte
-        card = ctk.CTkFrame(parent, border_width=2, border_color=color)
-        card.pack(fill="x", padx=10, pady=5)
+        card = ctk.CTkFrame(parent, border_width=2)
         
         # Frame interne
         content_frame = ctk.CTkFrame(card, fg_color="transparent")
         content_frame.pack(fill="x", padx=15, pady=12)
         
         # Barre colorée à gauche (visual indicator)
-        color_bar = ctk.CTkFrame(content_frame, width=4, fg_color=color)
-        color_bar.pack(side="left", fill="y", padx=(0, 15))
+        card.color_bar = ctk.CTkFrame(content_frame, width=4)
+        card.color_bar.pack(side="left", fill="y", padx=(0, 15))
         
         # Infos du cours
         info_frame = ctk.CTkFrame(content_frame, fg_color="transparent")
         info_frame.pack(side="left", fill="both", expand=True)
         
         # Matière
-        subject_label = ctk.CTkLabel(
+        card.subject_label = ctk.CTkLabel(
             info_frame,
-            text=subject,
+            text="",
             font=ctk.CTkFont(size=15, weight="bold"),
             anchor="w"
         )
-        subject_label.pack(anchor="w")
+        card.subject_label.pack(anchor="w")
         
         # Détails
+        card.details_label = ctk.CTkLabel(
+            info_frame,
+            text="",
+            font=ctk.CTkFont(size=12),
+            text_color="gray",
+            anchor="w"
+        )
+        card.details_label.pack(anchor="w", pady=(5, 0))
+        card.color = None
+        return card
+    
+    def update_lesson_card(self, card: ctk.CTkFrame, lesson: Dict[str, Any]):
+        """Afficher un cours dans une carte existante"""
+        
+        # Couleur basée sur la matière (inchangée: pas de redessin)
+        subject = lesson.get("subject", "")
+        color = SUBJECT_COLORS.get(subject, SUBJECT_COLORS["default"])
+        if color != card.color:
+            card.configure(border_color=color)
+            card.color_bar.configure(fg_color=color)
+            card.color = color
+        
         start = lesson["start"]
         end = lesson["end"]
         
@@ -264,11 +455,5 @@ class SchedulePage(ctk.CTkScrollableFrame):
         if classroom:
             details.append(f"📍 {classroom}")
         
-        details_label = ctk.CTkLabel(
-            info_frame,
-            text=" • ".join(details),
-            font=ctk.CTkFont(size=12),
-            text_color="gray",
-            anchor="w"
-        )
-        details_label.pack(anchor="w", pady=(5, 0))
+        card.subject_label.configure(text=subject)
+        card.details_label.configure(text=" • ".join(details))
@@ -0,0 +1,224 @@
+"""
+Liste virtualisée: seules les lignes visibles (et leurs voisines) existent
+sous forme de widgets, recyclés au fil du défilement
+"""
+import bisect
+import sys
+import tkinter
+import customtkinter as ctk
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple, Union
+import logging
+
+from app.config import UI_LIST_OVERSCAN
+
+logger = logging.getLogger(__name__)
+
+
+class RowTemplate(NamedTuple):
+    """Type de ligne d'une VirtualList (en-tête de section, note, devoir...)"""
+    create: Callable[[Any], Any]            # (parent) -> widget vide
+    update: Callable[[Any, Any], None]      # (widget, élément): afficher un élément
+    height: Union[int, Callable[[Any], int]]  # Hauteur fixe, ou calculée pour un élément
+
+
+class VirtualList(ctk.CTkFrame):
+    """
+    Liste défilante dont le coût ne dépend pas du nombre d'éléments
+
+    Les éléments sont des couples (type, valeur), le type désignant un
+    RowTemplate. Les positions sont calculées à partir des hauteurs des
+    modèles, sans créer de widget; au défilement, les lignes sorties de la
+    zone visible (élargie de overscan pixels) retournent dans une réserve
+    par type et sont réutilisées pour les lignes qui y entrent. Le nombre de
+    widgets reste ainsi celui d'un écran, quel que soit le nombre d'éléments.
+    """
+
+    def __init__(self, parent, templates: Dict[str, RowTemplate],
+                 overscan: int = UI_LIST_OVERSCAN, **kwargs):
+        """
+        Args:
+            parent: Widget parent
+            templates: {type: RowTemplate}
+            overscan: Pixels rendus au-dessus et au-dessous de la zone visible
+            kwargs: Options de CTkFrame
+        """
+        kwargs.setdefault("fg_color", "transparent")
+        kwargs.setdefault("corner_radius", 0)
+        super().__init__(parent, **kwargs)
+
+        self.templates = templates
+        self.overscan = overscan
+
+        self._items: List[Tuple[str, Any]] = []
+        self._tops: List[int] = []
+        self._heights: List[int] = []
+        self._width = 1
+        # {index: (type, widget, fenêtre du canevas)} des lignes affichées
+        self._visible: Dict[int, Tuple[str, Any, int]] = {}
+        # {type: [(widget, fenêtre)]} des lignes disponibles
+        self._pool: Dict[str, List[Tuple[Any, int]]] = {}
+
+        self.grid_rowconfigure(0, weight=1)
+        self.grid_columnconfigure(0, weight=1)
+
+        self._canvas = tkinter.Canvas(self, highlightthickness=0, yscrollincrement=20)
+        self._canvas.grid(row=0, column=0, sticky="nsew")
+        self._scrollbar = ctk.CTkScrollbar(self, command=self._canvas.yview)
+        self._scrollbar.grid(row=0, column=1, sticky="ns")
+        self._canvas.configure(yscrollcommand=self._on_yscroll)
+        self._canvas.bind("<Configure>", self._on_configure)
+        self._apply_canvas_color()
+
+        # Molette: étiquette propre à la liste, posée sur le canevas et chaque
+        # ligne (les widgets recyclés la gardent)
+        self._wheel_tag = f"VirtualList{id(self)}"
+        if sys.platform.startswith("linux"):
+            self._canvas.bind_class(self._wheel_tag, "<Button-4>", self._on_mouse_wheel)
+            self._canvas.bind_class(self._wheel_tag, "<Button-5>", self._on_mouse_wheel)
+        else:
+            self._canvas.bind_class(self._wheel_tag, "<MouseWheel>", self._on_mouse_wheel)
+        self._add_wheel_tag(self._canvas)
+
+    @property
+    def items(self) -> List[Tuple[str, Any]]:
+        """Éléments de la liste (à ne pas modifier directement)"""
+        return self._items
+
+    def set_items(self, items: List[Tuple[str, Any]], keep_scroll: bool = False):
+        """
+        Remplacer le contenu de la liste
+
+        Args:
+            items: Éléments (type, valeur)
+            keep_scroll: Garder la position de défilement (sinon retour en haut)
+
+        Raises:
+            KeyError: Type d'élément sans modèle
+        """
+        self._items = list(items)
+        self._layout()
+        for index in list(self._visible):
+            self._release(index)
+        if not keep_scroll:
+            self._canvas.yview_moveto(0)
+        self._render()
+
+    def replace(self, index: int, value: Any):
+        """Remplacer la valeur d'un élément (même type), en mettant sa ligne à jour"""
+        kind = self._items[index][0]
+        self._items[index] = (kind, value)
+        if self._height_of(kind, value) != self._heights[index]:
+            self.set_items(self._items, keep_scroll=True)
+        elif index in self._visible:
+            self.templates[kind].update(self._visible[index][1], value)
+
+    def clear(self):
+        """Vider la liste (les widgets restent en réserve)"""
+        self.set_items([])
+
+    def yview(self) -> Tuple[float, float]:
+        """Partie visible, en fractions de la hauteur totale"""
+        return self._canvas.yview()
+
+    def yview_moveto(self, fraction: float):
+        """Faire défiler jusqu'à une fraction de la hauteur totale"""
+        self._canvas.yview_moveto(fraction)
+
+    def _height_of(self, kind: str, value: Any) -> int:
+        """Hauteur d'un élément, en pixels à l'échelle de l'affichage"""
+        height = self.templates[kind].height
+        if callable(height):
+            height = height(value)
+        return round(self._apply_widget_scaling(height))
+
+    def _layout(self):
+        """Calculer la position de chaque élément et la hauteur totale"""
+        self._heights = [self._height_of(kind, value) for kind, value in self._items]
+        self._tops = []
+        top = 0
+        for height in self._heights:
+            self._tops.append(top)
+            top += height
+        self._canvas.configure(scrollregion=(0, 0, self._width, max(top, 1)))
+
+    def _render(self):
+        """Afficher les lignes de la zone visible et recycler les autres"""
+        top = self._canvas.canvasy(0) - self.overscan
+        bottom = self._canvas.canvasy(0) + self._canvas.winfo_height() + self.overscan
+        first = max(0, bisect.bisect_right(self._tops, top) - 1)
+        last = bisect.bisect_left(self._tops, bottom)
+
+        for index in [index for index in self._visible if index < first or index >= last]:
+            self._release(index)
+        for index in range(first, last):
+            if index not in self._visible:
+                self._place(index)
+
+    def _place(self, index: int):
+        """Afficher un élément dans une ligne réutilisée (ou créée si la réserve est vide)"""
+        kind, value = self._items[index]
+        pool = self._pool.setdefault(kind, [])
+        if pool:
+            widget, window = pool.pop()
+        else:
+            widget = self.templates[kind].create(self._canvas)
+            self._add_wheel_tag(widget)
+            window = self._canvas.create_window(0, 0, window=widget, anchor="nw")
+
+        self.templates[kind].update(widget, value)
+        self._canvas.coords(window, 0, self._tops[index])
+        self._canvas.itemconfigure(window, width=self._width, height=self._heights[index], state="normal")
+        self._visible[index] = (kind, widget, window)
+
+    def _release(self, index: int):
+        """Masquer une ligne et la remettre en réserve"""
+        kind, widget, window = self._visible.pop(index)
+        self._canvas.itemconfigure(window, state="hidden")
+        self._pool.setdefault(kind, []).append((widget, window))
+
+    def _add_wheel_tag(self, widget):
+        """Faire défiler la liste à la molette au-dessus d'un widget et de ses enfants"""
+        widget.bindtags((self._wheel_tag,) + widget.bindtags())
+        for child in widget.winfo_children():
+            self._add_wheel_tag(child)
+
+    def _on_mouse_wheel(self, event):
+        """Défiler de quelques lignes par cran de molette"""
+        if sys.platform.startswith("linux"):
+            steps = -3 if event.num == 4 else 3
+        elif sys.platform == "darwin":
+            steps = -event.delta
+        else:
+            steps = -int(event.delta / 40)
+        if self._canvas.yview() != (0.0, 1.0):
+            self._canvas.yview_scroll(steps, "units")
+
+    def _on_yscroll(self, first: str, last: str):
+        """Suivre le défilement: barre de défilement et lignes affichées"""
+        self._scrollbar.set(first, last)
+        self._render()
+
+    def _on_configure(self, event):
+        """Adapter la largeur des lignes à celle de la liste"""
+        if event.width == self._width:
+            self._render()
+            return
+        self._width = event.width
+        self._canvas.configure(scrollregion=(0, 0, self._width, max(sum(self._heights), 1)))
+        for _, _, window in self._visible.values():
+            self._canvas.itemconfigure(window, width=self._width)
+        for pool in self._pool.values():
+            for _, window in pool:
+                self._canvas.itemconfigure(window, width=self._width)
+        self._render()
+
+    def _apply_canvas_color(self):
+        """Donner au canevas la couleur de fond de la liste"""
+        color = self.cget("fg_color")
+        if color == "transparent":
+            color = self.cget("bg_color")
+        self._canvas.configure(bg=self._apply_appearance_mode(color))
+
+    def _set_appearance_mode(self, mode_string):
+        super()._set_appearance_mode(mode_string)
+        self._apply_canvas_color()
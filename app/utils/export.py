@@ -56,7 +56,7 @@ class DataExporter:
                 # Données
                 for period in grades_data.get("periods", []):
                     period_name = period.get("name", "")
-                    for grade in period.get("grades", []):
+                    for grade in period.get("grades") or []:
                         writer.writerow([
                             period_name,
                             grade.get("subject", ""),
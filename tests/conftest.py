@@ -0,0 +1,71 @@
+"""
+Fixtures communes: fichiers de cache temporaires, ouverture des deux backends
+et client Pronote connecté à un faux serveur
+"""
+from types import SimpleNamespace
+
+import pytest
+
+from app.pronote_api.cache import Cache
+from app.pronote_api.client import PronoteClient
+from app.pronote_api.sqlite_cache import SQLiteCache
+from app.pronote_api.ttl import AdaptiveTTL
+
+
+@pytest.fixture
+def cache_file(tmp_path):
+    """Chemin du cache fichier (PCACHE1) du test"""
+    return tmp_path / "cache.json"
+
+
+@pytest.fixture
+def db_file(tmp_path):
+    """Chemin de la base SQLite du test"""
+    return tmp_path / "cache.sqlite3"
+
+
+@pytest.fixture
+def file_cache(cache_file):
+    """
+    Ouvrir une instance de Cache sur cache_file (plusieurs instances jouent
+    plusieurs processus); toutes sont fermées à la fin du test
+    """
+    opened = []
+
+    def open_file_cache(durability: str = "immediate") -> Cache:
+        cache = Cache(cache_file, durability=durability)
+        opened.append(cache)
+        return cache
+
+    yield open_file_cache
+    for cache in opened:
+        cache.close()
+
+
+@pytest.fixture
+def sqlite_cache(db_file):
+    """Ouvrir un SQLiteCache sur db_file; toutes les instances sont fermées à la fin du test"""
+    opened = []
+
+    def open_sqlite_cache(legacy_file=None, durability: str = "immediate") -> SQLiteCache:
+        cache = SQLiteCache(db_file, legacy_file=legacy_file, durability=durability)
+        opened.append(cache)
+        return cache
+
+    yield open_sqlite_cache
+    for cache in opened:
+        cache.close()
+
+
+@pytest.fixture
+def client(tmp_path, file_cache):
+    """
+    PronoteClient "connecté": client.client est un faux client pronotepy
+    que chaque test complète avec les méthodes qu'il appelle
+    """
+    client = PronoteClient(cache=file_cache(), ttl_policy=AdaptiveTTL(tmp_path / "ttl.json"))
+    client.client = SimpleNamespace(pronote_url="https://pronote.test", username="eleve",
+                                    session_check=lambda: False)
+    client.logged_in = True
+    yield client
+    client.close()
@@ -0,0 +1,76 @@
+"""
+Tests du fichier de cache indexé (PCACHE1): lecture paresseuse, réparation, ancien format
+"""
+import datetime
+
+from app.pronote_api import codec
+from app.pronote_api.cache import FILE_MAGIC
+
+
+def test_file_starts_with_header_and_index(cache_file, file_cache):
+    file_cache().set("grades", {"periods": []})
+
+    header = cache_file.read_bytes().split(b"\n", 1)[0].split()
+    assert header[0] == FILE_MAGIC
+    assert len(header) == 3
+
+
+def test_values_are_decoded_on_first_get(file_cache):
+    cache = file_cache()
+    cache.set("homework", [{"id": "h1", "date": datetime.date(2026, 1, 5)}])
+    cache.set("messages", ["Sortie"])
+    cache.close()
+
+    cache = file_cache()
+    # Seul l'index est lu à l'ouverture
+    assert all("data" not in entry for entry in cache.cache_data.values())
+    assert cache.get("homework") == [{"id": "h1", "date": datetime.date(2026, 1, 5)}]
+    assert "data" in cache.cache_data["homework"]
+    assert "data" not in cache.cache_data["messages"]
+
+
+def test_reopened_cache_rewrites_values_it_never_read(file_cache):
+    cache = file_cache()
+    cache.set("a", "première")
+    cache.close()
+
+    cache = file_cache()
+    cache.set("b", "seconde")
+    cache.close()
+
+    cache = file_cache()
+    assert cache.get("a") == "première"
+    assert cache.get("b") == "seconde"
+
+
+def test_truncated_file_keeps_complete_entries(cache_file, file_cache):
+    cache = file_cache()
+    cache.set("first", "x" * 50)
+    cache.set("second", "y" * 50)
+    cache.close()
+
+    data = cache_file.read_bytes()
+    cache_file.write_bytes(data[:-10])
+
+    cache = file_cache()
+    assert cache.get("first") == "x" * 50
+    assert cache.get("second") is None
+    assert cache.keys() == ["first"]
+
+
+def test_corrupt_header_is_set_aside(cache_file, file_cache):
+    cache_file.write_bytes(FILE_MAGIC + b" pas-un-nombre\n{}")
+
+    assert file_cache().keys() == []
+    assert cache_file.with_name("cache.json.corrupt").exists()
+
+
+def test_single_block_file_is_read_and_rewritten_indexed(cache_file, file_cache):
+    cache_file.write_text(codec.encode({
+        "grades": {"timestamp": datetime.datetime.now().isoformat(), "data": {"periods": []}},
+    }), encoding="utf-8")
+
+    cache = file_cache()
+    assert cache.get("grades") == {"periods": []}
+    cache.close()
+    assert cache_file.read_bytes().startswith(FILE_MAGIC)
@@ -0,0 +1,78 @@
+"""
+Tests des clés du cache: espaces de noms par compte, périodes couvrantes et recherche par période
+"""
+import datetime
+
+from app.pronote_api.cache_keys import (
+    account_id,
+    account_prefix,
+    covering,
+    is_past_range,
+    lookup_range,
+    make_key,
+    parse_range,
+    range_key,
+)
+
+D = datetime.date
+ACCOUNT = account_id("https://x/parent.html", "parent", "Léa")
+PREFIX = make_key(ACCOUNT, "schedule") + ":"
+
+
+def test_children_share_the_account_prefix_but_not_their_keys():
+    other = account_id("https://x/parent.html", "parent", "Hugo")
+    assert ACCOUNT.startswith(account_prefix("https://x/parent.html", "parent"))
+    assert range_key(ACCOUNT, "schedule", D(2026, 1, 5)) != range_key(other, "schedule", D(2026, 1, 5))
+    assert range_key(ACCOUNT, "homework", D(2026, 1, 5)) == ACCOUNT + ":homework:2026-01-05"
+
+
+def test_parse_range_reads_closed_and_open_ranges():
+    assert parse_range(PREFIX + "2026-01-05:2026-01-11", PREFIX) == (D(2026, 1, 5), D(2026, 1, 11))
+    assert parse_range(PREFIX + "2026-01-05", PREFIX) == (D(2026, 1, 5), None)
+    assert parse_range(PREFIX + "p1", PREFIX) is None
+
+
+def test_covering_prefers_the_shortest_bounded_range():
+    keys = [
+        PREFIX + "2026-01-01:2026-01-31",
+        PREFIX + "2026-01-05:2026-01-11",
+        PREFIX + "2026-01-01",
+        PREFIX + "2026-01-07:2026-01-11",
+    ]
+    assert [key for key, _, _ in covering(keys, PREFIX, D(2026, 1, 6), D(2026, 1, 8))] == [
+        PREFIX + "2026-01-05:2026-01-11",
+        PREFIX + "2026-01-01:2026-01-31",
+        PREFIX + "2026-01-01",
+    ]
+    # Une période ouverte demandée n'est couverte que par une période ouverte
+    assert [key for key, _, _ in covering(keys, PREFIX, D(2026, 1, 6), None)] == [PREFIX + "2026-01-01"]
+
+
+def test_is_past_range():
+    key = range_key(ACCOUNT, "schedule", D(2026, 1, 5), D(2026, 1, 11))
+    assert is_past_range(key, today=D(2026, 1, 12))
+    assert not is_past_range(key, today=D(2026, 1, 11))
+    assert not is_past_range(range_key(ACCOUNT, "homework", D(2026, 1, 5)), today=D(2027, 1, 1))
+
+
+def test_lookup_range_serves_a_sub_range_and_prefers_fresh_entries(file_cache):
+    cache = file_cache()
+    month = range_key(ACCOUNT, "schedule", D(2026, 1, 1), D(2026, 1, 31))
+    week = range_key(ACCOUNT, "schedule", D(2026, 1, 5), D(2026, 1, 11))
+    cache.set(month, ["mois"])
+    cache.set(week, ["semaine"])
+    cache.set(range_key(account_id("https://x/parent.html", "parent", "Hugo"), "schedule",
+                        D(2026, 1, 5), D(2026, 1, 11)), ["autre enfant"])
+
+    hit = lookup_range(cache, ACCOUNT, "schedule", D(2026, 1, 6), D(2026, 1, 8), 30)
+    assert (hit.key, hit.value, hit.stale) == (week, ["semaine"], False)
+
+    # Semaine périmée (servie pendant le délai de grâce), mois encore valable
+    hit = lookup_range(cache, ACCOUNT, "schedule", D(2026, 1, 6), D(2026, 1, 8),
+                       lambda key: 0 if key == week else 30, grace_minutes=60)
+    assert (hit.key, hit.stale) == (month, False)
+
+    hit = lookup_range(cache, ACCOUNT, "schedule", D(2026, 1, 6), D(2026, 1, 8), 0, grace_minutes=60)
+    assert (hit.key, hit.stale) == (week, True)
+
+    assert lookup_range(cache, ACCOUNT, "schedule", D(2026, 2, 1), D(2026, 2, 7), 30) is None
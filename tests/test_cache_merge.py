@@ -0,0 +1,61 @@
+"""
+Tests du partage du fichier de cache entre processus (fusion sous verrou)
+
+Deux instances de Cache sur le même fichier jouent le rôle de deux processus.
+"""
+
+
+def test_writes_of_both_instances_are_kept(file_cache):
+    first, second = file_cache(), file_cache()
+    first.set("homework", ["h1"])
+    second.set("grades", {"periods": []})
+    first.set("messages", ["m1"])
+
+    cache = file_cache()
+    assert cache.get("homework") == ["h1"]
+    assert cache.get("grades") == {"periods": []}
+    assert cache.get("messages") == ["m1"]
+
+
+def test_most_recent_write_of_a_key_wins(file_cache):
+    first, second = file_cache(), file_cache()
+    first.set("grades", "ancienne")
+    second.set("grades", "récente")
+    # La fusion de first adopte la version plus récente écrite par second
+    first.set("messages", [])
+
+    assert first.get("grades") == "récente"
+    assert file_cache().get("grades") == "récente"
+
+
+def test_deleted_entry_is_not_resurrected(file_cache):
+    first, second = file_cache(), file_cache()
+    first.set("homework", ["h1"])
+    second.set("grades", {})
+    assert second.get("homework") == ["h1"]
+
+    second.clear("homework")
+    first.set("messages", [])
+
+    assert first.get("homework") is None
+    assert sorted(file_cache().keys()) == ["grades", "messages"]
+
+
+def test_clear_all_is_not_undone_by_older_entries(file_cache):
+    first, second = file_cache(), file_cache()
+    first.set("homework", ["h1"])
+    second.set("grades", {})
+
+    second.clear()
+    first.set("messages", [])
+
+    assert file_cache().keys() == ["messages"]
+
+
+def test_reader_follows_a_file_rewritten_by_another_instance(file_cache):
+    first, second = file_cache(), file_cache()
+    first.set("homework", ["h1"])
+    reader = file_cache()
+    second.set("grades", {})
+    # Le fichier a été remplacé depuis la lecture de l'index
+    assert reader.get("homework") == ["h1"]
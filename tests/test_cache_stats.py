@@ -0,0 +1,78 @@
+"""
+Tests des statistiques du cache et de l'outil de maintenance (python -m app.pronote_api.cache)
+"""
+import json
+
+import pytest
+
+from app.pronote_api import cache as cache_module
+from app.pronote_api.cache_stats import format_report, summarize
+
+NOW = 1_000_000.0
+
+
+def test_summarize_groups_entries_by_namespace():
+    stats = summarize([
+        ("a|u|:schedule:2026-01-05:2026-01-11", 100, NOW - 10 * 60),
+        ("a|u|:schedule:2026-01-12:2026-01-18", 300, NOW - 50 * 60),
+        ("a|u|:grades", 50, NOW - 20 * 60),
+    ], now=NOW)
+
+    assert (stats["entries"], stats["bytes"]) == (3, 450)
+    assert stats["namespaces"]["schedule"] == {
+        "entries": 2, "bytes": 400, "age_min": 10.0, "age_median": 30.0, "age_max": 50.0,
+        # Plus vieille que CACHE_DURATION_MINUTES["schedule"] (30 minutes)
+        "expired": 1,
+    }
+    assert summarize([], now=NOW) == {"entries": 0, "bytes": 0, "namespaces": {}}
+
+
+def test_report_lists_namespaces_and_application_usage(sqlite_cache):
+    cache = sqlite_cache()
+    cache.set("a|u|:grades", {"periods": []})
+    usage = {"since": "2026-01-05T08:00:00", "written_at": "2026-01-05T09:00:00",
+             "cache": {"grades": {"hits": 3, "misses": 1, "stale": 0, "hit_ratio": 0.75}}}
+
+    report = format_report(cache.stats(), usage)
+    assert report.startswith("Cache sqlite:")
+    assert "grades" in report and "75%" in report
+
+
+@pytest.fixture
+def cli(monkeypatch, tmp_path, db_file):
+    """Lancer l'outil sur une base et un relevé de mesures temporaires"""
+    monkeypatch.setattr(cache_module, "CACHE_DB_FILE", db_file)
+    monkeypatch.setattr(cache_module, "METRICS_FILE", tmp_path / "metrics.json")
+    return lambda *argv: cache_module.main(["--backend", "sqlite", *argv])
+
+
+def test_stats_command_prints_json(cli, sqlite_cache, capsys):
+    cache = sqlite_cache()
+    cache.set("a|u|:homework:2026-01-05", ["h1"])
+    cache.close()
+
+    assert cli("stats", "--json") == 0
+    output = json.loads(capsys.readouterr().out)
+    assert output["store"]["namespaces"]["homework"]["entries"] == 1
+    assert output["usage"] is None
+
+
+def test_verify_command_reports_and_repairs_unreadable_entries(cli, sqlite_cache, capsys):
+    cache = sqlite_cache()
+    cache.set("a|u|:grades", {"periods": []})
+    cache._conn.execute("UPDATE entries SET data = 'pas du json' WHERE key = 'a|u|:grades'")
+    cache.close()
+
+    assert cli("verify") == 1
+    assert "a|u|:grades" in capsys.readouterr().out
+    assert cli("verify", "--repair") == 0
+    assert cli("verify") == 0
+
+
+def test_purge_expired_command(cli, sqlite_cache, capsys):
+    cache = sqlite_cache()
+    cache.set("a|u|:messages", [])
+    cache.close()
+
+    assert cli("purge-expired", "--older-than", "0") == 0
+    assert capsys.readouterr().out.strip() == "1 entrées supprimées"
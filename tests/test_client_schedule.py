@@ -0,0 +1,47 @@
+"""
+Tests de PronoteClient.get_schedule: durée de validité des cours repris du cache
+"""
+import datetime
+import time
+
+from app.pronote_api.cache_keys import range_key
+from app.pronote_api.client import PronoteClient
+from app.pronote_api.models import Lesson
+
+# Semaine future: durée de validité de base (30 minutes) et non épinglée
+MONDAY = datetime.date.today() + datetime.timedelta(days=14 - datetime.date.today().weekday())
+SUNDAY = MONDAY + datetime.timedelta(days=6)
+
+
+def lesson(lesson_id: str, day: datetime.date) -> Lesson:
+    start = datetime.datetime.combine(day, datetime.time(8))
+    return Lesson(lesson_id, "Maths", "", "", start, start + datetime.timedelta(hours=1), "", "#6b7280")
+
+
+def cache_week(client: PronoteClient, lessons: list, age_minutes: float) -> str:
+    """Écrire la semaine dans le cache comme si elle datait de age_minutes"""
+    key = range_key(client._account(), "schedule", MONDAY, SUNDAY)
+    client.cache.set(key, lessons)
+    written = datetime.datetime.now() - datetime.timedelta(minutes=age_minutes)
+    client.cache.cache_data[key]["timestamp"] = written.isoformat()
+    return key
+
+
+def test_fresh_hit_expires_with_its_cache_entry(client):
+    cache_week(client, [lesson("l1", MONDAY)], age_minutes=20)
+
+    assert [l["id"] for l in client.get_schedule(MONDAY, SUNDAY)] == ["l1"]
+    (start, end, expires_at), = client.lesson_store.intervals
+    # 30 minutes de validité moins les 20 déjà écoulées
+    remaining = expires_at - time.monotonic()
+    assert 9 * 60 < remaining <= 10 * 60
+
+
+def test_stale_hit_is_served_but_left_to_the_revalidation(client):
+    cache_week(client, [lesson("old", MONDAY)], age_minutes=60)
+    client._fetch_schedule = lambda date_from, date_to: [lesson("new", MONDAY)]
+
+    assert [l["id"] for l in client.get_schedule(MONDAY, SUNDAY)] == ["old"]
+
+    client._revalidate_executor.shutdown(wait=True)
+    assert [l["id"] for l in client.lesson_store.get(MONDAY, SUNDAY)] == ["new"]
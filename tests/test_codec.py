@@ -0,0 +1,62 @@
+"""
+Tests du codec: relecture des types d'origine et refus des autres versions
+"""
+import datetime
+from decimal import Decimal
+
+import pytest
+
+from app.pronote_api import codec
+from app.pronote_api.models import Grade, Homework, Lesson, Period
+
+
+def round_trip(value):
+    return codec.decode(codec.encode(value))
+
+
+def test_dates_and_decimals_keep_their_type():
+    value = {
+        "day": datetime.date(2026, 1, 5),
+        "at": datetime.datetime(2026, 1, 5, 8, 30),
+        "average": Decimal("12.25"),
+        "nested": [datetime.date(2026, 2, 1), {"deep": datetime.datetime(2026, 2, 1, 12)}],
+    }
+    decoded = round_trip(value)
+    assert decoded == value
+    assert type(decoded["day"]) is datetime.date
+    assert type(decoded["at"]) is datetime.datetime
+
+
+def test_records_round_trip():
+    lessons = [Lesson("l1", "Maths", "M. Dupont", "B12", datetime.datetime(2026, 1, 5, 8),
+                      datetime.datetime(2026, 1, 5, 9), "", "#123456")]
+    homework = [Homework("h1", "Français", "Lire le chapitre 2", True, datetime.date(2026, 1, 6))]
+    assert round_trip(lessons) == lessons
+    assert round_trip(homework) == homework
+
+
+def test_period_with_grades_and_unloaded_period():
+    grades = (Grade("g1", "15", "20", "Maths", datetime.date(2026, 1, 5), "2"),)
+    loaded = Period("p1", "Trimestre 1", grades)
+    unloaded = Period("p2", "Trimestre 2", None)
+
+    decoded = round_trip({"periods": [loaded, unloaded]})
+    assert decoded["periods"] == [loaded, unloaded]
+    assert isinstance(decoded["periods"][0].grades, tuple)
+    assert not decoded["periods"][1].loaded
+
+
+def test_sets_are_stored_as_lists():
+    assert sorted(round_trip({"ids": {"b", "a"}})["ids"]) == ["a", "b"]
+
+
+def test_plain_dicts_with_marker_like_keys_are_untouched():
+    value = {"$d": "2026-01-05", "other": 1, "third": 2}
+    assert round_trip(value) == value
+
+
+def test_other_format_version_is_rejected():
+    with pytest.raises(codec.CodecVersionError):
+        codec.decode('{"a": 1}')
+    with pytest.raises(codec.CodecVersionError):
+        codec.decode(f"{codec.CODEC_VERSION + 1}:{{}}")
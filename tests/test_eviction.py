@@ -0,0 +1,69 @@
+"""
+Tests du budget du cache: quotas par type de donnée, éviction LRU et application par les deux backends
+"""
+import pytest
+
+from app.pronote_api.eviction import CacheBudget, namespace_of
+
+
+@pytest.mark.parametrize("key, namespace", [
+    ("https://x/eleve.html|eleve|:schedule:2026-01-05:2026-01-11", "schedule"),
+    ("https://x/parent.html|parent|Léa:grades", "grades"),
+    ("https://x|eleve|:period_grades:p1", "period_grades"),
+    ("user_info", "user_info"),
+])
+def test_namespace_of(key, namespace):
+    assert namespace_of(key) == namespace
+
+
+def test_quota_evicts_oldest_entries_of_its_namespace_only():
+    budget = CacheBudget(max_entries=100, max_bytes=10**6, quotas={"schedule": 2})
+    entries = [
+        ("s1", "schedule", 10, 1.0),
+        ("s3", "schedule", 10, 3.0),
+        ("s2", "schedule", 10, 2.0),
+        ("g1", "grades", 10, 0.0),
+    ]
+    assert budget.exceeded(4, 40, {"schedule": 3, "grades": 1})
+    assert budget.victims(entries) == [("s1", "quota")]
+
+
+def test_global_budget_evicts_from_the_fullest_namespace():
+    budget = CacheBudget(max_entries=3, max_bytes=10**6, quotas={"schedule": 10, "grades": 2})
+    entries = [
+        ("s1", "schedule", 10, 1.0),
+        ("s2", "schedule", 10, 2.0),
+        ("g1", "grades", 10, 3.0),
+        ("g2", "grades", 10, 4.0),
+    ]
+    # Les notes remplissent leur quota (2/2), l'emploi du temps seulement 2/10
+    assert budget.victims(entries) == [("g1", "lru")]
+
+
+def test_byte_budget_evicts_until_under_the_limit():
+    budget = CacheBudget(max_entries=100, max_bytes=25, quotas={})
+    entries = [("a", "x", 10, 1.0), ("b", "x", 10, 2.0), ("c", "x", 10, 3.0)]
+    assert not budget.exceeded(2, 20, {"x": 2})
+    assert budget.victims(entries) == [("a", "lru")]
+
+
+def test_file_cache_evicts_least_recently_read(file_cache):
+    cache = file_cache()
+    cache.budget = CacheBudget(max_entries=2, max_bytes=10**6, quotas={})
+    cache.set("a|u|:grades", 1)
+    cache.set("a|u|:homework", 2)
+    cache.get("a|u|:grades")
+    cache.set("a|u|:messages", 3)
+
+    assert sorted(cache.keys()) == ["a|u|:grades", "a|u|:messages"]
+    assert cache.evictions["lru"] == 1
+
+
+def test_sqlite_cache_applies_quotas_on_flush(sqlite_cache):
+    cache = sqlite_cache()
+    cache.budget = CacheBudget(max_entries=100, max_bytes=10**6, quotas={"schedule": 1})
+    cache.set("a|u|:schedule:2026-01-05:2026-01-11", [])
+    cache.set("a|u|:schedule:2026-01-12:2026-01-18", [])
+
+    assert cache.keys("a|u|:schedule") == ["a|u|:schedule:2026-01-12:2026-01-18"]
+    assert cache.evictions["quota"] == 1
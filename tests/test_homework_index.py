@@ -0,0 +1,79 @@
+"""
+Tests de HomeworkIndex: filtres combinés, recherche, sections par date
+"""
+import datetime
+
+import pytest
+
+from app.pronote_api.homework_index import HomeworkIndex, normalize
+from app.pronote_api.models import Homework
+
+D = datetime.date
+
+
+@pytest.fixture
+def index():
+    return HomeworkIndex([
+        Homework("h1", "Mathématiques", "Exercices 3 et 4 page 52", False, D(2026, 1, 6)),
+        Homework("h2", "Français", "Lire le chapitre 2", True, D(2026, 1, 5)),
+        Homework("h3", "Mathématiques", "Réviser le contrôle", False, D(2026, 1, 5)),
+        Homework("h4", "Histoire", "Exposé sur la Révolution", False, datetime.datetime(2026, 1, 9, 8)),
+        Homework("h5", "Anglais", "Apporter le manuel", False, None),
+    ])
+
+
+def ids(index, positions):
+    return sorted(index.items[position]["id"] for position in positions)
+
+
+def test_normalize_removes_case_and_accents():
+    assert normalize("Révolution Française") == "revolution francaise"
+
+
+def test_subjects_are_sorted(index):
+    assert index.subjects() == ["Anglais", "Français", "Histoire", "Mathématiques"]
+
+
+def test_no_criteria_selects_everything(index):
+    assert ids(index, index.filter()) == ["h1", "h2", "h3", "h4", "h5"]
+
+
+def test_status_and_subject_filters_intersect(index):
+    assert ids(index, index.filter(status="done")) == ["h2"]
+    assert ids(index, index.filter(status="todo", subject="Mathématiques")) == ["h1", "h3"]
+    assert ids(index, index.filter(subject="Physique")) == []
+
+
+def test_search_matches_word_prefixes_without_accents(index):
+    assert ids(index, index.search("math")) == ["h1", "h3"]
+    assert ids(index, index.search("revol")) == ["h4"]
+    assert ids(index, index.search("math revi")) == ["h3"]
+    assert ids(index, index.search("chimie")) == []
+    assert ids(index, index.search("  ")) == ["h1", "h2", "h3", "h4", "h5"]
+
+
+def test_filter_combines_search_with_other_criteria(index):
+    assert ids(index, index.filter(status="todo", query="le")) == ["h3", "h5"]
+
+
+def test_set_done_updates_status_index(index):
+    updated = index.set_done("h1", True)
+    assert updated["done"] is True
+    assert ids(index, index.filter(status="done")) == ["h1", "h2"]
+    assert index.set_done("inconnu", True) is None
+
+
+def test_sections_are_chronological_with_undated_last(index):
+    sections = index.sections(index.filter())
+    assert [date for date, _ in sections] == [D(2026, 1, 5), D(2026, 1, 6), D(2026, 1, 9), None]
+    # Ordre d'origine conservé pour une même date
+    assert [hw["id"] for hw in sections[0][1]] == ["h2", "h3"]
+    assert [hw["id"] for hw in sections[-1][1]] == ["h5"]
+
+
+def test_sections_date_window_and_empty_dates(index):
+    sections = index.sections(index.filter(subject="Mathématiques"), date_to=D(2026, 1, 5))
+    assert sections == [(D(2026, 1, 5), [index.items[2]])]
+
+    sections = index.sections(index.filter(status="todo"), date_from=D(2026, 1, 6), date_to=D(2026, 1, 9))
+    assert [date for date, _ in sections] == [D(2026, 1, 6), D(2026, 1, 9), None]
@@ -0,0 +1,113 @@
+"""
+Tests de LessonStore: trous à récupérer, remplacement et expiration des intervalles
+"""
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.pronote_api import lesson_store
+from app.pronote_api.lesson_store import LessonStore
+
+D = datetime.date
+
+
+def lesson(day: datetime.date, hour: int = 8) -> dict:
+    return {"id": f"{day}-{hour}", "start": datetime.datetime.combine(day, datetime.time(hour))}
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge monotone contrôlée par le test (secondes)"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(lesson_store, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+def test_empty_store_misses_whole_range():
+    store = LessonStore(lambda start, end: 30)
+    assert store.missing(D(2026, 1, 5), D(2026, 1, 11)) == [(D(2026, 1, 5), D(2026, 1, 11))]
+
+
+def test_gaps_around_and_between_known_intervals(clock):
+    store = LessonStore(lambda start, end: 30)
+    store.add(D(2026, 1, 8), D(2026, 1, 9), [])
+    store.add(D(2026, 1, 12), D(2026, 1, 14), [])
+
+    assert store.missing(D(2026, 1, 5), D(2026, 1, 18)) == [
+        (D(2026, 1, 5), D(2026, 1, 7)),
+        (D(2026, 1, 10), D(2026, 1, 11)),
+        (D(2026, 1, 15), D(2026, 1, 18)),
+    ]
+    assert store.missing(D(2026, 1, 8), D(2026, 1, 9)) == []
+
+
+def test_adjacent_intervals_cover_without_gap(clock):
+    store = LessonStore(lambda start, end: 30)
+    store.add(D(2026, 1, 5), D(2026, 1, 11), [])
+    store.add(D(2026, 1, 12), D(2026, 1, 18), [])
+    assert store.missing(D(2026, 1, 5), D(2026, 1, 18)) == []
+
+
+def test_new_lessons_replace_known_days_and_get_is_sorted(clock):
+    store = LessonStore(lambda start, end: 30)
+    store.add(D(2026, 1, 5), D(2026, 1, 11), [lesson(D(2026, 1, 6), 10), lesson(D(2026, 1, 6), 8)])
+    store.add(D(2026, 1, 6), D(2026, 1, 6), [lesson(D(2026, 1, 6), 14)])
+
+    assert [l["id"] for l in store.get(D(2026, 1, 5), D(2026, 1, 11))] == ["2026-01-06-14"]
+
+    store.add(D(2026, 1, 7), D(2026, 1, 7), [lesson(D(2026, 1, 7), 9), lesson(D(2026, 1, 7), 8)])
+    assert [l["id"] for l in store.get(D(2026, 1, 7), D(2026, 1, 7))] == ["2026-01-07-8", "2026-01-07-9"]
+
+
+def test_expired_interval_becomes_a_gap_and_its_days_are_dropped(clock):
+    store = LessonStore(lambda start, end: 1)
+    store.add(D(2026, 1, 5), D(2026, 1, 11), [lesson(D(2026, 1, 5))])
+
+    clock.value += 61
+    assert store.missing(D(2026, 1, 5), D(2026, 1, 11)) == [(D(2026, 1, 5), D(2026, 1, 11))]
+    assert store.lessons_by_day == {}
+
+
+def test_fresh_interval_keeps_its_own_expiry(clock):
+    ages = {D(2026, 1, 5): 1, D(2026, 1, 12): 30}
+    store = LessonStore(lambda start, end: ages[start])
+    store.add(D(2026, 1, 5), D(2026, 1, 11), [lesson(D(2026, 1, 5))])
+    clock.value += 30
+    store.add(D(2026, 1, 12), D(2026, 1, 18), [lesson(D(2026, 1, 12))])
+
+    # La semaine ancienne expire sans entraîner celle qui vient d'être reçue
+    clock.value += 31
+    assert store.missing(D(2026, 1, 5), D(2026, 1, 18)) == [(D(2026, 1, 5), D(2026, 1, 11))]
+    assert list(store.lessons_by_day) == [D(2026, 1, 12)]
+
+
+def test_trimmed_interval_keeps_its_expiry(clock):
+    ages = {D(2026, 1, 5): 1, D(2026, 1, 8): 30}
+    store = LessonStore(lambda start, end: ages[start])
+    store.add(D(2026, 1, 5), D(2026, 1, 11), [])
+    store.add(D(2026, 1, 8), D(2026, 1, 8), [])
+
+    clock.value += 61
+    assert store.missing(D(2026, 1, 5), D(2026, 1, 11)) == [
+        (D(2026, 1, 5), D(2026, 1, 7)),
+        (D(2026, 1, 9), D(2026, 1, 11)),
+    ]
+
+
+def test_clear_forgets_everything(clock):
+    store = LessonStore(lambda start, end: 30)
+    store.add(D(2026, 1, 5), D(2026, 1, 11), [lesson(D(2026, 1, 5))])
+    store.clear()
+    assert store.get(D(2026, 1, 5), D(2026, 1, 11)) == []
+    assert store.missing(D(2026, 1, 5), D(2026, 1, 5)) == [(D(2026, 1, 5), D(2026, 1, 5))]
+
+
+def test_explicit_max_age_overrides_the_policy(clock):
+    store = LessonStore(lambda start, end: 30)
+    store.add(D(2026, 1, 5), D(2026, 1, 11), [lesson(D(2026, 1, 5))], max_age_minutes=2)
+
+    clock.value += 119
+    assert store.missing(D(2026, 1, 5), D(2026, 1, 11)) == []
+    clock.value += 2
+    assert store.missing(D(2026, 1, 5), D(2026, 1, 11)) == [(D(2026, 1, 5), D(2026, 1, 11))]
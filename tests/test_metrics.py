@@ -0,0 +1,65 @@
+"""
+Tests des mesures: chronomètres, percentiles, erreurs, taux de succès du cache et écriture
+"""
+import json
+
+import pytest
+
+from app.pronote_api.metrics import Metrics, MetricsWriter
+
+
+def test_percentiles_are_taken_over_the_last_samples():
+    metrics = Metrics(max_samples=100)
+    for ms in range(1, 201):
+        metrics.record_time("pronote.lessons", ms / 1000)
+
+    timer = metrics.snapshot()["timers"]["pronote.lessons"]
+    # Seuls les 100 derniers échantillons (101 à 200 ms) restent, le compte et le max portent sur tout
+    assert timer == {"count": 200, "p50_ms": 150.0, "p95_ms": 195.0, "max_ms": 200.0}
+
+
+def test_timer_counts_errors_and_still_times_the_call():
+    metrics = Metrics()
+    with pytest.raises(ValueError):
+        with metrics.timer("convert.lessons"):
+            raise ValueError("format inattendu")
+
+    snapshot = metrics.snapshot()
+    assert snapshot["errors"] == {"convert.lessons": {"ValueError": 1}}
+    assert snapshot["timers"]["convert.lessons"]["count"] == 1
+
+
+def test_cache_hit_ratio_counts_stale_hits_as_hits():
+    metrics = Metrics()
+    metrics.record_cache("schedule", True)
+    metrics.record_cache("schedule", True, stale=True)
+    metrics.record_cache("schedule", False)
+    metrics.record_items("pronote.lessons", 12)
+
+    snapshot = metrics.snapshot()
+    assert snapshot["cache"]["schedule"] == {"hits": 2, "misses": 1, "stale": 1, "hit_ratio": 0.667}
+    assert snapshot["items"] == {"pronote.lessons": 12}
+
+    metrics.reset()
+    assert metrics.snapshot()["cache"] == {}
+
+
+def test_client_stats_include_call_timers(client):
+    client.client.lessons = lambda date_from, date_to: []
+    client._fetch_schedule(None, None)
+
+    stats = client.stats()
+    assert stats["timers"]["pronote.lessons"]["count"] == 1
+    assert stats["items"]["pronote.lessons"] == 0
+    assert stats["circuit"] == "closed"
+
+
+def test_writer_writes_a_last_snapshot_on_stop(tmp_path):
+    metrics_file = tmp_path / "metrics.json"
+    writer = MetricsWriter(lambda: {"timers": {}}, metrics_file, interval_seconds=3600)
+    writer.start()
+    writer.stop()
+
+    data = json.loads(metrics_file.read_text(encoding="utf-8"))
+    assert data["timers"] == {}
+    assert "written_at" in data
@@ -0,0 +1,80 @@
+"""
+Tests des enregistrements Pronote: conversion depuis pronotepy, vue dictionnaire, immuabilité
+"""
+import datetime
+from types import SimpleNamespace
+
+import pytest
+
+from app.pronote_api.models import NO_SUBJECT, Grade, Homework, Lesson, Period, to_records
+
+START = datetime.datetime(2026, 1, 5, 8)
+
+
+class PronoteLesson:
+    """Cours pronotepy sans professeur ni salle"""
+
+    def __init__(self, lesson_id, subject):
+        self.id = lesson_id
+        self.subject = subject
+        self.start = START
+        self.end = START + datetime.timedelta(hours=1)
+        self.status = None
+        self.background_color = "#ff0000"
+
+
+class PronoteLessonWithTeacher(PronoteLesson):
+    teacher_name = "M. Martin"
+    classroom = "B12"
+
+
+def test_from_pronote_uses_defaults_for_missing_attributes():
+    lesson = Lesson.from_pronote(PronoteLesson("l1", SimpleNamespace(name="Maths")))
+
+    assert lesson == Lesson("l1", "Maths", "", "", START, START + datetime.timedelta(hours=1), None, "#ff0000")
+    assert Lesson.from_pronote(PronoteLesson("l2", None))["subject"] == NO_SUBJECT
+
+
+def test_converter_is_chosen_per_pronotepy_class():
+    Lesson.from_pronote(PronoteLesson("l1", None))
+    lesson = Lesson.from_pronote(PronoteLessonWithTeacher("l2", None))
+
+    assert (lesson["teacher"], lesson["classroom"]) == ("M. Martin", "B12")
+    assert {PronoteLesson, PronoteLessonWithTeacher} <= set(Lesson._converters)
+
+
+def test_record_reads_like_a_dict_and_is_immutable():
+    homework = Homework("h1", "Maths", "Exercice 3", False, datetime.date(2026, 1, 5))
+
+    assert homework["subject"] == "Maths"
+    assert homework.get("missing", "défaut") == "défaut"
+    assert "done" in homework and list(homework) == list(Homework.__slots__)
+    with pytest.raises(KeyError):
+        homework["missing"]
+    with pytest.raises(AttributeError):
+        homework.done = True
+    assert homework.replace(done=True)["done"] is True
+    assert homework["done"] is False
+
+
+def test_from_dict_parses_dates_and_applies_defaults():
+    homework = Homework.from_dict({"id": "h1", "subject": "Maths", "date": "2026-01-05"})
+    assert homework == Homework("h1", "Maths", "", False, datetime.date(2026, 1, 5))
+
+    lesson = Lesson.from_values(["l1", "Maths", "", "", START.isoformat(), None, "", "#6b7280"])
+    assert lesson["start"] == START
+
+
+def test_period_round_trips_its_grades():
+    grade = Grade("g1", "15", "20", "Maths", datetime.date(2026, 1, 5), "1")
+    period = Period("p1", "Trimestre 1", (grade,))
+
+    assert Period.from_dict(period.to_dict()) == period
+    assert not Period("p2", "Trimestre 2", None).loaded
+
+
+def test_to_records_converts_in_place():
+    items = [{"id": "h1", "subject": "Maths", "date": "2026-01-05"},
+             Homework("h2", "Français", "", True, None)]
+    assert to_records(Homework, items) is items
+    assert all(isinstance(item, Homework) for item in items)
@@ -0,0 +1,65 @@
+"""
+Tests de PageManager: pages gardées, libérées puis reconstruites dans leur état
+"""
+from app.ui.page_manager import PageManager
+
+
+class FakePage:
+    """Page sans Tk: note sa construction et ses chargements"""
+
+    def __init__(self, name, view_state=None):
+        self.name = name
+        self.week_offset = (view_state or {}).get("week_offset", 0)
+        # Premier chargement, directement sur la semaine gardée
+        self.loads = [self.week_offset]
+        self.destroyed = False
+
+    def pack(self, **kwargs):
+        pass
+
+    def pack_forget(self):
+        pass
+
+    def after_idle(self, callback):
+        callback()
+
+    def destroy(self):
+        self.destroyed = True
+
+    def view_state(self):
+        return {"week_offset": self.week_offset}
+
+
+def make_manager(created):
+    def factory(name):
+        def create(parent, state):
+            page = FakePage(name, state)
+            created.append(page)
+            return page
+        return create
+    return PageManager(None, {name: factory(name) for name in ("schedule", "grades", "homework")}, max_pages=2)
+
+
+def test_hidden_page_is_reused():
+    created = []
+    pages = make_manager(created)
+    schedule = pages.show("schedule")
+    pages.show("grades")
+
+    assert pages.show("schedule") is schedule
+    assert len(created) == 2
+
+
+def test_released_page_is_rebuilt_with_its_state_before_loading():
+    created = []
+    pages = make_manager(created)
+    schedule = pages.show("schedule")
+    schedule.week_offset = 3
+    pages.show("grades")
+    pages.show("homework")
+    assert schedule.destroyed
+
+    rebuilt = pages.show("schedule")
+    assert rebuilt is not schedule
+    # Un seul chargement, sur la semaine gardée
+    assert rebuilt.loads == [3]
@@ -0,0 +1,70 @@
+"""
+Tests du préchargement: ordre de priorité, délais par ressource et annulation
+"""
+import threading
+import time
+
+from app.pronote_api.prefetch import Prefetcher
+
+
+class FakeClient:
+    """Client dont chaque get_* note son appel"""
+
+    last_error = None
+
+    def __init__(self):
+        self.calls = []
+        self.release_user_info = threading.Event()
+        self.release_user_info.set()
+
+    def get_user_info(self):
+        self.calls.append("user_info")
+        self.release_user_info.wait()
+        return {"name": "Élève"}
+
+    def get_schedule(self, date_from, date_to):
+        self.calls.append("schedule")
+        return []
+
+    def get_homework(self, date_from):
+        self.calls.append("homework")
+        return []
+
+    def get_grades(self):
+        self.calls.append("grades")
+        return {"periods": []}
+
+
+def test_resources_are_fetched_in_priority_order():
+    client = FakeClient()
+    results = Prefetcher(client).run()
+
+    assert client.calls == ["user_info", "schedule", "homework", "grades", "schedule"]
+    assert all(results.values())
+
+
+def test_resource_past_its_deadline_is_skipped():
+    client = FakeClient()
+    results = Prefetcher(client, {"user_info": 10, "schedule": 0, "homework": 10, "grades": 10}).run()
+
+    assert client.calls == ["user_info", "homework", "grades"]
+    assert results["schedule_current_week"] is False
+    assert results["schedule_next_week"] is False
+
+
+def test_cancel_does_not_wait_for_a_stuck_request():
+    client = FakeClient()
+    client.release_user_info.clear()
+    prefetcher = Prefetcher(client)
+    prefetcher.start()
+    while not client.calls:
+        time.sleep(0.01)
+
+    started = time.monotonic()
+    prefetcher.cancel(timeout=0.1)
+    assert time.monotonic() - started < 1
+
+    # La requête en cours se termine, aucune autre n'est lancée
+    client.release_user_info.set()
+    prefetcher._thread.join()
+    assert client.calls == ["user_info"]
@@ -0,0 +1,140 @@
+"""
+Tests de la résilience des appels: classification, délais, disjoncteur et PronoteClient._call
+"""
+from types import SimpleNamespace
+
+import pronotepy
+import pytest
+import requests
+
+from app.pronote_api import resilience
+from app.pronote_api.resilience import (
+    AuthError,
+    CircuitBreaker,
+    CircuitOpenError,
+    FatalError,
+    RetryPolicy,
+    TransientError,
+    classify,
+)
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Horloge monotone du disjoncteur contrôlée par le test (secondes)"""
+    now = SimpleNamespace(value=1000.0)
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(monotonic=lambda: now.value))
+    return now
+
+
+@pytest.mark.parametrize("error, kind", [
+    (pronotepy.ExpiredObject("expiré"), AuthError),
+    (pronotepy.CryptoError("déchiffrement"), AuthError),
+    (pronotepy.PronoteAPIError("session", pronote_error_code=10), AuthError),
+    (pronotepy.PronoteAPIError("trop de requêtes", pronote_error_code=25), TransientError),
+    (pronotepy.PronoteAPIError("http status: 503"), TransientError),
+    (pronotepy.PronoteAPIError("http status: 429"), TransientError),
+    (pronotepy.PronoteAPIError("http status: 404"), FatalError),
+    (pronotepy.PronoteAPIError("JSONDecodeError: Expecting value"), TransientError),
+    (requests.exceptions.ConnectionError("refusée"), TransientError),
+    (requests.exceptions.ReadTimeout("lent"), TransientError),
+    (TimeoutError(), TransientError),
+    (ValueError("inattendu"), FatalError),
+    (CircuitOpenError("ouvert"), CircuitOpenError),
+])
+def test_classify(error, kind):
+    assert classify(error) is kind
+
+
+def test_retry_delays_are_capped_full_jitter(monkeypatch):
+    monkeypatch.setattr(resilience.random, "uniform", lambda low, high: high)
+    assert list(RetryPolicy(attempts=6, base_delay=0.5, max_delay=3).delays()) == [0.5, 1.0, 2.0, 3, 3]
+    assert list(RetryPolicy(attempts=1).delays()) == []
+
+
+def test_breaker_opens_after_threshold_and_refuses_calls(clock):
+    breaker = CircuitBreaker(failure_threshold=2, reset_seconds=60)
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.value += 59
+    assert not breaker.allow()
+
+
+def test_half_open_breaker_allows_a_single_trial(clock):
+    breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    breaker.record_failure()
+    clock.value += 60
+
+    assert breaker.allow()
+    assert breaker.state == CircuitBreaker.HALF_OPEN
+    assert not breaker.allow()
+
+    # Essai sans rapport avec le serveur: un autre est permis
+    breaker.release_trial()
+    assert breaker.allow()
+    breaker.record_success()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.failures == 0
+    assert breaker.allow() and breaker.allow()
+
+
+def test_failed_trial_reopens_the_breaker(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_seconds=60)
+    for _ in range(3):
+        breaker.record_failure()
+    clock.value += 60
+    assert breaker.allow()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allow()
+
+
+def test_call_refreshes_the_session_once_on_auth_error(client):
+    refreshes = []
+    client.client.refresh = lambda: refreshes.append(True)
+    answers = iter([pronotepy.ExpiredObject("session expirée"), "données"])
+
+    def fetch():
+        answer = next(answers)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    assert client._call(fetch) == "données"
+    assert refreshes == [True]
+
+
+def test_call_retries_transient_errors_then_counts_one_failure(client):
+    client.retry_policy = RetryPolicy(attempts=3, base_delay=0)
+    calls = []
+
+    def fetch():
+        calls.append(True)
+        raise requests.exceptions.ConnectionError("réseau coupé")
+
+    with pytest.raises(TransientError):
+        client._call(fetch)
+    assert len(calls) == 3
+    assert client.breaker.failures == 1
+
+
+def test_call_is_refused_while_the_breaker_is_open(client):
+    client.breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    client.breaker.record_failure()
+
+    with pytest.raises(CircuitOpenError):
+        client._call(lambda: "jamais appelé")
+
+
+def test_fatal_error_releases_the_half_open_trial(client, clock):
+    client.breaker = CircuitBreaker(failure_threshold=1, reset_seconds=60)
+    client.breaker.record_failure()
+    clock.value += 60
+
+    with pytest.raises(FatalError):
+        client._call(lambda: 1 / 0)
+    assert client.breaker.state == CircuitBreaker.HALF_OPEN
+    assert client.breaker.allow()
@@ -0,0 +1,116 @@
+"""
+Tests du pool de sessions: réutilisation, connexions partagées et fermeture hors verrou
+"""
+import threading
+
+from app.pronote_api.session_pool import SessionPool
+
+
+def lock_is_free(lock) -> bool:
+    """Le verrou peut-il être pris par un autre thread?"""
+    result = []
+
+    def try_acquire():
+        acquired = lock.acquire(blocking=False)
+        result.append(acquired)
+        if acquired:
+            lock.release()
+
+    thread = threading.Thread(target=try_acquire)
+    thread.start()
+    thread.join()
+    return result[0]
+
+
+class FakeClient:
+    """Client Pronote minimal: connexion immédiate, fermeture notée"""
+
+    def __init__(self, pool=None):
+        self.pool = pool
+        self.logged_in = False
+        self.logins = 0
+        self.closed_with_lock_free = None
+
+    def login(self, url, username, password, child=None):
+        self.logins += 1
+        self.logged_in = True
+        return True, "Connexion réussie"
+
+    def close(self):
+        self.closed_with_lock_free = lock_is_free(self.pool._lock)
+
+    def logout(self, clear_cache=True):
+        self.logged_in = False
+
+
+def test_open_session_is_reused():
+    pool = SessionPool(cache=object())
+    client = FakeClient(pool)
+    assert pool.acquire("url", "parent", "mdp", child="Léa", client=client)[0] is client
+    assert pool.acquire("url", "parent", child="Léa", client=FakeClient(pool)) == (client, "Session réutilisée")
+    assert client.logins == 1
+
+
+def test_least_recently_used_session_is_closed_outside_the_lock():
+    pool = SessionPool(cache=object(), max_sessions=2)
+    clients = {child: FakeClient(pool) for child in ("Léa", "Hugo", "Zoé")}
+    pool.acquire("url", "parent", "mdp", child="Léa", client=clients["Léa"])
+    pool.acquire("url", "parent", "mdp", child="Hugo", client=clients["Hugo"])
+    pool.get("url", "parent", "Léa")
+    pool.acquire("url", "parent", "mdp", child="Zoé", client=clients["Zoé"])
+
+    assert pool.keys() == [("url", "parent", "Léa"), ("url", "parent", "Zoé")]
+    assert clients["Hugo"].closed_with_lock_free is True
+    assert not clients["Hugo"].logged_in
+
+
+def test_pinned_session_survives_idle_eviction():
+    pool = SessionPool(cache=object(), idle_seconds=-1)
+    main, other = FakeClient(pool), FakeClient(pool)
+    pool.acquire("url", "eleve", "mdp", client=main, pinned=True)
+    pool.acquire("url", "autre", "mdp", client=other)
+
+    assert pool.keys() == [("url", "eleve", None)]
+    assert other.closed_with_lock_free is True
+
+
+def test_logged_out_session_is_forgotten():
+    pool = SessionPool(cache=object())
+    client = FakeClient(pool)
+    pool.acquire("url", "eleve", "mdp", client=client, pinned=True)
+    client.logout()
+
+    assert pool.get("url", "eleve") is None
+    assert pool.keys() == []
+
+
+def test_fan_out_queries_every_session_with_bounded_concurrency(monkeypatch):
+    monkeypatch.setattr("app.pronote_api.session_pool.SESSION_POOL_FAN_OUT", 2)
+    pool = SessionPool(cache=object())
+    running, peak = [0], [0]
+    guard = threading.Lock()
+
+    def get_homework(name):
+        def call(date_from):
+            with guard:
+                running[0] += 1
+                peak[0] = max(peak[0], running[0])
+            threading.Event().wait(0.05)
+            with guard:
+                running[0] -= 1
+            if name == "Zoé":
+                raise RuntimeError("Serveur indisponible")
+            return [f"{name} {date_from}"]
+        return call
+
+    for child in ("Léa", "Hugo", "Zoé"):
+        client = FakeClient(pool)
+        client.get_homework = get_homework(child)
+        pool.acquire("url", "parent", "mdp", child=child, client=client)
+
+    assert pool.fan_out("get_homework", "lundi") == {
+        ("url", "parent", "Léa"): ["Léa lundi"],
+        ("url", "parent", "Hugo"): ["Hugo lundi"],
+        ("url", "parent", "Zoé"): None,
+    }
+    assert peak[0] == 2
@@ -0,0 +1,90 @@
+"""
+Tests du cache SQLite: import de l'ancien cache JSON et requêtes par préfixe
+"""
+import datetime
+import json
+
+from app.pronote_api import codec
+from app.pronote_api.models import Homework
+from app.pronote_api.sqlite_cache import SQLiteCache, prefix_range
+
+
+def now_iso() -> str:
+    return datetime.datetime.now().isoformat()
+
+
+def test_migrates_versioned_single_block_file(tmp_path, sqlite_cache):
+    legacy_file = tmp_path / "cache.json"
+    homework = [Homework("h1", "Maths", "Exercice 3", False, datetime.date(2026, 1, 5))]
+    legacy_file.write_text(codec.encode({"a|u|:homework:2026-01-05": {"timestamp": now_iso(), "data": homework}}),
+                           encoding="utf-8")
+
+    cache = sqlite_cache(legacy_file)
+    assert cache.get("a|u|:homework:2026-01-05") == homework
+    assert not legacy_file.exists()
+    assert (tmp_path / "cache.json.migrated").exists()
+
+
+def test_migrates_plain_json_written_before_the_codec(tmp_path, sqlite_cache):
+    legacy_file = tmp_path / "cache.json"
+    legacy_file.write_text(json.dumps({
+        "messages": {"timestamp": now_iso(), "data": [{"subject": "Sortie"}]},
+        "broken": {"data": 1},
+    }), encoding="utf-8")
+
+    cache = sqlite_cache(legacy_file)
+    assert cache.get("messages") == [{"subject": "Sortie"}]
+    # Entrée sans horodatage ignorée
+    assert cache.keys() == ["messages"]
+
+
+def test_migrates_indexed_file(cache_file, file_cache, sqlite_cache):
+    legacy = file_cache()
+    legacy.set("grades", {"periods": []})
+    legacy.set("user_info", {"name": "Élève"})
+    legacy.close()
+
+    cache = sqlite_cache(cache_file)
+    assert cache.get("grades") == {"periods": []}
+    assert cache.get("user_info") == {"name": "Élève"}
+
+
+def test_migration_keeps_newer_database_entries(tmp_path, sqlite_cache):
+    cache = sqlite_cache()
+    cache.set("grades", "base")
+    cache.close()
+
+    legacy_file = tmp_path / "cache.json"
+    legacy_file.write_text(codec.encode({"grades": {"timestamp": now_iso(), "data": "json"}}), encoding="utf-8")
+    assert sqlite_cache(legacy_file).get("grades") == "base"
+
+
+def test_prefix_range_bounds():
+    assert prefix_range("") == ("1", ())
+    condition, (low, high) = prefix_range("a|u|")
+    assert condition == "key >= ? AND key < ?"
+    assert (low, high) == ("a|u|", "a|u}")
+
+
+def test_keys_and_clear_prefix_stay_within_prefix(sqlite_cache):
+    cache = sqlite_cache(durability="write_behind")
+    for key in ("a|u|:x", "a|u|:y", "a|u|", "a|u}", "a|v|:x", "b"):
+        cache.set(key, 1)
+    cache.flush()
+    # Écriture en attente: visible, puis supprimée avec le préfixe
+    cache.set("a|u|:z", 2)
+
+    assert cache.keys("a|u|") == ["a|u|", "a|u|:x", "a|u|:y", "a|u|:z"]
+    assert cache.clear_prefix("a|u|") == 4
+    cache.flush()
+    assert cache.keys() == ["a|u}", "a|v|:x", "b"]
+
+
+def test_file_that_is_not_a_database_is_set_aside(db_file, sqlite_cache):
+    db_file.write_bytes(b"pas une base SQLite" * 100)
+
+    cache = sqlite_cache()
+    cache.set("grades", {"periods": []})
+    assert cache.get("grades") == {"periods": []}
+    assert db_file.with_name(db_file.name + ".corrupt").exists()
+    assert cache.verify() == {}
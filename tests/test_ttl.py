@@ -0,0 +1,98 @@
+"""
+Tests d'AdaptiveTTL: durées apprises des changements, bornes, périodes passées
+"""
+import datetime
+
+import pytest
+
+from app.config import (
+    CACHE_DURATION_MINUTES,
+    CACHE_TTL_BOUNDS,
+    CACHE_TTL_GROWTH,
+    CACHE_TTL_PINNED_MINUTES,
+    CACHE_TTL_SHRINK,
+)
+from app.pronote_api.ttl import AdaptiveTTL
+
+ACCOUNT = "https://demo.index-education.net/pronote/eleve.html|eleve|"
+KEY = ACCOUNT + ":homework:2026-01-05"
+TODAY = datetime.date(2026, 1, 5)
+
+
+@pytest.fixture
+def policy():
+    return AdaptiveTTL()
+
+
+def test_unknown_key_uses_configured_duration(policy):
+    assert policy.minutes("homework", KEY, TODAY) == CACHE_DURATION_MINUTES["homework"]
+
+
+def test_first_observation_is_a_change(policy):
+    assert policy.observe("homework", KEY, ["h1"]) is True
+    assert policy.minutes("homework", KEY, TODAY) == CACHE_DURATION_MINUTES["homework"]
+
+
+def test_unchanged_value_grows_and_changed_value_shrinks(policy):
+    base = CACHE_DURATION_MINUTES["homework"]
+    policy.observe("homework", KEY, ["h1"])
+
+    assert policy.observe("homework", KEY, ["h1"]) is False
+    assert policy.minutes("homework", KEY, TODAY) == pytest.approx(base * CACHE_TTL_GROWTH)
+
+    assert policy.observe("homework", KEY, ["h1", "h2"]) is True
+    assert policy.minutes("homework", KEY, TODAY) == pytest.approx(
+        max(base * CACHE_TTL_GROWTH * CACHE_TTL_SHRINK, CACHE_TTL_BOUNDS["homework"][0])
+    )
+
+
+def test_duration_stays_within_bounds(policy):
+    low, high = CACHE_TTL_BOUNDS["homework"]
+    policy.observe("homework", KEY, "stable")
+    for _ in range(50):
+        policy.observe("homework", KEY, "stable")
+    assert policy.minutes("homework", KEY, TODAY) == high
+
+    for index in range(50):
+        policy.observe("homework", KEY, index)
+    assert policy.minutes("homework", KEY, TODAY) == low
+
+
+def test_past_range_is_pinned(policy):
+    past = ACCOUNT + ":schedule:2025-12-01:2025-12-07"
+    current = ACCOUNT + ":schedule:2026-01-05:2026-01-11"
+    assert policy.minutes("schedule", past, TODAY) == CACHE_TTL_PINNED_MINUTES
+    assert policy.minutes("schedule", current, TODAY) == CACHE_DURATION_MINUTES["schedule"]
+
+
+def test_forget_drops_learning_of_an_account(policy):
+    other = "https://autre.fr/pronote/eleve.html|eleve|:homework:2026-01-05"
+    for key in (KEY, other):
+        policy.observe("homework", key, "a")
+        policy.observe("homework", key, "a")
+
+    policy.forget(ACCOUNT)
+    assert policy.minutes("homework", KEY, TODAY) == CACHE_DURATION_MINUTES["homework"]
+    assert policy.minutes("homework", other, TODAY) > CACHE_DURATION_MINUTES["homework"]
+
+
+def test_learning_survives_a_restart(tmp_path):
+    state_file = tmp_path / "cache_ttl.json"
+    policy = AdaptiveTTL(state_file)
+    policy.observe("homework", KEY, "a")
+    policy.observe("homework", KEY, "a")
+    policy.save()
+
+    restored = AdaptiveTTL(state_file)
+    assert restored.minutes("homework", KEY, TODAY) == policy.minutes("homework", KEY, TODAY)
+    assert restored.observe("homework", KEY, "a") is False
+
+
+def test_stats_by_resource(policy):
+    # Premier chargement, puis un rafraîchissement modifié et un identique
+    policy.observe("homework", KEY, "a")
+    policy.observe("homework", KEY, "b")
+    policy.observe("homework", KEY, "b")
+    stats = policy.stats()["homework"]
+    assert stats["keys"] == 1
+    assert stats["change_ratio"] == pytest.approx(0.5)
@@ -0,0 +1,73 @@
+"""
+Tests de l'écriture différée: regroupement, délai maximal et écriture à la fermeture
+"""
+import threading
+import time
+
+from app.pronote_api.write_behind import WriteBehind
+
+
+class Counter:
+    def __init__(self):
+        self.flushes = 0
+        self.flushed = threading.Event()
+
+    def __call__(self):
+        self.flushes += 1
+        self.flushed.set()
+
+
+def test_burst_of_changes_is_written_once():
+    counter = Counter()
+    writer = WriteBehind(counter, delay=0.05, max_delay=5)
+    for _ in range(20):
+        writer.mark_dirty()
+
+    assert counter.flushed.wait(2)
+    time.sleep(0.1)
+    assert counter.flushes == 1
+    writer.close()
+
+
+def test_steady_changes_are_written_by_max_delay():
+    counter = Counter()
+    writer = WriteBehind(counter, delay=0.2, max_delay=0.1)
+    deadline = time.monotonic() + 0.5
+    # Modifications plus rapprochées que delay: seul max_delay déclenche l'écriture
+    while time.monotonic() < deadline and not counter.flushed.is_set():
+        writer.mark_dirty()
+        time.sleep(0.02)
+
+    assert counter.flushed.is_set()
+    writer.close()
+
+
+def test_close_writes_pending_changes_then_writes_through():
+    counter = Counter()
+    writer = WriteBehind(counter, delay=60, max_delay=60)
+    writer.mark_dirty()
+    writer.close()
+    # Le thread écrit en s'arrêtant, close() réécrit (sans effet si rien n'a changé)
+    flushes = counter.flushes
+    assert flushes >= 1
+
+    writer.mark_dirty()
+    assert counter.flushes == flushes + 1
+
+
+def test_file_cache_keeps_changes_in_memory_until_flush(file_cache):
+    cache = file_cache(durability="write_behind")
+    cache.set("grades", {"periods": []})
+    assert file_cache().get("grades") is None
+
+    cache.flush()
+    assert file_cache().get("grades") == {"periods": []}
+
+
+def test_sqlite_cache_closes_with_pending_writes(sqlite_cache):
+    cache = sqlite_cache(durability="write_behind")
+    cache.set("homework", ["h1"])
+    assert cache.get("homework") == ["h1"]
+    cache.close()
+
+    assert sqlite_cache().get("homework") == ["h1"]